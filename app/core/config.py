@@ -1,25 +1,71 @@
-from langchain.chat_models import init_chat_model
+import functools
+from typing import TYPE_CHECKING, Iterable
+
+import httpx
 from .settings import settings
+from .rate_limiter import rate_limit_header_hook
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+# Groq models
+LLAMA3_70B = "llama3-70b-8192"
+LLAMA31_8B = "llama-3.1-8b-instant"
+DS_R1_LLAMA_70B = "deepseek-r1-distill-llama-70b"
+DS_R1_QWEN_32B = "deepseek-r1-distill-qwen-32b"
+GROQ_MODELS = (LLAMA3_70B, LLAMA31_8B, DS_R1_LLAMA_70B, DS_R1_QWEN_32B)
+REASONING_MODELS = (DS_R1_LLAMA_70B, DS_R1_QWEN_32B)
+
+# Legacy module attributes, resolved lazily by __getattr__ below
+_LEGACY_NAMES = {
+    "llama3_70b_llm": LLAMA3_70B,
+    "ds_r1_llama_70b_llm": DS_R1_LLAMA_70B,
+    "ds_r1_qwen_32b_llm": DS_R1_QWEN_32B,
+}
+
+
+def groq_http_client(model: str) -> httpx.AsyncClient:
+    """
+    Async HTTP client for a Groq model that reports rate-limit headers to the shared limiter.
+    """
+    return httpx.AsyncClient(event_hooks={"response": [rate_limit_header_hook(model)]}, timeout=60.0)
+
+
+@functools.lru_cache(maxsize=None)
+def get_chat_model(model: str) -> "BaseChatModel":
+    """
+    Returns the shared chat model for a Groq model name, building it on first use.
+
+    Models (and the LangChain/Groq SDK imports behind them) are created lazily, so
+    importing the app stays fast. SDK retries are disabled: 429s are retried by the rate
+    limiter, which also backs off concurrency. Reasoning models are asked to hide their
+    <think> block (settings.llm_hide_reasoning), which JSON mode requires anyway.
+    """
+    from langchain.chat_models import init_chat_model
+
+    extra = {}
+    if model in REASONING_MODELS and settings.llm_hide_reasoning:
+        extra["reasoning_format"] = "hidden"
+    return init_chat_model(
+        model=model,
+        model_provider="groq",
+        temperature=0.5,
+        api_key=settings.GROQ_API_KEY,
+        max_retries=0,
+        http_async_client=groq_http_client(model),
+        **extra,
+    )
+
+
+def warm_up_models(models: Iterable[str] = GROQ_MODELS) -> None:
+    """
+    Builds the given chat models ahead of the first request.
+    """
+    for model in models:
+        get_chat_model(model)
 
-# Groq model initialization
-ds_r1_llama_70b_llm = init_chat_model( 
-    model="deepseek-r1-distill-llama-70b", 
-    model_provider="groq",
-    temperature=0.5,
-    api_key=settings.GROQ_API_KEY
-)
-
-ds_r1_qwen_32b_llm = init_chat_model( 
-    model="deepseek-r1-distill-qwen-32b", 
-    model_provider="groq",
-    temperature=0.5,
-    api_key=settings.GROQ_API_KEY
-)
-
-llama3_70b_llm = init_chat_model( 
-    model="llama3-70b-8192", 
-    model_provider="groq",
-    temperature=0.5,
-    api_key=settings.GROQ_API_KEY
-)
 
+def __getattr__(name: str):
+    if name in _LEGACY_NAMES:
+        return get_chat_model(_LEGACY_NAMES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
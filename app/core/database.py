@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from typing import Any, Iterable, List, Optional, Sequence
+
+from loguru import logger
+
+from app.core.settings import settings
+
+
+class Database:
+    """
+    Thin async wrapper around a single SQLite connection.
+
+    SQLite calls are blocking, so every query runs in a worker thread. A lock serializes
+    access to the shared connection; WAL mode lets readers proceed while a write commits.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._conn = conn
+            logger.info(f"Connected to SQLite database at {self.path}")
+        return self._conn
+
+    def execute_sync(self, sql: str, params: Sequence[Any] = ()) -> int:
+        with self._lock:
+            cursor = self.connect().execute(sql, params)
+            return cursor.rowcount
+
+    def executemany_sync(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> int:
+        with self._lock:
+            conn = self.connect()
+            conn.execute("BEGIN")
+            try:
+                cursor = conn.executemany(sql, seq_of_params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return cursor.rowcount
+
+    def executescript_sync(self, script: str) -> None:
+        with self._lock:
+            self.connect().executescript(script)
+
+    def fetchone_sync(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self.connect().execute(sql, params).fetchone()
+
+    def fetchall_sync(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self.connect().execute(sql, params).fetchall()
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        return await asyncio.to_thread(self.execute_sync, sql, params)
+
+    async def executemany(self, sql: str, seq_of_params: Iterable[Sequence[Any]]) -> int:
+        return await asyncio.to_thread(self.executemany_sync, sql, list(seq_of_params))
+
+    async def executescript(self, script: str) -> None:
+        await asyncio.to_thread(self.executescript_sync, script)
+
+    async def fetchone(self, sql: str, params: Sequence[Any] = ()) -> Optional[sqlite3.Row]:
+        return await asyncio.to_thread(self.fetchone_sync, sql, params)
+
+    async def fetchall(self, sql: str, params: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        return await asyncio.to_thread(self.fetchall_sync, sql, params)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+db = Database(settings.database_path)
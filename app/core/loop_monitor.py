@@ -0,0 +1,69 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop responsiveness.
+
+    A background task sleeps for a fixed interval and records how late it wakes up.
+    Any blocking call on the loop (sync I/O, heavy CPU work) shows up directly as lag.
+    """
+
+    def __init__(self, interval: float = 0.5, warn_threshold: float = 0.25):
+        """
+        Parameters:
+            interval (float): Seconds between probes.
+            warn_threshold (float): Lag in seconds above which a warning is logged.
+        """
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.avg_lag = 0.0  # Exponentially weighted moving average
+        self.samples = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - start - self.interval)
+            self.record(lag)
+
+    def record(self, lag: float) -> None:
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.avg_lag = lag if self.samples == 0 else 0.9 * self.avg_lag + 0.1 * lag
+        self.samples += 1
+        if lag > self.warn_threshold:
+            logger.warning(f"Event loop lagged {lag * 1000:.0f} ms")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._probe())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 2),
+            "avg_lag_ms": round(self.avg_lag * 1000, 2),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "samples": self.samples,
+            "timestamp": time.time(),
+        }
+
+
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,250 @@
+import asyncio
+import functools
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets (seconds), from sub-millisecond parsing up to multi-minute jobs.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    Base for a metric family with optional labels.
+
+    Children (one per label combination) are created on first use and cached, so the hot
+    path is a dict lookup plus an increment. Updates are not locked: they happen on the
+    event loop, and the occasional update from a worker thread is protected by the GIL.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """
+        Returns the child for one combination of label values.
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """
+        Yields (sample name suffix, formatted labels, value) for the exposition format.
+        """
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_format_value(value)}" for suffix, labels, value in self.samples())
+        return lines
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing count, e.g. errors or tokens.
+    """
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def samples(self):
+        for key, child in self._children.items():
+            yield "", _format_labels(self.labelnames, key), child.value
+
+
+class Gauge(Metric):
+    """
+    Value that goes up and down, e.g. requests in flight.
+
+    With `collect`, values are read at scrape time instead: `collect()` returns
+    {label values: value} and the gauge needs no updates on the hot path.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None, collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, description, labelnames, registry)
+        self.collect = collect
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def samples(self):
+        values = self.collect() if self.collect is not None else {key: child.value for key, child in self._children.items()}
+        for key, value in values.items():
+            yield "", _format_labels(self.labelnames, key), value
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values (latencies), in cumulative buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (), registry: Optional["Registry"] = None, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def samples(self):
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                yield "_bucket", _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"'), cumulative
+            yield "_sum", _format_labels(self.labelnames, key), child.sum
+            yield "_count", _format_labels(self.labelnames, key), child.count
+
+
+class Registry:
+    """
+    Collection of metrics rendered together in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Pipeline stages (generate_email, send_email, make_call, read_file, parse, row, job, ...)
+stage_seconds = Histogram("outreach_stage_seconds", "Time spent in each pipeline stage.", ["stage"])
+stage_in_flight = Gauge("outreach_stage_in_flight", "Operations currently running in each pipeline stage.", ["stage"])
+stage_errors = Counter("outreach_stage_errors_total", "Operations in each pipeline stage that raised an error.", ["stage"])
+generation_tiers = Counter("outreach_generation_tier_total", "Prospects generated per channel and tier (template, small, full).", ["channel", "tier"])
+rows_processed = Counter("outreach_rows_total", "Prospect rows by channel and outcome.", ["channel", "outcome"])
+retries = Counter("outreach_retries_total", "Retried requests to external services.", ["service"])
+
+# LLM requests
+llm_request_seconds = Histogram("llm_request_seconds", "LLM request latency per model, including failed and cancelled attempts.", ["model"])
+llm_requests = Counter("llm_requests_total", "LLM requests per model and outcome (ok, error, cancelled).", ["model", "outcome"])
+llm_tokens = Counter("llm_tokens_total", "LLM tokens used, per generator and kind (prompt, completion).", ["generator", "kind"])
+llm_cache_hits = Counter("llm_cache_hits_total", "LLM responses served from the cache, per generator.", ["generator"])
+llm_parse_failures = Counter("llm_parse_failures_total", "LLM replies that failed to parse or validate, per generator and kind (invalid, incomplete).", ["generator", "kind"])
+llm_repairs = Counter("llm_repairs_total", "Field-level repair requests per generator and outcome (repaired, failed).", ["generator", "outcome"])
+llm_wasted_tokens = Counter("llm_wasted_tokens_total", "Tokens spent on LLM replies that were discarded, per generator.", ["generator"])
+llm_rate_limit_wait_seconds = Histogram("llm_rate_limit_wait_seconds", "Time spent waiting for Groq rate-limit budget, per model.", ["model"])
+
+# Jobs
+job_queue_depth = Gauge("outreach_job_queue_depth", "Outreach jobs waiting to run.")
+jobs_running = Gauge("outreach_jobs_running", "Outreach jobs running in this process.")
+call_buffer_depth = Gauge("outreach_call_buffer_depth", "Generated call scripts waiting for the dialer.")
+
+
+@contextmanager
+def track(stage: str) -> Iterator[None]:
+    """
+    Times a block as one operation of `stage`, counting it in flight and recording errors.
+    """
+    in_flight = stage_in_flight.labels(stage)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        if not isinstance(e, (asyncio.CancelledError, GeneratorExit)):
+            stage_errors.labels(stage).inc()
+        raise
+    finally:
+        in_flight.dec()
+        stage_seconds.labels(stage).observe(time.perf_counter() - started)
+
+
+def timed(stage: str):
+    """
+    Decorator that tracks every call of a function (sync or async) as one operation of `stage`.
+    """
+    def decorate(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with track(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with track(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
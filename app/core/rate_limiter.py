@@ -0,0 +1,267 @@
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+from app.core.metrics import Gauge, llm_rate_limit_wait_seconds, retries
+from app.core.settings import settings
+
+T = TypeVar("T")
+
+# Default Groq quotas as (requests per minute, tokens per minute). Overridable via settings.groq_rate_limits.
+DEFAULT_GROQ_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "llama3-70b-8192": (30, 6000),
+    "deepseek-r1-distill-llama-70b": (30, 6000),
+    "deepseek-r1-distill-qwen-32b": (30, 6000),
+}
+FALLBACK_RATE_LIMIT: Tuple[int, int] = (30, 6000)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parses Groq reset headers such as '7.66s', '2m59.56s' or '120ms' into seconds.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap prompt token estimate (~4 characters per token for English text).
+    """
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket. `acquire` waits until enough budget is available.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.refill_per_second)
+
+    def adjust(self, delta: float) -> None:
+        """
+        Adds (or, if negative, removes) budget without waiting. The bucket may go into debt.
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+    def sync(self, remaining: float, reset_seconds: Optional[float] = None) -> None:
+        """
+        Aligns the bucket with the provider's view of the remaining budget.
+        """
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+        if remaining <= 0 and reset_seconds:
+            # Hold the bucket empty until the provider window resets.
+            self.tokens = -reset_seconds * self.refill_per_second
+
+
+class ModelRateLimiter:
+    """
+    Per-model limiter combining request and token budgets with AIMD concurrency control.
+
+    Work is queued rather than failed: callers wait for budget, and requests rejected with
+    HTTP 429 are retried after the advertised delay while the in-flight limit is halved.
+    Every success grows the limit again by roughly one slot per window.
+    """
+
+    def __init__(self, model: str, rpm: int, tpm: int, max_concurrency: int, min_concurrency: int = 1):
+        self.model = model
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.concurrency_limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def _acquire_slot(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.concurrency_limit))
+            self.in_flight += 1
+
+    async def _release_slot(self) -> None:
+        # Given back before taking the lock, so a caller cancelled again while it waits here cannot keep it.
+        self.in_flight -= 1
+        try:
+            await self._notify()
+        except asyncio.CancelledError:
+            asyncio.ensure_future(self._notify())
+            raise
+
+    async def _notify(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    def _increase(self) -> None:
+        self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1.0 / max(1.0, self.concurrency_limit))
+
+    def _decrease(self, window: float) -> None:
+        # A burst of 429s from the same window counts as one congestion signal.
+        now = time.monotonic()
+        if now - self._last_decrease >= window:
+            self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2.0)
+            self._last_decrease = now
+
+    def observe_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Updates budgets from Groq's x-ratelimit-* response headers.
+        """
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        if remaining_requests is not None:
+            try:
+                self.requests.sync(float(remaining_requests), parse_reset_duration(headers.get("x-ratelimit-reset-requests")))
+            except ValueError:
+                pass
+
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if remaining_tokens is not None:
+            try:
+                self.tokens.sync(float(remaining_tokens), parse_reset_duration(headers.get("x-ratelimit-reset-tokens")))
+            except ValueError:
+                pass
+
+    def _retry_after(self, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        if headers:
+            self.observe_headers(headers)
+        delay = parse_reset_duration(headers.get("retry-after")) if headers else None
+        return delay if delay is not None else settings.groq_rate_limit_backoff_seconds
+
+    async def run(self, call: Callable[[], Awaitable[T]], estimated_tokens: int, usage_of: Optional[Callable[[T], Optional[int]]] = None) -> T:
+        """
+        Runs `call` once request, token and concurrency budget is available.
+
+        Parameters:
+            call (callable): Zero-argument coroutine factory performing the LLM request.
+            estimated_tokens (int): Expected prompt + completion tokens, reserved up front.
+            usage_of (callable): Returns the actual token usage of a result, used to settle the reservation.
+
+        Returns:
+            T: Whatever `call` returns.
+        """
+        attempts = 0
+        while True:
+            waiting_since = time.perf_counter()
+            await self._acquire_slot()
+            released = False
+            try:
+                await self.requests.acquire(1)
+                await self.tokens.acquire(estimated_tokens)
+                llm_rate_limit_wait_seconds.labels(self.model).observe(time.perf_counter() - waiting_since)
+                result = await call()
+            except Exception as e:
+                # The slot is not held while waiting out a 429
+                released = True
+                await self._release_slot()
+                if not is_rate_limit_error(e) or attempts >= settings.groq_max_rate_limit_retries:
+                    raise
+                attempts += 1
+                self.throttled += 1
+                retries.labels("groq").inc()
+                delay = self._retry_after(e)
+                self._decrease(window=delay)
+                logger.warning(
+                    f"Groq rate limit hit for {self.model}; retrying in {delay:.1f}s "
+                    f"(concurrency limit now {int(self.concurrency_limit)})"
+                )
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                # Also runs when the caller is cancelled (e.g. a losing hedge) while waiting or in `call`
+                if not released:
+                    await self._release_slot()
+
+            self._increase()
+            actual = usage_of(result) if usage_of else None
+            if actual:
+                self.tokens.adjust(estimated_tokens - actual)
+            return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "in_flight": self.in_flight,
+            "concurrency_limit": int(self.concurrency_limit),
+            "request_budget": round(self.requests.tokens, 1),
+            "token_budget": round(self.tokens.tokens, 1),
+            "throttled": self.throttled,
+        }
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status in (429, 503)
+
+
+_limiters: Dict[str, ModelRateLimiter] = {}
+
+Gauge("llm_in_flight", "LLM requests in flight per model.", ["model"], collect=lambda: {(model,): limiter.in_flight for model, limiter in _limiters.items()})
+Gauge("llm_concurrency_limit", "Current adaptive concurrency limit per model.", ["model"], collect=lambda: {(model,): int(limiter.concurrency_limit) for model, limiter in _limiters.items()})
+
+
+def get_rate_limiter(model: str) -> ModelRateLimiter:
+    """
+    Returns the shared limiter for a model, creating it on first use.
+    """
+    if model not in _limiters:
+        rpm, tpm = settings.groq_rate_limits.get(model) or DEFAULT_GROQ_RATE_LIMITS.get(model, FALLBACK_RATE_LIMIT)
+        # When several worker processes share one Groq account, each gets a slice of the quota.
+        share = settings.groq_rate_limit_share
+        _limiters[model] = ModelRateLimiter(
+            model,
+            max(1, int(rpm * share)),
+            max(1, int(tpm * share)),
+            max_concurrency=max(1, int(settings.groq_max_concurrency * share)),
+        )
+    return _limiters[model]
+
+
+def rate_limit_header_hook(model: str) -> Callable[[Any], Awaitable[None]]:
+    """
+    Builds an httpx response hook that feeds a model's rate-limit headers into its limiter.
+    """
+    async def hook(response: Any) -> None:
+        if "x-ratelimit-remaining-requests" in response.headers or "x-ratelimit-remaining-tokens" in response.headers:
+            get_rate_limiter(model).observe_headers(response.headers)
+
+    return hook
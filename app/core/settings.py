@@ -1,4 +1,6 @@
 from loguru import logger
+from typing import Dict, List, Tuple
+
 from pydantic import EmailStr, Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,6 +22,96 @@ class Settings(BaseSettings):
     twilio_auth_token: SecretStr
     twilio_phone_number: str
     twilio_verified_phone_number: str
+    twilio_api_base_url: str = "https://api.twilio.com"
+    twilio_calls_per_second: float = 1.0
+    twilio_max_concurrency: int = 10
+
+    # Outreach processing
+    email_concurrency: int = 8
+    call_concurrency: int = 4  # Call scripts generated at once per job
+    dial_concurrency: int = 4  # Calls being placed at once per job
+    call_script_buffer_size: int = 16  # Generated call scripts waiting to be dialed, per job
+    call_window_start: str = ""  # "HH:MM" in call_window_timezone; empty start/end means calls may be placed at any time
+    call_window_end: str = ""  # Before call_window_start for windows past midnight
+    call_window_days: List[int] = [0, 1, 2, 3, 4, 5, 6]  # Monday is 0
+    call_window_timezone: str = "UTC"
+    ingest_batch_size: int = 5000
+    upload_dir: str = "uploads"
+    upload_chunk_size: int = 1 << 20
+    max_concurrent_jobs: int = 2
+    default_phone_country_code: str = ""  # Prefixed to phone numbers without one, e.g. "1"; empty rejects them
+    default_phone_national_length: int = 10  # Digits in a national number for that country code; 0 if it varies
+    campaign_mode: bool = False  # Generate one template per campaign and only personalize per prospect
+    campaign_template_cache_size: int = 256  # Campaign templates kept in memory; the least recently used are dropped
+    pack_size: int = 1  # >1 packs this many prospects into one LLM request
+    pack_max_wait_ms: int = 25  # How long a partial pack waits for more prospects
+
+    # Tiered generation: templates for cold prospects, a small model for warm ones, the full model for hot leads
+    tiered_generation: bool = False
+    tier_template_max_engagement: int = 1  # Engagement levels up to this render from templates (industries in the snippet library only)
+    tier_small_model_max_engagement: int = 2  # Levels up to this use tier_small_model; higher levels use the full model
+    tier_small_model: str = "llama-3.1-8b-instant"
+    tier_channel_boost: Dict[str, int] = {"call": 1}  # Added to the engagement level per outreach type before picking a tier
+    tier_industry_boost: Dict[str, int] = {}  # Same, per industry, e.g. {"finance": 1}
+
+    # Worker processes
+    job_runner: str = "inline"  # "inline": the API process runs jobs; "external": only `python -m app.worker` does
+    job_poll_interval: float = 2.0
+    worker_processes: int = 0  # >1 shards large jobs across this many processes
+    shard_min_rows: int = 2000
+
+    # Suppression / dedup
+    suppression_enabled: bool = True
+    suppression_cooldown_days: Dict[str, float] = {"email": 30.0, "call": 30.0}
+    suppression_bloom: bool = False  # Bloom filter in front of the contact index, for very large lists
+    suppression_bloom_capacity: int = 10_000_000
+    suppression_bloom_error_rate: float = 0.001
+
+    # Storage
+    database_path: str = "gamma_cold_chain.db"
+
+    # Result files
+    result_format: str = "csv"  # csv, csv.gz, csv.zst, parquet or arrow
+    result_row_group_size: int = 10_000  # Rows per Parquet row group / Arrow record batch, and per compressed CSV flush
+
+    # LLM response cache
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 2048
+    llm_cache_max_rows: int = 100_000
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+
+    # Groq rate limiting
+    groq_rate_limits: Dict[str, Tuple[int, int]] = {}  # model -> (requests/min, tokens/min)
+    groq_max_concurrency: int = 8
+    groq_max_rate_limit_retries: int = 20
+    groq_rate_limit_backoff_seconds: float = 2.0
+    groq_expected_completion_tokens: int = 600
+    groq_rate_limit_share: float = 1.0  # Fraction of the quota this process may use
+
+    # Model routing and hedging
+    llm_router_models: List[str] = ["llama3-70b-8192", "deepseek-r1-distill-llama-70b", "deepseek-r1-distill-qwen-32b"]
+    llm_router_window: int = 100
+    llm_router_min_samples: int = 10
+    llm_router_ewma_alpha: float = 0.3
+    llm_router_default_latency: float = 5.0
+    llm_router_probe_seconds: float = 300.0
+    llm_router_hedge_percentile: float = 0.95
+    llm_router_min_hedge_seconds: float = 1.0
+    llm_router_hedge_ratio: float = 0.1
+
+    # Structured output
+    llm_structured_output: str = "json_mode"  # json_mode (provider JSON mode), tools (tool call with the response schema) or prompt (instructions only)
+    llm_repair_attempts: int = 1  # Follow-up requests for only the missing/invalid fields before a reply counts as failed
+    llm_hide_reasoning: bool = True  # Ask reasoning models (DeepSeek R1) to leave their <think> block out of the reply
+
+    # SMTP pool
+    smtp_pool_size: int = 4
+    smtp_max_messages_per_connection: int = 100
+    smtp_domain_rate_per_minute: float = 60  # Per recipient domain; 0 turns the limit off
+    smtp_prewarm_connections: int = 1
+
+    # Startup: build LLM clients and import the outreach pipeline in the background after boot
+    prewarm_clients: bool = True
 
     model_config = SettingsConfigDict(
         env_file=".env",
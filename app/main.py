@@ -1,21 +1,71 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from loguru import logger
 
+from app.core.database import db
+from app.core.loop_monitor import loop_monitor
+from app.core.metrics import REGISTRY, job_queue_depth
+from app.core.settings import settings
+from app.services.jobs import job_manager
+from app.services.model_router import model_router
+from app.services.smtp_pool import smtp_pool
+from app.services.twilio_dispatcher import twilio_dispatcher
 from app.routers import email, call, outreach
 
+
+def warm_up() -> None:
+    """
+    Imports the outreach pipeline and builds the LLM clients, so the first job or request
+    doesn't pay for them. Runs in a thread after startup; the app serves requests meanwhile.
+    """
+    try:
+        from app.core.config import warm_up_models
+        import app.services.sharding  # noqa: F401  (pandas, LangChain runnables)
+
+        warm_up_models()
+    except Exception as e:
+        logger.warning(f"Client pre-warm failed, clients will be built on first use: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle app lifecycle events."""
     logger.info("🚀 Starting application...")
     
     logger.info("🕒 Starting background tasks...")
+    loop_monitor.start()
+
+    warm_up_task = None
+    if settings.prewarm_clients:
+        logger.info("🔥 Pre-warming LLM clients in the background...")
+        warm_up_task = asyncio.create_task(asyncio.to_thread(warm_up))
+
+    logger.info("📧 Opening SMTP connection pool...")
+    await smtp_pool.start(prewarm=settings.smtp_prewarm_connections)
+
+    logger.info("📞 Starting Twilio call dispatcher...")
+    await twilio_dispatcher.start()
+
+    if settings.job_runner == "inline":
+        logger.info("🗂️ Starting outreach job workers...")
+        await job_manager.start()
+    else:
+        logger.info("🗂️ Outreach jobs will be run by external workers (python -m app.worker).")
 
     yield  # The application runs during this time
 
     # Cleanup on shutdown
     logger.info("🛑 Shutting down application...")
+    if warm_up_task is not None and not warm_up_task.done():
+        warm_up_task.cancel()
+    await job_manager.stop()
+    await loop_monitor.stop()
+    await smtp_pool.close()
+    await twilio_dispatcher.close()
+    db.close()
 
 app = FastAPI(lifespan=lifespan, title="Gamma Cold Emails and Calls API", version="1.0")
 
@@ -29,7 +79,7 @@ app.add_middleware(
 )
 
 # Register routers
-routers = [email.router, outreach.router]
+routers = [email.router, call.router, outreach.router]
 for router in routers:
     app.include_router(router)
 
@@ -37,3 +87,14 @@ for router in routers:
 @app.get("/")
 async def root():
     return {"message": "Welcome to Gamma Cold Emails and Calls API"}
+
+# Health endpoint, reports event loop lag
+@app.get("/health")
+async def health():
+    return {"status": "ok", "event_loop": loop_monitor.snapshot(), "models": model_router.snapshot()}
+
+# Prometheus metrics: stage latencies, LLM tokens and requests, in-flight gauges, errors and retries
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    job_queue_depth.labels().set(await job_manager.queue_depth())
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
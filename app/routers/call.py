@@ -1,37 +1,139 @@
-# from fastapi import APIRouter, HTTPException, BackgroundTasks
-# from app.services.call import generate_call_script, make_call
-# from app.schemas.call import CallRequest, BulkCallRequest, BulkCallResponse
-
-# router = APIRouter()
-
-# @router.post("/call/single", response_model=str)
-# async def single_call(request: CallRequest):
-#     """
-#     Generate a call script and make a single call.
-#     """
-#     try:
-#         call_script = await generate_call_script(request.dict())
-#         call_status = await make_call(request.prospect_phone, call_script.call_script)
-#         return call_status
-#     except Exception as e:
-#         raise HTTPException(status_code=500, detail=str(e))
-
-# @router.post("/call/bulk", response_model=BulkCallResponse)
-# async def bulk_call(request: BulkCallRequest, background_tasks: BackgroundTasks):
-#     """
-#     Generate call scripts and initiate multiple calls asynchronously.
-#     """
-#     call_results = []
-
-#     async def process_call(prospect):
-#         try:
-#             script = await generate_call_script(prospect.dict())
-#             status = await make_call(prospect.prospect_phone, script.call_script)
-#             call_results.append({"phone": prospect.prospect_phone, "status": status})
-#         except Exception as e:
-#             call_results.append({"phone": prospect.prospect_phone, "status": f"failed: {str(e)}"})
-
-#     for prospect in request.prospects:
-#         background_tasks.add_task(process_call, prospect)
-
-#     return BulkCallResponse(results=call_results)
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+from loguru import logger
+
+from app.core.settings import settings
+from app.schemas.call import BulkCallRequest, BulkCallResponse, CallFailure, CallRequest, CallResponse
+from app.services.call import generate_call_script, make_call
+from app.services.dialer import CallingWindow, CallPipeline
+from app.services.row_engine import RowEngine
+from app.services.suppression import contact_index
+
+router = APIRouter(prefix="/call", tags=["Call"])
+
+
+def ensure_window_open() -> None:
+    """
+    Rejects the request with 409 while calls may not be placed.
+    """
+    window = CallingWindow.from_settings()
+    if not window.is_open():
+        opens = window.next_open()
+        raise HTTPException(
+            status_code=409,
+            detail=f"Outside the calling window. Calls can be placed from {opens.isoformat()}." if opens else "The calling window has no open days.",
+        )
+
+
+def normalize_phone_numbers(phones: List[str]) -> List[Optional[str]]:
+    """
+    Normalizes phone numbers like uploaded prospects (see `app.services.validation.normalize_phones`).
+
+    Returns:
+        list: E.164 numbers, with None for numbers that are not valid E.164 after normalizing.
+    """
+    import pandas as pd  # Deferred like the rest of the pipeline
+
+    from app.services.validation import E164_PATTERN, normalize_phones
+
+    normalized = normalize_phones(pd.Series(phones, dtype=object))
+    valid = normalized.str.fullmatch(E164_PATTERN).fillna(False).astype(bool)
+    return [phone if ok else None for phone, ok in zip(normalized.tolist(), valid.tolist())]
+
+
+async def blocked_phones(phones: List[str]) -> Dict[str, str]:
+    """
+    Returns {phone: reason} for numbers that are on a do-not-call list or in cooldown.
+    """
+    if not settings.suppression_enabled:
+        return {}
+    return await contact_index.check("call", phones)
+
+
+async def record_call(phone: str) -> None:
+    try:
+        await contact_index.mark_contacted("call", phone)
+    except Exception as e:
+        logger.error(f"Failed to record call to {phone}: {e}")
+
+
+@router.post("/single", response_model=CallResponse)
+async def single_call(request: CallRequest, use_cache: bool = True) -> CallResponse:
+    """
+    Generates a call script and places a single call.
+
+    The number is normalized to E.164 (422 if it is invalid) and checked against the contact
+    index (409 if it is on a do-not-call list or was called within the cooldown).
+    """
+    ensure_window_open()
+    phone = normalize_phone_numbers([request.prospect_phone])[0]
+    if phone is None:
+        raise HTTPException(status_code=422, detail="Invalid prospect_phone. Use international format (+1234567890).")
+    reason = (await blocked_phones([phone])).get(phone)
+    if reason:
+        raise HTTPException(status_code=409, detail=f"{phone} must not be called: {reason}.")
+
+    try:
+        response = await generate_call_script({**request.model_dump(), "prospect_phone": phone}, use_cache=use_cache, pack=False)
+        call = await make_call(phone, response.call_script)
+    except Exception as e:
+        logger.error(f"Error calling {request.company_name}'s {phone}: {e}")
+        raise HTTPException(status_code=500, detail="Call failed.")
+
+    if call.call_sid:
+        await record_call(phone)
+    return response.model_copy(update={"call_sid": call.call_sid, "call_status": call.call_status})
+
+
+@router.post("/bulk", response_model=BulkCallResponse)
+async def bulk_call(request: BulkCallRequest, use_cache: bool = True) -> BulkCallResponse:
+    """
+    Generates call scripts and places calls for several prospects.
+
+    Scripts are generated ahead of the dialer (see `app.services.dialer.CallPipeline`), so
+    LLM requests and calls overlap. Results are returned in request order once every call
+    has been placed or has failed.
+
+    Numbers are normalized and checked like in `/call/single`; invalid, repeated, do-not-call
+    and in-cooldown numbers are reported in `failed` without being called.
+    """
+    ensure_window_open()
+    result = BulkCallResponse()
+
+    phones = normalize_phone_numbers([prospect.prospect_phone for prospect in request.prospects])
+    blocked = await blocked_phones([phone for phone in phones if phone])
+    rows = []
+    seen = set()
+    for prospect, phone in zip(request.prospects, phones):
+        if phone is None:
+            detail = "Invalid prospect_phone."
+        elif phone in seen:
+            detail = "Duplicate prospect_phone in request."
+        elif phone in blocked:
+            detail = f"Must not be called: {blocked[phone]}."
+        else:
+            seen.add(phone)
+            rows.append({**prospect.model_dump(), "prospect_phone": phone})
+            continue
+        result.failed.append(CallFailure(prospect_phone=phone or prospect.prospect_phone, detail=detail))
+
+    async with CallPipeline(
+        generate=lambda row: generate_call_script(row, use_cache=use_cache),
+        dial=make_call,
+        generate_concurrency=settings.call_concurrency * max(1, settings.pack_size),
+    ) as calls:
+        engine = RowEngine(handler=calls.run, limits={"call": calls.capacity}, channel_of=lambda row: "call")
+        async for outcome in engine.run(rows):
+            phone = outcome.row["prospect_phone"]
+            response, call = outcome.result if outcome.ok else (None, None)
+            if call is None:
+                detail = "Call script generation failed." if outcome.ok else "Call failed."
+                logger.error(f"Error calling {outcome.row['company_name']}'s {phone}: {outcome.error or detail}")
+                result.failed.append(CallFailure(prospect_phone=phone, detail=detail))
+                continue
+            if call.call_sid:
+                await record_call(phone)
+            result.results.append(response.model_copy(update={"call_sid": call.call_sid, "call_status": call.call_status}))
+
+    return result
@@ -1,17 +1,24 @@
+import json
+import os
+import uuid
+from typing import Optional
+
 from fastapi import APIRouter, BackgroundTasks, File, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
-import pandas as pd
+from app.core.settings import settings
 from app.schemas.email import EmailRequest
-from app.services.email import generate_email_content, send_email
+from app.services.email import generate_email_content, send_email, stream_email_content
+from app.services.result_writer import RESULT_FORMATS
+from app.utils.process_files import SUPPORTED_EXTENSIONS
+from app.utils.sse import field_deltas, format_sse
+from app.utils.uploads import save_upload
 from loguru import logger
 
 router = APIRouter(prefix="/email", tags=["Email"])
 
-@router.post("/")
-async def generate_and_send_email(email_request: EmailRequest, background_tasks: BackgroundTasks) -> JSONResponse:
-    
-    params = {
+def request_params(email_request: EmailRequest) -> dict:
+    return {
         "prospect_email": email_request.prospect_info.prospect_email,
         "prospect_name": email_request.prospect_info.prospect_name,
         "company_name": email_request.prospect_info.company_name,
@@ -24,9 +31,15 @@ async def generate_and_send_email(email_request: EmailRequest, background_tasks:
         "sender_name": email_request.sender_name,
         "sender_title": email_request.sender_title,
     }
+
+
+@router.post("/")
+async def generate_and_send_email(email_request: EmailRequest, background_tasks: BackgroundTasks, use_cache: bool = True) -> JSONResponse:
+    
+    params = request_params(email_request)
     
     try:
-        response = generate_email_content(params)
+        response = await generate_email_content(params, use_cache=use_cache, pack=False)
 
         # Schedule sending the email as a background task.
         background_tasks.add_task(send_email, response)
@@ -39,60 +52,81 @@ async def generate_and_send_email(email_request: EmailRequest, background_tasks:
         content={"status": "success", "results": jsonable_encoder(response)})
 
 
-@router.post("/bulk")
-async def generate_and_send_bulk_email(background_tasks: BackgroundTasks, file: UploadFile = File(...)) -> JSONResponse:
-    try:
-        # Read input file (CSV assumed)
-        df = pd.read_csv(file.file)
-
-        # Ensure required columns are present
-        required_columns = [
-            "prospect_email", "prospect_name", "company_name", "prospect_title",
-            "industry", "engagement_level", "objections", "outreach_description",
-            "insurance_company_name", "sender_name", "sender_title", "outreach_type"
-        ]
-
-        missing_cols = [col for col in required_columns if col not in df.columns]
-        if missing_cols:
-            return JSONResponse(status_code=400, content={"error": f"Missing columns: {missing_cols}"})
-
-        results = []
-
-        for _, row in df.iterrows():
-            params = {
-                "prospect_email": row["prospect_email"],
-                "prospect_name": row["prospect_name"],
-                "company_name": row["company_name"],
-                "prospect_title": row["prospect_title"],
-                "industry": row["industry"],
-                "engagement_level": row["engagement_level"],
-                "objections": row["objections"],
-                "outreach_description": row["outreach_description"],
-                "insurance_company_name": row["insurance_company_name"],
-                "sender_name": row["sender_name"],
-                "sender_title": row["sender_title"],
-            }
-
-            try:
-                response = generate_email_content(params)
-                background_tasks.add_task(send_email, response)
-
-                # Append results
-                row["subject"] = response.subject
-                row["email"] = response.email
-                row["engagement_advice"] = response.engagement_advice
-                results.append(row)
-
-            except Exception as e:
-                logger.error(f"Error generating email for {row['company_name']}: {e}")
-
-        # Convert results back to DataFrame and save
-        output_df = pd.DataFrame(results)
-        output_file = "processed_outreach_results.csv"
-        output_df.to_csv(output_file, index=False)
-
-        return JSONResponse(status_code=200, content={"status": "success", "message": "Emails generated and sent successfully", "file": output_file})
+@router.post("/stream")
+async def stream_and_send_email(email_request: EmailRequest, background_tasks: BackgroundTasks, use_cache: bool = True) -> StreamingResponse:
+    """
+    Streams email generation as Server-Sent Events.
+
+    `delta` events carry text appended to a field ({"field", "text"}) as tokens arrive,
+    `result` carries the validated EmailResponse, and `error` reports a failure.
+    The email is sent after the stream completes.
+    """
+    params = request_params(email_request)
+
+    async def events():
+        sent = {}
+        try:
+            async for kind, payload in stream_email_content(params, use_cache=use_cache):
+                if kind == "partial":
+                    for event, data in field_deltas(sent, payload):
+                        yield format_sse(event, data)
+                    sent = payload
+                else:
+                    background_tasks.add_task(send_email, payload)
+                    yield format_sse("result", jsonable_encoder(payload))
+        except Exception as e:
+            logger.error(f"Error streaming email for {email_request.prospect_info.company_name}'s {email_request.prospect_info.prospect_email}: {e}")
+            yield format_sse("error", {"detail": "Email generation failed."})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks,
+    )
 
-    except Exception as e:
-        logger.error(f"Bulk email processing failed: {e}")
-        raise HTTPException(status_code=500, detail="Bulk email processing failed.")
\ No newline at end of file
+
+@router.post("/bulk")
+async def generate_and_send_bulk_email(file: UploadFile = File(...), use_cache: bool = True, result_format: Optional[str] = None) -> StreamingResponse:
+    """
+    Generates and sends an email to every prospect in an uploaded file, streaming the results
+    as NDJSON (one JSON object per line) while the file is processed.
+
+    Accepts every format `read_file` supports (CSV, TSV, JSON, JSON Lines, Excel, Parquet,
+    Feather/Arrow). Each prospect gets a "result", "error" or "rejected" line as soon as it
+    completes, and the stream ends with a "summary" line (see
+    `app.services.process_files.stream_email_outreach`). Rows are only generated as fast as
+    the client reads the stream.
+
+    Results are also saved as `result_format` under a name unique to this request; the
+    summary carries its download URL, and `rejects_url` for the rejected rows, if any.
+    """
+    from app.services.process_files import stream_email_outreach  # Deferred: pulls in pandas and the whole pipeline
+
+    if not file.filename or not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        raise HTTPException(status_code=400, detail=f"Unsupported file format. Use one of {list(SUPPORTED_EXTENSIONS)}.")
+    result_format = result_format or settings.result_format
+    if result_format not in RESULT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported result format. Use one of {list(RESULT_FORMATS)}.")
+
+    # Stream the upload to disk
+    file_path, _ = await save_upload(file, settings.upload_dir, settings.upload_chunk_size)
+    output_file = os.path.join(settings.upload_dir, f"processed_email_{uuid.uuid4().hex}{RESULT_FORMATS[result_format][0]}")
+
+    async def lines():
+        try:
+            async for event in stream_email_outreach(file_path, output_file, use_cache=use_cache):
+                if event["type"] == "summary":
+                    event["download_url"] = f"/outreach/download/{os.path.basename(output_file)}" if event.pop("output_file") else None
+                    rejects_file = event.pop("rejects_file")
+                    event["rejects_url"] = f"/outreach/download/{os.path.basename(rejects_file)}" if rejects_file else None
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Bulk email processing failed: {e}")
+            yield json.dumps({"type": "error", "detail": "Bulk email processing failed."}) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
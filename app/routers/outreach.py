@@ -1,62 +1,188 @@
-import os
 import asyncio
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import os
+from typing import List, Optional
+
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 from fastapi.responses import FileResponse
 from loguru import logger
 
-from app.services.process_files import process_outreach
+from app.core.settings import settings
+from app.schemas.outreach import ContactStatus, JobProgress, JobStatus, SuppressionRequest
+from app.services.generation import token_usage
+from app.services.jobs import job_manager, job_status
+from app.services.result_writer import RESULT_FORMATS, negotiate_result_format, result_format_of, result_variant
+from app.services.suppression import contact_index
+from app.utils.uploads import save_upload
 
 router = APIRouter(prefix="/outreach", tags=["Outreach"])
 
-UPLOAD_DIR = "uploads"
+UPLOAD_DIR = settings.upload_dir
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 @router.post("/process")
-async def process_outreach_file(file: UploadFile = File(...)):
+async def process_outreach_file(file: UploadFile = File(...), use_cache: bool = True, result_format: Optional[str] = None):
     """
-    Uploads a file and processes outreach (email or call) asynchronously in the background.
-    Returns a download link for the processed results.
+    Uploads a file and queues an outreach (email or call) job for it.
+    Returns the job's status URL and a download link for the processed results.
+
+    Results are written as `result_format` (csv, csv.gz, csv.zst, parquet or arrow;
+    defaults to settings.result_format). Downloads can still ask for any other format.
+
+    Uploads are stored under their content hash. If the same file was already processed
+    (or is queued or being processed), the existing job is returned instead of re-running
+    the pipeline. Pass use_cache=false to regenerate every row instead of reusing cached results.
     """
     if not file.filename:
         raise HTTPException(status_code=400, detail="Invalid file. Filename cannot be None.")
+    if result_format is not None and result_format not in RESULT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported result format. Use one of {list(RESULT_FORMATS)}.")
 
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    
-    # Save uploaded file
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+    # Stream the upload to disk
+    file_path, content_hash = await save_upload(file, UPLOAD_DIR, settings.upload_chunk_size)
 
     logger.info(f"File {file.filename} uploaded successfully.")
 
-    # Determine output file name
-    output_filename = f"processed_{file.filename}"
-    output_path = os.path.join(UPLOAD_DIR, output_filename)
+    if use_cache:
+        existing = await job_manager.find_reusable(content_hash)
+        if existing is not None:
+            logger.info(f"{file.filename} matches job {existing['id']} ({existing['status']}); reusing it")
+            status = job_status(existing)
+            return {
+                "message": "This file was already processed." if status.status == "done" else "This file is already queued for processing.",
+                "job_id": status.job_id,
+                "status_url": status.status_url,
+                "download_url": status.download_url,
+            }
 
-    # 🔥 Run process_outreach properly and catch errors
-    async def run_processing():
-        try:
-            logger.info(f"Starting background task for {file_path}")
-            await process_outreach(file_path, output_path)
-            logger.info(f"Processing completed for {file_path}")
-        except Exception as e:
-            logger.error(f"Error in process_outreach: {e}")
-
-    asyncio.create_task(run_processing())
+    job = await job_manager.submit(file_path, content_hash, file.filename, UPLOAD_DIR, use_cache=use_cache, result_format=result_format)
+    status = job_status(job)
 
     return {
-        "message": "Processing started in the background. Check back for results.",
-        "download_url": f"/outreach/download/{output_filename}"
+        "message": "Processing queued in the background. Poll the status URL for progress.",
+        "job_id": status.job_id,
+        "status_url": status.status_url,
+        "download_url": status.download_url,
     }
 
 
+@router.get("/jobs", response_model=List[JobStatus])
+async def list_jobs(limit: int = 50):
+    """
+    Lists the most recent outreach jobs.
+    """
+    return [job_status(job) for job in await job_manager.list(limit)]
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """
+    Returns the status, progress and ETA of an outreach job.
+    """
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+@router.get("/jobs/{job_id}/progress", response_model=JobProgress)
+async def get_job_progress(job_id: str):
+    """
+    Returns only the progress counters and ETA of an outreach job.
+    """
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobProgress(**job_status(job).model_dump(include=set(JobProgress.model_fields)))
+
+
+@router.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    """
+    Cancels a queued or running outreach job.
+    """
+    job = await job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+@router.post("/suppressions")
+async def add_suppressions(request: SuppressionRequest):
+    """
+    Adds unsubscribed or do-not-call contacts to the suppression index. They are skipped by every later job.
+    """
+    count = await contact_index.suppress(request.channel, request.contacts, request.reason)
+    return {"suppressed": count}
+
+
+@router.post("/suppressions/release")
+async def release_suppressions(request: SuppressionRequest):
+    """
+    Removes contacts from the suppression index, lifting suppressions and contact cooldowns.
+    """
+    count = await contact_index.release(request.channel, request.contacts)
+    return {"released": count}
+
+
+@router.get("/suppressions/{channel}/{contact}", response_model=ContactStatus)
+async def get_contact_status(channel: str, contact: str):
+    """
+    Returns a contact's suppression and last-contacted state.
+    """
+    status = await contact_index.status(channel, contact)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return status
+
+
+@router.get("/token-usage")
+async def get_token_usage():
+    """
+    Returns LLM requests, cache hits and token totals per generator since this process started.
+    """
+    return {"total_tokens": token_usage.total(), "generators": token_usage.snapshot()}
+
+
 @router.get("/download/{filename}")
-async def download_processed_file(filename: str):
+async def download_processed_file(filename: str, request: Request, format: Optional[str] = None):
     """
     Allows users to download the processed outreach results file.
+
+    The format is picked with `?format=` (csv, csv.gz, csv.zst, parquet or arrow) or
+    negotiated from the Accept header (text/csv, application/vnd.apache.parquet,
+    application/vnd.apache.arrow.file, ...). CSV is sent gzip or zstd encoded when the
+    client's Accept-Encoding allows it. Other formats are converted on first request and
+    kept next to the original. Range requests are supported, so large downloads can be
+    resumed or fetched in parallel.
     """
+    if os.path.basename(filename) != filename:
+        raise HTTPException(status_code=404, detail="File not found")
     file_path = os.path.join(UPLOAD_DIR, filename)
     
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="File not found")
 
-    return FileResponse(file_path, filename=filename, media_type="text/csv")
+    stored = result_format_of(file_path)
+    if format is not None:
+        if format not in RESULT_FORMATS:
+            raise HTTPException(status_code=400, detail=f"Unsupported format. Use one of {list(RESULT_FORMATS)}.")
+        served, transparent = format, False
+    else:
+        negotiated = negotiate_result_format(stored, request.headers.get("accept"), request.headers.get("accept-encoding"))
+        if negotiated is None:
+            raise HTTPException(status_code=406, detail=f"Results are available as {list(RESULT_FORMATS)}.")
+        served, transparent = negotiated
+
+    if served != stored:
+        file_path = await asyncio.to_thread(result_variant, file_path, served)
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    media_type = RESULT_FORMATS[served][1]
+    download_name = os.path.basename(file_path)
+    if transparent:
+        # Compressed CSV sent as CSV: the client decompresses it on the fly.
+        headers["Content-Encoding"] = RESULT_FORMATS[served][2]
+        media_type = "text/csv"
+        download_name = os.path.basename(file_path)[:-len(RESULT_FORMATS[served][0])] + ".csv"
+
+    return FileResponse(file_path, filename=download_name, media_type=media_type, headers=headers)
@@ -25,3 +25,32 @@ class CallResponse(BaseModel):
     call_script: str = Field(..., description="The AI-generated engaging cold call script to be used during the call.")
     engagement_advice: str = Field(..., description="A **follow-up strategy** and recommendations to keep the client engaged.")
     call_status: Optional[str] = Field(None, description="The status of the call after execution (e.g., 'queued', 'completed', 'failed').")
+    call_sid: Optional[str] = Field(None, description="The Twilio SID of the placed call.")
+
+class CallDispatchResult(BaseModel):
+    """
+    Schema for the outcome of placing a call through Twilio.
+    """
+    prospect_phone: str = Field(..., description="The phone number that was dialed.")
+    call_sid: Optional[str] = Field(None, description="The Twilio SID of the call.")
+    call_status: Optional[str] = Field(None, description="The status reported by Twilio (e.g., 'queued', 'ringing').")
+
+class CallFailure(BaseModel):
+    """
+    Schema for a prospect whose call could not be scripted or placed.
+    """
+    prospect_phone: str = Field(..., description="The phone number of the prospect.")
+    detail: str = Field(..., description="Why the call failed.")
+
+class BulkCallRequest(BaseModel):
+    """
+    Schema for generating call scripts and placing calls for several prospects.
+    """
+    prospects: List[CallRequest] = Field(..., min_length=1, description="The prospects to call.")
+
+class BulkCallResponse(BaseModel):
+    """
+    Schema for the outcome of a bulk call request.
+    """
+    results: List[CallResponse] = Field(default_factory=list, description="Generated scripts and call outcomes, in request order.")
+    failed: List[CallFailure] = Field(default_factory=list, description="Prospects whose call could not be scripted or placed.")
@@ -0,0 +1,63 @@
+import re
+from typing import Iterable
+
+from pydantic import BaseModel, Field, field_validator
+
+# Placeholders a campaign template may use; CampaignGenerator fills exactly these per prospect
+TEMPLATE_PLACEHOLDERS = frozenset({"prospect_name", "company_name", "prospect_title", "personal_opening", "objection_handling"})
+PLACEHOLDER_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+def check_placeholders(template: str, required: Iterable[str] = ()) -> str:
+    """
+    Checks that a template only uses known placeholders and contains the required ones.
+
+    Raises:
+        ValueError: If it uses an unknown placeholder or lacks a required one.
+    """
+    used = set(PLACEHOLDER_PATTERN.findall(template))
+    unknown = used - TEMPLATE_PLACEHOLDERS
+    if unknown:
+        raise ValueError(f"unknown placeholders: {', '.join('{' + name + '}' for name in sorted(unknown))}")
+    missing = set(required) - used
+    if missing:
+        raise ValueError(f"missing placeholders: {', '.join('{' + name + '}' for name in sorted(missing))}")
+    return template
+
+class CampaignEmailTemplate(BaseModel):
+    """
+    Schema for reusable email material generated once per campaign group.
+    """
+    subject_template: str = Field(..., description="Subject line template; may use {prospect_name} and {company_name}.")
+    body_template: str = Field(..., description="Email body template with {prospect_name}, {company_name}, {prospect_title}, {personal_opening} and {objection_handling} placeholders.")
+    pitch_summary: str = Field(..., description="One-sentence summary of the offer, used to brief per-prospect personalization.")
+
+    @field_validator("subject_template")
+    @classmethod
+    def _check_subject(cls, value: str) -> str:
+        return check_placeholders(value)
+
+    @field_validator("body_template")
+    @classmethod
+    def _check_body(cls, value: str) -> str:
+        return check_placeholders(value, required=("personal_opening",))
+
+class CampaignCallTemplate(BaseModel):
+    """
+    Schema for a reusable call script generated once per campaign group.
+    """
+    script_template: str = Field(..., description="Call script template with {prospect_name}, {company_name}, {prospect_title}, {personal_opening} and {objection_handling} placeholders.")
+    pitch_summary: str = Field(..., description="One-sentence summary of the offer, used to brief per-prospect personalization.")
+
+    @field_validator("script_template")
+    @classmethod
+    def _check_script(cls, value: str) -> str:
+        return check_placeholders(value, required=("personal_opening",))
+
+class ProspectPersonalization(BaseModel):
+    """
+    Schema for the short per-prospect output used to fill a campaign template.
+    """
+    personal_opening: str = Field(..., description="One or two opening sentences tailored to the prospect and their company.")
+    objection_handling: str = Field(..., description="One or two sentences addressing the prospect's likely objections.")
+    engagement_advice: str = Field(..., description="A short follow-up strategy for this prospect.")
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+class JobProgress(BaseModel):
+    """
+    Schema for the progress of an outreach job.
+    """
+    job_id: str = Field(..., description="The job identifier.")
+    status: str = Field(..., description="One of 'queued', 'running', 'done', 'failed' or 'cancelled'.")
+    total_rows: Optional[int] = Field(None, description="Estimated number of rows in the input file, if known.")
+    processed_rows: int = Field(0, description="Rows processed so far, including failed rows.")
+    failed_rows: int = Field(0, description="Rows that failed so far.")
+    percent_complete: Optional[float] = Field(None, description="Processed rows as a percentage of total rows, if known.")
+    eta_seconds: Optional[float] = Field(None, description="Estimated seconds until the job completes, while it is running.")
+
+class JobStatus(JobProgress):
+    """
+    Schema for the full status of an outreach job.
+    """
+    filename: Optional[str] = Field(None, description="The name of the uploaded file.")
+    content_hash: str = Field(..., description="SHA-256 of the uploaded file content.")
+    created_at: float = Field(..., description="Unix time the job was submitted.")
+    started_at: Optional[float] = Field(None, description="Unix time the job started running.")
+    finished_at: Optional[float] = Field(None, description="Unix time the job finished.")
+    error: Optional[str] = Field(None, description="The error message if the job failed.")
+    download_url: str = Field(..., description="Where to download the results once the job is done.")
+    rejects_url: Optional[str] = Field(None, description="Where to download the rows rejected by validation, if any.")
+    status_url: str = Field(..., description="Where to poll for job status.")
+
+class SuppressionRequest(BaseModel):
+    """
+    Schema for adding contacts to, or releasing them from, the suppression index.
+    """
+    channel: Literal["email", "call"] = Field(..., description="The outreach channel the contacts belong to.")
+    contacts: List[str] = Field(..., description="Email addresses (email channel) or phone numbers (call channel).")
+    reason: Literal["unsubscribed", "do_not_call"] = Field("unsubscribed", description="Why the contacts are suppressed. Ignored when releasing.")
+
+class ContactStatus(BaseModel):
+    """
+    Schema for a contact's entry in the suppression index.
+    """
+    channel: str = Field(..., description="The outreach channel.")
+    contact: str = Field(..., description="The normalized email address or E.164 phone number.")
+    last_contacted_at: Optional[float] = Field(None, description="Unix time the contact was last reached on this channel.")
+    suppressed: Optional[str] = Field(None, description="The suppression reason, if the contact must never be reached.")
@@ -1,25 +1,23 @@
 from typing import Dict
 
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from loguru import logger
-from twilio.rest import Client
 from twilio.twiml.voice_response import VoiceResponse
 
 from app.core.settings import settings
-from app.core.config import llama3_70b_llm
-from app.schemas.call import CallResponse
+from app.core.config import LLAMA3_70B
+from app.core.metrics import timed
+from app.schemas.call import CallDispatchResult, CallResponse
 from app.services.email import get_industry_focus 
+from app.services.generation import StructuredGenerator
+from app.services.packing import PackedGenerator, normalize_phone
+from app.services.tiering import FULL_MODEL, SMALL_MODEL, TEMPLATE, choose_tier, record_tier, render_call
+from app.services.twilio_dispatcher import twilio_dispatcher
 
-TWILIO_ACCOUNT_SID = settings.twilio_account_sid.get_secret_value()
-TWILIO_AUTH_TOKEN = settings.twilio_auth_token.get_secret_value()
 TWILIO_PHONE_NUMBER = settings.twilio_phone_number
 TWILIO_VERIFIED_PHONE_NUMBER = settings.twilio_verified_phone_number
 
-
-# Initialize Twilio client
-client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-
 # Call Script Generation Prompt
 call_prompt = """
 You are an AI-powered Cold Call Assistant for an insurance company. Your task is to generate **highly engaging and persuasive call scripts** for cold outreach based on the input. Ensure the script is natural and engaging. For the engagement advise, act as a sales engagement advisor, offering follow-up engagement advice for a prospect considering the input below. Offer actionable suggestions to improve response rates.
@@ -48,6 +46,29 @@ Input:
 }}
 """
 
+# Several prospects per request; entries are matched back by prospect_phone
+packed_call_prompt = """
+You are an AI-powered Cold Call Assistant for an insurance company. Generate one **highly engaging and persuasive call script** for EACH of the {count} prospects below, tailored to that prospect's details. Ensure each script is natural and engaging. For each one, also act as a sales engagement advisor and give follow-up engagement advice with actionable suggestions to improve response rates.
+
+---
+
+{prospects}
+
+---
+
+### **Call Script Format (Strict JSON)**
+Return exactly one entry per prospect and copy each prospect's phone number exactly as given:
+{{
+  "results": [
+    {{
+      "prospect_phone": "[Prospect's phone]",
+      "call_script": "[Generated cold call script]",
+      "engagement_advice": "[Follow-up strategy and recommendations]"
+    }}
+  ]
+}}
+"""
+
 # JSON Parser
 parser = JsonOutputParser(pydantic_object=CallResponse)
 
@@ -70,22 +91,58 @@ call_prompt_template = PromptTemplate(
     partial_variables={"format_instructions": parser.get_format_instructions()}
 )
 
-async def generate_call_script(params: Dict) -> CallResponse:
+# Prebuilt generator, shared by every request
+call_generator = StructuredGenerator(call_prompt_template, CallResponse, LLAMA3_70B, parser, name="call")
+
+call_packer = PackedGenerator(
+    call_generator,
+    PromptTemplate(template=packed_call_prompt, input_variables=["prospects", "count"]),
+    key_field="prospect_phone",
+    item_fields=call_prompt_template.input_variables,
+    normalize_key=normalize_phone,
+)
+
+# Smaller, faster model for mid-tier prospects (settings.tiered_generation); never routed to the full models
+call_small_generator = StructuredGenerator(call_prompt_template, CallResponse, settings.tier_small_model, parser, name="call_small", router_models=[])
+
+call_small_packer = PackedGenerator(
+    call_small_generator,
+    call_packer.packed_template,
+    key_field="prospect_phone",
+    item_fields=call_prompt_template.input_variables,
+    normalize_key=normalize_phone,
+)
+
+@timed("generate_call")
+async def generate_call_script(params: Dict, use_cache: bool = True, pack: bool = True) -> CallResponse:
     """
     Generate a cold call script using LangChain.
+
+    Set use_cache to False to force a fresh generation for this request. With
+    settings.pack_size > 1 and pack=True, concurrent calls share packed LLM requests.
+    With settings.tiered_generation, the prospect's tier picks a template, the small
+    model or the full model (see `app.services.tiering.choose_tier`).
     """
     # Compute industry focus and add to parameters
     params["industry_focus"] = get_industry_focus(params["industry"])
+    tier = choose_tier(params, "call") if settings.tiered_generation else FULL_MODEL
+    record_tier("call", tier)
+    if tier == TEMPLATE:
+        return render_call(params)
 
     # Execute prompt chain
-    chain = call_prompt_template | llama3_70b_llm | parser
-    response_dict = await chain.ainvoke(params)
+    if tier == SMALL_MODEL:
+        generator = call_small_packer if pack else call_small_generator
+    else:
+        generator = call_packer if pack else call_generator
+    response = await generator.agenerate(params, use_cache=use_cache)
 
-    logger.info(f"Generated call output {response_dict}")
+    logger.info(f"Generated call output {response.model_dump()}")
 
-    return CallResponse.model_validate(response_dict)
+    return response
 
-async def make_call(phone_number: str, script: str):
+@timed("make_call")
+async def make_call(phone_number: str, script: str) -> CallDispatchResult:
     """
     Initiates a call to the prospect using Twilio.
 
@@ -94,21 +151,17 @@ async def make_call(phone_number: str, script: str):
         script (str): The call script to be read.
 
     Returns:
-        str: Call status (e.g., 'completed', 'failed').
+        CallDispatchResult: Call SID and status (e.g., 'queued', 'ringing').
     """
 
     twiml_response = VoiceResponse()
     twiml_response.say(script, voice='alice')
 
     try:
-        call = client.calls.create(
-            to=phone_number,
-            from_=TWILIO_PHONE_NUMBER,
-            twiml=twiml_response.to_xml()
-        )
-
-        logger.info(f"Call initiated to {phone_number}. Call SID: {call.sid}")
-        return call.status  # Status: queued, ringing, in-progress, completed, failed
+        call = await twilio_dispatcher.place_call(phone_number, twiml_response.to_xml())
+
+        logger.info(f"Call initiated to {phone_number}. Call SID: {call.call_sid}")
+        return call  # Status: queued, ringing, in-progress, completed, failed
 
     except Exception as e:
         logger.error(f"Failed to initiate call to {phone_number}: {e}")
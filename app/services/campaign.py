@@ -0,0 +1,193 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import JsonOutputParser
+from loguru import logger
+
+from app.core.config import LLAMA3_70B
+from app.schemas.call import CallResponse
+from app.core.settings import settings
+from app.schemas.campaign import PLACEHOLDER_PATTERN, CampaignCallTemplate, CampaignEmailTemplate, ProspectPersonalization
+from app.schemas.email import EmailResponse
+from app.services.email import get_industry_focus
+from app.services.generation import StructuredGenerator
+
+# Fields that are usually identical across a campaign's rows. Rows sharing them share one template.
+CAMPAIGN_FIELDS = ["outreach_description", "insurance_company_name", "sender_name", "sender_title", "industry_focus"]
+
+campaign_email_prompt = """
+You are an AI-powered Cold Outreach Assistant for an insurance company. Write a **reusable cold email template** for the campaign below. The template will be sent to many prospects, so use these placeholders exactly where prospect details belong: {{prospect_name}}, {{company_name}}, {{prospect_title}}, {{personal_opening}} (a tailored opening, written separately per prospect) and {{objection_handling}} (a tailored answer to the prospect's objections).
+
+---
+Campaign:
+- **Outreach Description**: {outreach_description}
+- **Industry Focus**: {industry_focus}
+- **Sender's Company Name**: {insurance_company_name}
+- **Sender's Name**: {sender_name}
+- **Sender's Title at Company**: {sender_title}
+---
+
+The body must follow: greeting, {{personal_opening}}, value proposition, {{objection_handling}}, a call to action (quick call, demo or free consultation), and the sender's signature.
+
+### **Output Format (Strict JSON)**
+{{
+  "subject_template": "[Compelling subject line]",
+  "body_template": "[Email template with placeholders]",
+  "pitch_summary": "[One-sentence summary of the offer]"
+}}
+"""
+
+campaign_call_prompt = """
+You are an AI-powered Cold Call Assistant for an insurance company. Write a **reusable, natural cold call script template** for the campaign below. Use these placeholders exactly where prospect details belong: {{prospect_name}}, {{company_name}}, {{prospect_title}}, {{personal_opening}} (a tailored opening, written separately per prospect) and {{objection_handling}} (a tailored answer to the prospect's objections).
+
+---
+Campaign:
+- **Outreach Description**: {outreach_description}
+- **Industry Focus**: {industry_focus}
+- **Sender's Company Name**: {insurance_company_name}
+- **Sender's Name**: {sender_name}
+- **Sender's Title at Company**: {sender_title}
+---
+
+### **Call Script Format (Strict JSON)**
+{{
+  "script_template": "[Call script template with placeholders]",
+  "pitch_summary": "[One-sentence summary of the offer]"
+}}
+"""
+
+# Only the fields that differ per prospect are sent here.
+personalization_prompt = """
+Personalize a cold {channel} for one prospect. Offer: {pitch_summary}
+Prospect: {prospect_name}, {prospect_title} at {company_name} ({industry}). Engagement level {engagement_level}/4. Objections: {objections}.
+Reply with strict JSON only:
+{{"personal_opening": "[1-2 sentences]", "objection_handling": "[1-2 sentences]", "engagement_advice": "[short follow-up strategy]"}}
+"""
+
+campaign_email_generator = StructuredGenerator(
+    PromptTemplate(template=campaign_email_prompt, input_variables=["outreach_description", "industry_focus", "insurance_company_name", "sender_name", "sender_title"]),
+    CampaignEmailTemplate,
+    LLAMA3_70B,
+    JsonOutputParser(pydantic_object=CampaignEmailTemplate),
+    name="campaign_email_template",
+)
+
+campaign_call_generator = StructuredGenerator(
+    PromptTemplate(template=campaign_call_prompt, input_variables=["outreach_description", "industry_focus", "insurance_company_name", "sender_name", "sender_title"]),
+    CampaignCallTemplate,
+    LLAMA3_70B,
+    JsonOutputParser(pydantic_object=CampaignCallTemplate),
+    name="campaign_call_template",
+)
+
+personalization_generator = StructuredGenerator(
+    PromptTemplate(template=personalization_prompt, input_variables=["channel", "pitch_summary", "prospect_name", "prospect_title", "company_name", "industry", "engagement_level", "objections"]),
+    ProspectPersonalization,
+    LLAMA3_70B,
+    JsonOutputParser(pydantic_object=ProspectPersonalization),
+    name="campaign_personalization",
+)
+
+def fill_template(template: str, values: Dict[str, Any]) -> str:
+    """
+    Replaces {placeholder}s with values. Braces inside the values are never interpreted.
+
+    Raises:
+        ValueError: If the template uses a placeholder without a value, so an unfilled
+            template is never sent.
+    """
+    unknown = sorted(set(PLACEHOLDER_PATTERN.findall(template)) - values.keys())
+    if unknown:
+        raise ValueError(f"Template has placeholders without values: {', '.join(unknown)}")
+    return PLACEHOLDER_PATTERN.sub(lambda m: str(values[m.group(1)]), template)
+
+
+def campaign_key(params: Dict[str, Any]) -> Tuple[str, ...]:
+    return tuple(str(params.get(field) or "") for field in CAMPAIGN_FIELDS)
+
+
+class CampaignGenerator:
+    """
+    Generates outreach in two steps: one template per campaign group, then a short
+    per-prospect personalization that fills it.
+
+    The template prompt carries the shared fields (description, sender, industry focus)
+    and is sent once per group. Concurrent rows of the same group wait on the same
+    request. Per-prospect requests carry only the fields that differ between rows.
+
+    Templates are kept for the most recent settings.campaign_template_cache_size groups;
+    an evicted group is answered from the LLM cache when it comes back.
+    """
+
+    def __init__(self, max_templates: Optional[int] = None):
+        self.max_templates = max_templates
+        self._templates: "OrderedDict[Tuple[str, ...], asyncio.Future]" = OrderedDict()
+
+    async def _template(self, channel: str, params: Dict[str, Any], use_cache: bool):
+        key = (channel, *campaign_key(params))
+        future = self._templates.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            generator = campaign_email_generator if channel == "email" else campaign_call_generator
+            future = asyncio.ensure_future(generator.agenerate(params, use_cache=use_cache))
+            self._templates[key] = future
+            logger.info(f"Generating {channel} campaign template for {params.get('insurance_company_name')} ({params.get('industry_focus')})")
+        self._templates.move_to_end(key)
+        limit = max(1, self.max_templates or settings.campaign_template_cache_size)
+        while len(self._templates) > limit:
+            # Rows already waiting on an evicted template hold their own reference to it
+            self._templates.popitem(last=False)
+        return await asyncio.shield(future)
+
+    async def _personalize(self, channel: str, pitch_summary: str, params: Dict[str, Any], use_cache: bool) -> ProspectPersonalization:
+        objections = params.get("objections")
+        if isinstance(objections, list):
+            objections = ", ".join(o.strip() for o in objections if o and o.strip())
+        return await personalization_generator.agenerate(
+            {
+                "channel": "email" if channel == "email" else "call script",
+                "pitch_summary": pitch_summary,
+                "prospect_name": params.get("prospect_name"),
+                "prospect_title": params.get("prospect_title") or "",
+                "company_name": params.get("company_name"),
+                "industry": params.get("industry"),
+                "engagement_level": params.get("engagement_level"),
+                "objections": objections or "none stated",
+            },
+            use_cache=use_cache,
+        )
+
+    def _values(self, params: Dict[str, Any], personalization: ProspectPersonalization) -> Dict[str, Any]:
+        return {
+            "prospect_name": params.get("prospect_name") or "",
+            "company_name": params.get("company_name") or "",
+            "prospect_title": params.get("prospect_title") or "",
+            "personal_opening": personalization.personal_opening,
+            "objection_handling": personalization.objection_handling,
+        }
+
+    async def generate_email(self, params: Dict[str, Any], use_cache: bool = True) -> EmailResponse:
+        params["industry_focus"] = get_industry_focus(params["industry"])
+        template: CampaignEmailTemplate = await self._template("email", params, use_cache)
+        personalization = await self._personalize("email", template.pitch_summary, params, use_cache)
+        values = self._values(params, personalization)
+        return EmailResponse(
+            prospect_email=params["prospect_email"],
+            subject=fill_template(template.subject_template, values),
+            email=fill_template(template.body_template, values),
+            engagement_advice=personalization.engagement_advice,
+        )
+
+    async def generate_call(self, params: Dict[str, Any], use_cache: bool = True) -> CallResponse:
+        params["industry_focus"] = get_industry_focus(params["industry"])
+        template: CampaignCallTemplate = await self._template("call", params, use_cache)
+        personalization = await self._personalize("call", template.pitch_summary, params, use_cache)
+        return CallResponse(
+            prospect_phone=str(params["prospect_phone"]),
+            call_script=fill_template(template.script_template, self._values(params, personalization)),
+            engagement_advice=personalization.engagement_advice,
+        )
+
+
+campaign_generator = CampaignGenerator()
@@ -0,0 +1,82 @@
+import json
+import time
+from typing import Any, Dict, Iterable, List
+
+from app.core.database import Database, db
+
+CHECKPOINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outreach_checkpoints (
+    job_key TEXT NOT NULL,
+    row_id TEXT NOT NULL,
+    result TEXT NOT NULL,
+    completed_at REAL NOT NULL,
+    PRIMARY KEY (job_key, row_id)
+);
+"""
+
+# Stay well below SQLite's bound-parameter limit.
+_LOOKUP_CHUNK = 500
+
+
+def make_row_id(index: Any, row: Dict[str, Any]) -> str:
+    """
+    Stable ID of a row within its input file: file position plus the contact address.
+    """
+    contact = row.get("prospect_email") if row.get("outreach_type") == "email" else row.get("prospect_phone")
+    return f"{index}:{contact}"
+
+
+class CheckpointStore:
+    """
+    Durable record of completed outreach rows, keyed by job.
+
+    A row is checkpointed (with its full result) the moment it completes, before it is
+    written to the ordered output. A restarted job replays checkpointed rows from here
+    instead of regenerating or re-sending them.
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self._schema_ready = False
+
+    async def _ensure_schema(self) -> None:
+        if not self._schema_ready:
+            await self.database.executescript(CHECKPOINT_SCHEMA)
+            self._schema_ready = True
+
+    async def mark(self, job_key: str, row_id: str, result: Dict[str, Any]) -> None:
+        await self._ensure_schema()
+        await self.database.execute(
+            "INSERT OR REPLACE INTO outreach_checkpoints (job_key, row_id, result, completed_at) VALUES (?, ?, ?, ?)",
+            (job_key, row_id, json.dumps(result, default=str), time.time()),
+        )
+
+    async def lookup(self, job_key: str, row_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the stored results of whichever of `row_ids` are already completed.
+        """
+        await self._ensure_schema()
+        ids: List[str] = list(row_ids)
+        completed: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(ids), _LOOKUP_CHUNK):
+            chunk = ids[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = await self.database.fetchall(
+                f"SELECT row_id, result FROM outreach_checkpoints WHERE job_key = ? AND row_id IN ({placeholders})",
+                (job_key, *chunk),
+            )
+            for row in rows:
+                completed[row["row_id"]] = json.loads(row["result"])
+        return completed
+
+    async def count(self, job_key: str) -> int:
+        await self._ensure_schema()
+        row = await self.database.fetchone("SELECT COUNT(*) AS n FROM outreach_checkpoints WHERE job_key = ?", (job_key,))
+        return row["n"] if row else 0
+
+    async def clear(self, job_key: str) -> None:
+        await self._ensure_schema()
+        await self.database.execute("DELETE FROM outreach_checkpoints WHERE job_key = ?", (job_key,))
+
+
+checkpoints = CheckpointStore(db)
@@ -0,0 +1,211 @@
+import asyncio
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from loguru import logger
+
+from app.core.metrics import call_buffer_depth
+from app.core.settings import settings
+from app.schemas.call import CallDispatchResult, CallResponse
+
+
+def _parse_time(value: str) -> Optional[dt_time]:
+    return dt_time.fromisoformat(value) if value else None
+
+
+class CallingWindow:
+    """
+    Weekly schedule of when calls may be placed, e.g. 09:00-17:00 Monday to Friday.
+
+    `end` before `start` means the window runs past midnight. Without `start` and `end`
+    the window is always open.
+    """
+
+    def __init__(self, start: Optional[dt_time] = None, end: Optional[dt_time] = None, days: Sequence[int] = range(7), timezone: str = "UTC"):
+        self.start = start
+        self.end = end
+        self.days = set(days)
+        self.tz = ZoneInfo(timezone)
+
+    @classmethod
+    def from_settings(cls) -> "CallingWindow":
+        return cls(
+            start=_parse_time(settings.call_window_start),
+            end=_parse_time(settings.call_window_end),
+            days=settings.call_window_days,
+            timezone=settings.call_window_timezone,
+        )
+
+    @property
+    def always_open(self) -> bool:
+        return self.start is None or self.end is None
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        if self.always_open:
+            return True
+        now = (now or datetime.now(self.tz)).astimezone(self.tz)
+        moment = now.time()
+        if self.start <= self.end:
+            return now.weekday() in self.days and self.start <= moment < self.end
+        # Overnight window: the part after midnight belongs to the previous day's window.
+        return (now.weekday() in self.days and moment >= self.start) or ((now.weekday() - 1) % 7 in self.days and moment < self.end)
+
+    def next_open(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Returns when the window next opens, `now` if it is open, or None if it never opens.
+        """
+        now = (now or datetime.now(self.tz)).astimezone(self.tz)
+        if self.is_open(now):
+            return now
+        for offset in range(8):
+            day = now.date() + timedelta(days=offset)
+            opens = datetime.combine(day, self.start, tzinfo=self.tz)
+            if day.weekday() in self.days and opens > now:
+                return opens
+        return None
+
+    def seconds_until_open(self, now: Optional[datetime] = None) -> float:
+        now = (now or datetime.now(self.tz)).astimezone(self.tz)
+        opens = self.next_open(now)
+        if opens is None:
+            return float("inf")
+        return max(0.0, (opens - now).total_seconds())
+
+    async def wait(self) -> None:
+        """
+        Sleeps until the window is open. Re-checks at least every minute, so clock changes
+        (and DST) are picked up.
+        """
+        while (delay := self.seconds_until_open()) > 0:
+            if delay == float("inf"):
+                raise RuntimeError("The calling window has no open days")
+            await asyncio.sleep(min(delay, 60.0))
+
+
+class Dialer:
+    """
+    Dialer stage of the call pipeline: places calls from a bounded buffer of generated
+    scripts, with `concurrency` calls in flight and only while `window` is open.
+
+    Producers block in `submit` while the buffer is full, so script generation never runs
+    more than `buffer_size` scripts ahead of dialing.
+    """
+
+    def __init__(
+        self,
+        dial: Callable[[str, str], Awaitable[CallDispatchResult]],
+        concurrency: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+        window: Optional[CallingWindow] = None,
+    ):
+        self.dial = dial
+        self.concurrency = max(1, concurrency or settings.dial_concurrency)
+        self.buffer_size = max(1, buffer_size or settings.call_script_buffer_size)
+        self.window = window or CallingWindow.from_settings()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._workers:
+            self._queue = asyncio.Queue(self.buffer_size)
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, _, future = self._queue.get_nowait()
+                call_buffer_depth.labels().dec()
+                future.cancel()
+
+    async def submit(self, phone: str, script: str) -> asyncio.Future:
+        """
+        Queues a call, waiting for room in the buffer. Returns a future for its CallDispatchResult.
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((phone, script, future))  # type: ignore[union-attr]
+        call_buffer_depth.labels().inc()
+        return future
+
+    async def _work(self) -> None:
+        while True:
+            phone, script, future = await self._queue.get()  # type: ignore[union-attr]
+            call_buffer_depth.labels().dec()
+            if future.done():
+                continue  # Caller gave up
+            try:
+                if not self.window.is_open():
+                    logger.info(f"Outside the calling window; holding call to {phone} until {self.window.next_open()}")
+                await self.window.wait()
+                result = await self.dial(phone, script)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+
+class CallPipeline:
+    """
+    Two-stage call pipeline: call scripts are generated ahead, up to `generate_concurrency`
+    at a time, into the dialer's bounded buffer, while the dialer places calls from it.
+
+    The stages overlap, so dialing never waits on an LLM request and generation never waits
+    on Twilio, and the buffer keeps generation from racing ahead of the calling window.
+    Use as an async context manager, or call `close` when done.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[Dict[str, Any]], Awaitable[Optional[CallResponse]]],
+        dial: Callable[[str, str], Awaitable[CallDispatchResult]],
+        generate_concurrency: Optional[int] = None,
+        dial_concurrency: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+        window: Optional[CallingWindow] = None,
+    ):
+        self.generate = generate
+        self.generate_concurrency = max(1, generate_concurrency or settings.call_concurrency)
+        self.dialer = Dialer(dial, dial_concurrency, buffer_size, window)
+        self._generating = asyncio.Semaphore(self.generate_concurrency)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Rows the pipeline can hold at once (generating, buffered and dialing). Feed it at
+        least this many concurrent rows to keep both stages busy.
+        """
+        return self.generate_concurrency + self.dialer.buffer_size + self.dialer.concurrency
+
+    async def run(self, row: Dict[str, Any]) -> Tuple[Optional[CallResponse], Optional[CallDispatchResult]]:
+        """
+        Generates a call script for a row and places the call.
+
+        Returns:
+            tuple: (CallResponse, CallDispatchResult), or (response, None) if no script was generated.
+        """
+        async with self._generating:
+            response = await self.generate(row)
+            if not response or not response.call_script:
+                return response, None
+            # Hold the generation slot until the script is buffered, so generation pauses while the buffer is full.
+            call = await self.dialer.submit(row["prospect_phone"], response.call_script)
+        return response, await call
+
+    async def close(self) -> None:
+        await self.dialer.close()
+
+    async def __aenter__(self) -> "CallPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -1,27 +1,21 @@
-from langchain.prompts import PromptTemplate
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Any, AsyncIterator, List, Tuple
+
+from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 
-from fastapi_mail import FastMail, ConnectionConfig, MessageSchema, MessageType
 from loguru import logger
 
 from app.core.settings import settings
-from app.core.config import llama3_70b_llm
+from app.core.config import LLAMA3_70B
+from app.core.metrics import timed
 from app.schemas.email import EmailResponse
-
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.mail_username,
-    MAIL_PASSWORD=settings.mail_password,
-    MAIL_FROM=settings.mail_from,
-    MAIL_PORT=settings.mail_port,
-    MAIL_SERVER=settings.mail_server,
-    MAIL_FROM_NAME=settings.mail_from_name,
-    MAIL_STARTTLS=settings.mail_starttls,
-    MAIL_SSL_TLS=settings.mail_ssl_tls,
-    USE_CREDENTIALS=settings.use_credentials,
-    VALIDATE_CERTS=settings.validate_certs
-)
-
-fast_mail = FastMail(conf)
+from app.services.generation import StructuredGenerator
+from app.services.packing import PackedGenerator, normalize_email
+from app.services.snippets import DEFAULT_SNIPPETS, get_snippets
+from app.services.tiering import FULL_MODEL, SMALL_MODEL, TEMPLATE, choose_tier, record_tier, render_email
+from app.services.smtp_pool import smtp_pool
 
 
 prompt = """
@@ -56,15 +50,43 @@ Input:
 }}
 """
 
+# Several prospects per request; entries are matched back by prospect_email
+packed_prompt = """
+You are an AI-powered Cold Outreach Assistant for an insurance company specializing in personalized marketing. Craft one **highly engaging cold email** for EACH of the {count} prospects below, tailored to that prospect's details. For each one, also act as a sales engagement advisor and give follow-up engagement advice with actionable suggestions to improve response rates. Output only the JSON below, with no extra commentary.
+
+---
+
+{prospects}
+
+---
+
+### **Output Format (Strict JSON)**
+Return exactly one entry per prospect and copy each prospect's email exactly as given:
+{{
+  "results": [
+    {{
+      "prospect_email": "[Prospect's email]",
+      "subject": "[Compelling subject line]",
+      "email": "[Generated cold email]",
+      "engagement_advice": "[Follow-up strategy and recommendations]"
+    }}
+  ]
+}}
+"""
+
 # Define Industry-Specific Messaging
+industry_focus_map = {
+    "tech": "emphasize innovation and cutting-edge technology solutions.",
+    "finance": "highlight security and robust ROI potential.",
+    "healthcare": "stress compliance and efficiency.",
+}
+
 def get_industry_focus(industry: str) -> str:
-    industry = industry.lower()
-    industry_focus_map = {
-        "tech": "emphasize innovation and cutting-edge technology solutions.",
-        "finance": "highlight security and robust ROI potential.",
-        "healthcare": "stress compliance and efficiency.",
-    }
-    return industry_focus_map.get(industry, "highlight tailored benefits.")
+    # The full snippet library (aliases, more industries) only applies with tiered generation,
+    # so prompts and their LLM cache keys are unchanged while it is off.
+    if settings.tiered_generation:
+        return (get_snippets(industry) or DEFAULT_SNIPPETS).focus
+    return industry_focus_map.get(industry.lower(), DEFAULT_SNIPPETS.focus)
 
 # Define JSON Parser
 parser = JsonOutputParser(pydantic_object=EmailResponse)
@@ -88,36 +110,99 @@ prompt_template = PromptTemplate(
     partial_variables={"format_instructions": parser.get_format_instructions()}
 )
 
-def generate_email_content(params: dict) -> EmailResponse:
+# Prebuilt generator, shared by every request
+email_generator = StructuredGenerator(prompt_template, EmailResponse, LLAMA3_70B, parser, name="email")
+
+email_packer = PackedGenerator(
+    email_generator,
+    PromptTemplate(template=packed_prompt, input_variables=["prospects", "count"]),
+    key_field="prospect_email",
+    item_fields=prompt_template.input_variables,
+    normalize_key=normalize_email,
+)
+
+# Smaller, faster model for mid-tier prospects (settings.tiered_generation); never routed to the full models
+email_small_generator = StructuredGenerator(prompt_template, EmailResponse, settings.tier_small_model, parser, name="email_small", router_models=[])
+
+email_small_packer = PackedGenerator(
+    email_small_generator,
+    email_packer.packed_template,
+    key_field="prospect_email",
+    item_fields=prompt_template.input_variables,
+    normalize_key=normalize_email,
+)
+
+@timed("generate_email")
+async def generate_email_content(params: dict, use_cache: bool = True, pack: bool = True) -> EmailResponse:
+    """
+    Generates a cold email. With settings.pack_size > 1 and pack=True, concurrent calls
+    share packed LLM requests.
+
+    With settings.tiered_generation, cold prospects get an email rendered from templates
+    and warm ones use the small model; only hot leads go to the full model (see
+    `app.services.tiering.choose_tier`).
+    """
     logger.info(f"Generating email content for: {params.get('prospect_email')}")
     
     params["industry_focus"] = get_industry_focus(params["industry"])
-    chain = prompt_template | llama3_70b_llm | parser
+    tier = choose_tier(params, "email") if settings.tiered_generation else FULL_MODEL
+    record_tier("email", tier)
 
     try:
-        response_dict = chain.invoke(params)
-        logger.success(f"Email content generated: {response_dict}")
+        if tier == TEMPLATE:
+            return render_email(params)
+        if tier == SMALL_MODEL:
+            generator = email_small_packer if pack else email_small_generator
+        else:
+            generator = email_packer if pack else email_generator
+        response = await generator.agenerate(params, use_cache=use_cache)
+        logger.success(f"Email content generated: {response.model_dump()}")
     except Exception as e:
         logger.error(f"Error generating email content: {e}")
         raise e
 
-    return EmailResponse.model_validate(response_dict)
+    return response
 
 
-async def send_email(response: EmailResponse) -> None:
-    logger.info(f"Attempting to send email to {response.prospect_email}")
+async def stream_email_content(params: dict, use_cache: bool = True) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streams email generation: ("partial", dict) events as the reply arrives, then ("result", EmailResponse).
+    """
+    params["industry_focus"] = get_industry_focus(params["industry"])
+    async for event in email_generator.astream(params, use_cache=use_cache):
+        yield event
 
-    message = MessageSchema(
-        subject=response.subject,
-        recipients=[response.prospect_email],
-        body=response.email,
-        subtype=MessageType.plain,
-    )
 
-    fm = FastMail(conf)
+def build_message(response: EmailResponse) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((settings.mail_from_name, settings.mail_from))
+    message["To"] = response.prospect_email
+    message["Subject"] = response.subject
+    message.set_content(response.email)
+    return message
 
-    try:
-        await fm.send_message(message)
+
+@timed("send_email")
+async def send_email(response: EmailResponse) -> bool:
+    """
+    Sends a generated email over the shared SMTP pool.
+
+    Returns:
+        bool: True if the email was accepted by the SMTP server.
+    """
+    logger.info(f"Attempting to send email to {response.prospect_email}")
+
+    sent = await smtp_pool.send(build_message(response))
+
+    if sent:
         logger.success(f"Email successfully sent to {response.prospect_email}")
-    except Exception as e:
-        logger.error(f"Failed to send email to {response.prospect_email}: {e}")
+    else:
+        logger.error(f"Failed to send email to {response.prospect_email}")
+    return sent
+
+
+async def send_emails(responses: List[EmailResponse]) -> List[bool]:
+    """
+    Sends a batch of generated emails, spreading them across pooled SMTP sessions.
+    """
+    return await smtp_pool.send_batch([build_message(response) for response in responses])
@@ -0,0 +1,551 @@
+import asyncio
+import json
+import re
+from typing import Any, AsyncIterator, Callable, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import Generation
+from langchain_core.utils.json import parse_partial_json
+from loguru import logger
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import get_chat_model
+from app.core.metrics import llm_cache_hits, llm_parse_failures, llm_repairs, llm_tokens, llm_wasted_tokens, track
+from app.core.settings import settings
+from app.services.llm_cache import llm_cache, make_cache_key
+from app.services.model_router import model_router
+from app.core.rate_limiter import estimate_tokens, get_rate_limiter
+
+ResponseT = TypeVar("ResponseT", bound=BaseModel)
+T = TypeVar("T")
+
+try:  # orjson is several times faster on the hot path; the stdlib decoder is the fallback
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover
+    _loads = json.loads
+
+_REASONING = re.compile(r"<think>.*?</think>", re.DOTALL)
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+REPAIR_PROMPT = """{prompt}
+
+Your previous answer was missing or had invalid values for these fields: {fields}.
+Fields already answered: {answered}
+Reply with a JSON object containing only the fields {fields}."""
+
+
+def get_model_name(llm: BaseChatModel) -> str:
+    """
+    Returns the provider model name of a chat model (e.g. 'llama3-70b-8192').
+    """
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+def get_total_tokens(message: Any) -> Optional[int]:
+    """
+    Returns the total token usage reported on an AI message, if any.
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    return None
+
+
+def strip_reasoning(text: Any) -> str:
+    """
+    Drops <think>...</think> blocks emitted by reasoning models (e.g. DeepSeek R1) before the answer.
+    """
+    return _REASONING.sub("", text if isinstance(text, str) else str(text)).strip()
+
+
+class ResponseParseError(ValueError):
+    """
+    Raised when a model reply contains no decodable JSON.
+    """
+
+
+class IncompleteResponse(ValueError):
+    """
+    Raised when a reply decodes but some fields are missing or invalid, so only those
+    fields need to be asked for again.
+    """
+
+    def __init__(self, payload: Dict[str, Any], fields: List[str]):
+        super().__init__(f"missing or invalid fields: {', '.join(fields)}")
+        self.payload = payload
+        self.fields = fields
+
+
+def _drop_last_value(value: Any) -> Any:
+    """
+    Removes the innermost last value of a decoded, truncated reply, where the cut happened.
+    """
+    if isinstance(value, dict) and value:
+        key = next(reversed(value))
+        if isinstance(value[key], (dict, list)) and value[key]:
+            _drop_last_value(value[key])
+        else:
+            del value[key]
+    elif isinstance(value, list) and value:
+        if isinstance(value[-1], (dict, list)) and value[-1]:
+            _drop_last_value(value[-1])
+        else:
+            value.pop()
+    return value
+
+
+def loads_json(text: Any) -> Any:
+    """
+    Decodes the JSON in a model reply.
+
+    Reasoning blocks are dropped first. The reply is then decoded as is; failing that, the
+    contents of a ```json fence, then the outermost {...} / [...] span, then (for replies cut
+    off mid-object) as much of it as parses. In that last case the final value may have been
+    cut off too (e.g. half an email body), so it is dropped and counts as missing.
+
+    Raises:
+        ResponseParseError: If the reply contains no JSON.
+    """
+    text = strip_reasoning(text)
+    try:
+        return _loads(text)
+    except ValueError:
+        pass
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if starts:
+        start = min(starts)
+        end = max(text.rfind("}"), text.rfind("]"))
+        if end > start:
+            try:
+                return _loads(text[start:end + 1])
+            except ValueError:
+                pass
+        partial = parse_partial_json(text[start:])
+        if partial is not None:
+            return _drop_last_value(partial)
+    raise ResponseParseError(f"no JSON in model reply: {text[:80]!r}")
+
+
+def message_payload(message: Any) -> Any:
+    """
+    Returns the decoded answer of an AI message: the arguments of its first tool call when
+    the model answered through tool calling, otherwise its JSON content.
+    """
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        return tool_calls[0]["args"]
+    return loads_json(message.content)
+
+
+def failed_generation(error: Exception) -> Optional[str]:
+    """
+    Returns the reply Groq rejected in JSON mode ("json_validate_failed"), if `error` is that
+    rejection. The rejected text is usually salvageable by `loads_json` or a field repair.
+    """
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        body = body.get("error", body)
+        if isinstance(body, dict) and isinstance(body.get("failed_generation"), str):
+            return body["failed_generation"]
+    return None
+
+
+class TokenUsage:
+    """
+    Running token totals per generator, used to compare generation modes.
+    """
+
+    def __init__(self):
+        self._totals: Dict[str, Dict[str, int]] = {}
+
+    def _totals_of(self, name: str) -> Dict[str, int]:
+        return self._totals.setdefault(
+            name, {"requests": 0, "cache_hits": 0, "prompt_tokens": 0, "completion_tokens": 0, "parse_failures": 0, "wasted_tokens": 0}
+        )
+
+    def record(self, name: str, message: Any = None, cached: bool = False) -> None:
+        totals = self._totals_of(name)
+        if cached:
+            totals["cache_hits"] += 1
+            llm_cache_hits.labels(name).inc()
+            return
+        totals["requests"] += 1
+        usage = getattr(message, "usage_metadata", None) or {}
+        totals["prompt_tokens"] += usage.get("input_tokens", 0)
+        totals["completion_tokens"] += usage.get("output_tokens", 0)
+        llm_tokens.labels(name, "prompt").inc(usage.get("input_tokens", 0))
+        llm_tokens.labels(name, "completion").inc(usage.get("output_tokens", 0))
+
+    def record_failure(self, name: str, kind: str, message: Any = None) -> None:
+        """
+        Counts a reply that failed to parse or validate. For "invalid" replies, which are
+        discarded, the reply's tokens are counted as wasted.
+        """
+        totals = self._totals_of(name)
+        totals["parse_failures"] += 1
+        llm_parse_failures.labels(name, kind).inc()
+        if kind == "invalid":
+            wasted = get_total_tokens(message) or 0
+            totals["wasted_tokens"] += wasted
+            llm_wasted_tokens.labels(name).inc(wasted)
+
+    def total(self) -> int:
+        return sum(t["prompt_tokens"] + t["completion_tokens"] for t in self._totals.values())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result: Dict[str, Dict[str, Any]] = {}
+        for name, totals in self._totals.items():
+            requests = totals["requests"] or 1
+            result[name] = {
+                **totals,
+                "avg_prompt_tokens": round(totals["prompt_tokens"] / requests, 1),
+                "avg_completion_tokens": round(totals["completion_tokens"] / requests, 1),
+            }
+        return result
+
+
+token_usage = TokenUsage()
+
+
+class StructuredGenerator(Generic[ResponseT]):
+    """
+    Prebuilt prompt -> LLM -> JSON pipeline that returns a validated pydantic model.
+
+    Requests use the provider's structured output (settings.llm_structured_output: JSON
+    mode or a tool call with the response schema) and replies are decoded by `loads_json`.
+    A reply that decodes but misses some fields is repaired by asking for those fields
+    only, instead of regenerating the whole completion.
+
+    The rendered prompt and model name form a content-addressed cache key, so identical
+    inputs are answered from the LLM cache without spending any tokens. Cache misses are
+    routed by the model router to `llm` or one of settings.llm_router_models, through that
+    model's shared rate limiter (or only to `llm` when `router_models` is []). The cache key
+    always uses `llm`'s name, whichever model answered.
+    """
+
+    def __init__(self, prompt_template: PromptTemplate, schema: Type[ResponseT], llm: Union[BaseChatModel, str], parser: JsonOutputParser, name: Optional[str] = None, router_models: Optional[List[str]] = None):
+        self.name = name or schema.__name__
+        self.router_models = router_models
+        self.prompt_template = prompt_template
+        self.schema = schema
+        self.llm = llm
+        self.parser = parser
+        self._bound: Dict[Tuple[int, str], Any] = {}
+
+    @property
+    def llm(self) -> BaseChatModel:
+        """
+        The generator's own chat model. A model name passed to the constructor is only
+        resolved (and the client built) on first use.
+        """
+        if isinstance(self._llm, str):
+            self._llm = get_chat_model(self._llm)
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm: Union[BaseChatModel, str]) -> None:
+        self._llm = llm
+
+    @property
+    def model_name(self) -> str:
+        return self._llm if isinstance(self._llm, str) else get_model_name(self._llm)
+
+    def candidates(self) -> List[Tuple[str, BaseChatModel]]:
+        """
+        Returns the (name, model) pairs this generator may be routed to, its own model first.
+        """
+        primary = self.model_name
+        candidates = [(primary, self.llm)]
+        for name in settings.llm_router_models if self.router_models is None else self.router_models:
+            if name != primary:
+                candidates.append((name, get_chat_model(name)))
+        return candidates
+
+    def structured(self, llm: BaseChatModel, tools: bool = False) -> Any:
+        """
+        Returns `llm` bound to the provider's structured output per settings.llm_structured_output.
+        Tool calling is only used when `tools` is set (a reply of exactly `self.schema`);
+        otherwise "tools" falls back to JSON mode.
+        """
+        mode = settings.llm_structured_output
+        if mode == "tools" and not tools:
+            mode = "json_mode"
+        if mode not in ("json_mode", "tools"):
+            return llm
+        key = (id(llm), mode)
+        bound = self._bound.get(key)
+        if bound is None:
+            if mode == "tools":
+                bound = llm.bind_tools([self.schema], tool_choice=self.schema.__name__)
+            else:
+                bound = llm.bind(response_format={"type": "json_object"})
+            self._bound[key] = bound
+        return bound
+
+    def validate(self, payload: Any) -> ResponseT:
+        """
+        Validates a decoded reply against the schema.
+
+        Raises:
+            IncompleteResponse: If the reply is an object with only some fields missing or invalid.
+            ValueError: If it is unusable as a whole.
+        """
+        try:
+            return self.schema.model_validate(payload)
+        except ValidationError as e:
+            if not isinstance(payload, dict):
+                raise
+            fields = sorted({str(error["loc"][0]) for error in e.errors() if error["loc"]})
+            if fields and len(fields) < len(self.schema.model_fields):
+                raise IncompleteResponse(payload, fields) from e
+            raise
+
+    async def repair(self, llm: BaseChatModel, prompt_text: str, incomplete: IncompleteResponse, parse: Callable[[Any], T], name: str) -> T:
+        """
+        Asks `llm` again for only the fields missing from an otherwise valid reply, and merges
+        them in. Gives up after settings.llm_repair_attempts requests.
+
+        Raises:
+            IncompleteResponse: If the fields are still missing after the last attempt.
+        """
+        payload, fields = dict(incomplete.payload), incomplete.fields
+        bound = self.structured(llm)
+        for _ in range(settings.llm_repair_attempts):
+            answered = json.dumps({key: value for key, value in payload.items() if key not in fields}, ensure_ascii=False)
+            text = REPAIR_PROMPT.format(prompt=prompt_text, fields=", ".join(fields), answered=answered)
+            message = await get_rate_limiter(get_model_name(llm)).run(
+                lambda: bound.ainvoke(text),
+                estimated_tokens=estimate_tokens(text) + settings.groq_expected_completion_tokens // 2,
+                usage_of=get_total_tokens,
+            )
+            token_usage.record(name, message)
+            try:
+                patch = message_payload(message)
+            except ResponseParseError:
+                token_usage.record_failure(name, "invalid", message)
+                continue
+            if isinstance(patch, dict):
+                payload.update({key: value for key, value in patch.items() if key in fields})
+            try:
+                result = parse(payload)
+            except IncompleteResponse as e:
+                fields = e.fields
+                continue
+            llm_repairs.labels(name, "repaired").inc()
+            return result
+        llm_repairs.labels(name, "failed").inc()
+        raise IncompleteResponse(payload, fields)
+
+    async def complete(self, prompt_value: Any, prompt_text: str, parse: Callable[[Any], T], name: Optional[str] = None, expected_completion_tokens: Optional[int] = None, tools: bool = False) -> T:
+        """
+        Sends a rendered prompt through the model router and parses the reply.
+
+        Parameters:
+            prompt_value: The rendered prompt.
+            prompt_text (str): Its text, used to estimate token usage.
+            parse (callable): Turns the decoded reply into a validated result. Raising
+                IncompleteResponse triggers a field repair; raising anything else counts as
+                a failed attempt for the model that replied.
+            name (str): Token accounting bucket. Defaults to the generator's name.
+            expected_completion_tokens (int): Defaults to settings.groq_expected_completion_tokens.
+            tools (bool): The reply is exactly `self.schema`, so tool calling may be used.
+
+        Returns:
+            T: The parsed result from the first model to answer validly.
+        """
+        name = name or self.name
+        estimated_tokens = estimate_tokens(prompt_text) + (expected_completion_tokens or settings.groq_expected_completion_tokens)
+
+        async def attempt(llm: BaseChatModel) -> T:
+            bound = self.structured(llm, tools)
+            try:
+                message = await get_rate_limiter(get_model_name(llm)).run(
+                    lambda: bound.ainvoke(prompt_value),
+                    estimated_tokens=estimated_tokens,
+                    usage_of=get_total_tokens,
+                )
+            except Exception as e:
+                rejected = failed_generation(e)
+                if rejected is None:
+                    raise
+                message = AIMessage(content=rejected)
+            token_usage.record(name, message)
+            try:
+                with track("parse"):
+                    return parse(message_payload(message))
+            except IncompleteResponse as e:
+                token_usage.record_failure(name, "incomplete", message)
+                if settings.llm_repair_attempts <= 0:
+                    raise
+                logger.debug(f"Repairing {name} reply from {get_model_name(llm)}: {e}")
+                return await self.repair(llm, prompt_text, e, parse, name)
+            except Exception:
+                token_usage.record_failure(name, "invalid", message)
+                raise
+
+        return await model_router.invoke(self.candidates(), attempt)
+
+    def cache_key(self, params: Dict[str, Any]) -> str:
+        """
+        Returns the cache key of the single-prospect prompt for `params`.
+        """
+        return make_cache_key(self.prompt_template.format_prompt(**params).to_string(), self.model_name)
+
+    def from_cache(self, key: str, cached: Optional[Dict[str, Any]]) -> Optional[ResponseT]:
+        """
+        Validates a cached response, or returns None if there is none or it no longer
+        passes the schema (e.g. one cached before a validator was added).
+        """
+        if cached is None:
+            return None
+        try:
+            response = self.schema.model_validate(cached)
+        except ValidationError as e:
+            logger.warning(f"Ignoring cached {self.name} response {key[:12]} that fails validation: {e.error_count()} errors")
+            return None
+        logger.info(f"LLM cache hit for {self.name} ({self.model_name})")
+        token_usage.record(self.name, cached=True)
+        return response
+
+    async def cached(self, params: Dict[str, Any]) -> Optional[ResponseT]:
+        """
+        Returns the cached response for `params`, or None.
+        """
+        if not settings.llm_cache_enabled:
+            return None
+        key = self.cache_key(params)
+        return self.from_cache(key, await llm_cache.get(key))
+
+    async def remember(self, params: Dict[str, Any], response: ResponseT) -> None:
+        """
+        Caches a response produced some other way (e.g. by a packed request) under the
+        key of the single-prospect prompt.
+        """
+        if settings.llm_cache_enabled:
+            await llm_cache.set(self.cache_key(params), self.model_name, response.model_dump(mode="json"))
+
+    async def agenerate(self, params: Dict[str, Any], use_cache: bool = True) -> ResponseT:
+        """
+        Renders the prompt, answers from cache when possible, otherwise calls the LLM.
+
+        Parameters:
+            params (dict): Prompt variables.
+            use_cache (bool): Set to False to bypass the cache for this request.
+
+        Returns:
+            ResponseT: The validated response.
+        """
+        prompt_value = self.prompt_template.format_prompt(**params)
+        prompt_text = prompt_value.to_string()
+        model = self.model_name
+        use_cache = use_cache and settings.llm_cache_enabled
+        key = make_cache_key(prompt_text, model)
+
+        if use_cache:
+            cached = self.from_cache(key, await llm_cache.get(key))
+            if cached is not None:
+                return cached
+
+        response = await self.complete(prompt_value, prompt_text, self.validate, tools=True)
+
+        if use_cache:
+            await llm_cache.set(key, model, response.model_dump(mode="json"))
+
+        return response
+
+    def parse_partial(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Parses the JSON object in an incomplete reply, or returns None if nothing parses yet.
+        """
+        if "<think>" in text and "</think>" not in text:
+            return None  # Still reasoning
+        try:
+            partial = self.parser.parse_result([Generation(text=strip_reasoning(text))], partial=True)
+        except Exception:
+            return None
+        return partial if isinstance(partial, dict) else None
+
+    async def astream(self, params: Dict[str, Any], use_cache: bool = True) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streams a generation as it is produced.
+
+        Yields ("partial", dict) each time the partially parsed JSON object grows, then
+        ("result", ResponseT) once the full reply validates, after the same field repair as
+        `complete` if some fields are missing. A cache hit yields the result only. Streams go
+        to the best-ranked model without hedging.
+
+        When the rate limiter retries a stream (e.g. after a 429 mid-stream), the retry's
+        partials are only sent once it gets further than the partials already sent.
+
+        Parameters:
+            params (dict): Prompt variables.
+            use_cache (bool): Set to False to bypass the cache for this request.
+        """
+        prompt_value = self.prompt_template.format_prompt(**params)
+        prompt_text = prompt_value.to_string()
+        model = self.model_name
+        use_cache = use_cache and settings.llm_cache_enabled
+        key = make_cache_key(prompt_text, model)
+
+        if use_cache:
+            cached = self.from_cache(key, await llm_cache.get(key))
+            if cached is not None:
+                yield "result", cached
+                return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        emitted = 0  # Length of the reply text behind the last partial sent, across retries
+
+        async def consume(llm: BaseChatModel) -> AIMessage:
+            nonlocal emitted
+            text = ""
+            usage = None
+            last: Optional[Dict[str, Any]] = None
+            async for chunk in llm.astream(prompt_value):
+                text += chunk.content if isinstance(chunk.content, str) else ""
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                if len(text) <= emitted:
+                    continue  # A retry catching up with what the client already has
+                partial = self.parse_partial(text)
+                if partial and partial != last:
+                    last = partial
+                    emitted = len(text)
+                    queue.put_nowait(("partial", partial))
+            return AIMessage(content=text, usage_metadata=usage)
+
+        name, llm = model_router.choose(self.candidates())
+        estimated_tokens = estimate_tokens(prompt_text) + settings.groq_expected_completion_tokens
+
+        async def stream(llm: BaseChatModel) -> AIMessage:
+            return await get_rate_limiter(name).run(lambda: consume(llm), estimated_tokens=estimated_tokens, usage_of=get_total_tokens)
+
+        task = asyncio.create_task(model_router.attempt(name, llm, stream))
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+            message = await task
+        finally:
+            task.cancel()
+
+        token_usage.record(self.name, message)
+        try:
+            response = self.validate(loads_json(message.content))
+        except IncompleteResponse as e:
+            token_usage.record_failure(self.name, "incomplete", message)
+            if settings.llm_repair_attempts <= 0:
+                raise
+            logger.debug(f"Repairing streamed {self.name} reply from {name}: {e}")
+            response = await self.repair(llm, prompt_text, e, self.validate, self.name)
+        except Exception:
+            token_usage.record_failure(self.name, "invalid", message)
+            raise
+        if use_cache:
+            await llm_cache.set(key, model, response.model_dump(mode="json"))
+        yield "result", response
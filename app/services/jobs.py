@@ -0,0 +1,323 @@
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from app.core.database import Database, db
+from app.core.metrics import jobs_running, track
+from app.core.settings import settings
+from app.schemas.outreach import JobStatus
+from app.services.result_writer import RESULT_FORMATS, reject_path
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outreach_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT,
+    content_hash TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    use_cache INTEGER NOT NULL DEFAULT 1,
+    total_rows INTEGER,
+    processed_rows INTEGER NOT NULL DEFAULT 0,
+    failed_rows INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outreach_jobs_hash ON outreach_jobs (content_hash, created_at);
+CREATE INDEX IF NOT EXISTS idx_outreach_jobs_status ON outreach_jobs (status, created_at);
+"""
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class JobManager:
+    """
+    Persistent outreach job queue backed by SQLite.
+
+    Jobs survive restarts: anything still queued or running when the app stopped is
+    queued again on startup and resumes from its row checkpoint. At most `concurrency`
+    jobs run at once; progress counters are persisted at most once per `progress_interval`.
+
+    Idle workers also poll the table for queued jobs, and claim them atomically, so
+    several processes (the API and/or `python -m app.worker`) can share one queue.
+    """
+
+    def __init__(self, database: Database, concurrency: int, progress_interval: float = 1.0, poll_interval: float = 2.0):
+        self.database = database
+        self.concurrency = max(1, concurrency)
+        self.progress_interval = progress_interval
+        self.poll_interval = poll_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancel_requested: Set[str] = set()
+        self._schema_ready = False
+
+    async def _ensure_schema(self) -> None:
+        if not self._schema_ready:
+            await self.database.executescript(JOBS_SCHEMA)
+            self._schema_ready = True
+
+    async def start(self, recover: bool = True) -> None:
+        """
+        Starts the worker tasks.
+
+        Parameters:
+            recover (bool): Re-queue jobs left 'running' by a previous run. Only safe when
+                no other process is running jobs from the same database.
+        """
+        await self._ensure_schema()
+        self._queue = asyncio.Queue()
+
+        if recover:
+            await self.database.execute("UPDATE outreach_jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+        pending = await self.database.fetchall("SELECT id FROM outreach_jobs WHERE status = ? ORDER BY created_at", (QUEUED,))
+        for row in pending:
+            self._queue.put_nowait(row["id"])
+        if pending:
+            logger.info(f"Re-queued {len(pending)} outreach job(s) from a previous run.")
+
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """
+        Stops the workers. Running jobs stay 'running' in the database and resume on next start.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, input_path: str, content_hash: str, filename: Optional[str], output_dir: str, use_cache: bool = True, result_format: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Records a new queued job and schedules it.
+
+        Parameters:
+            result_format (str): Format of the results file (see RESULT_FORMATS). Defaults to settings.result_format.
+
+        Returns:
+            dict: The job row.
+        """
+        await self._ensure_schema()
+        job_id = uuid.uuid4().hex
+        extension = RESULT_FORMATS[result_format or settings.result_format][0]
+        output_path = os.path.join(output_dir, f"processed_{job_id}{extension}")
+        from app.utils.process_files import count_rows
+
+        total_rows = await asyncio.to_thread(count_rows, input_path)
+
+        await self.database.execute(
+            "INSERT INTO outreach_jobs (id, status, filename, content_hash, input_path, output_path, use_cache, total_rows, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, QUEUED, filename, content_hash, input_path, output_path, int(use_cache), total_rows, time.time()),
+        )
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+        logger.info(f"Queued outreach job {job_id} for {filename}")
+        return await self.get(job_id)  # type: ignore[return-value]
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        await self._ensure_schema()
+        row = await self.database.fetchone("SELECT * FROM outreach_jobs WHERE id = ?", (job_id,))
+        return dict(row) if row else None
+
+    async def find_reusable(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the latest queued, running or successfully finished job for the same content.
+        """
+        await self._ensure_schema()
+        rows = await self.database.fetchall(
+            "SELECT * FROM outreach_jobs WHERE content_hash = ? AND status IN (?, ?, ?) ORDER BY created_at DESC",
+            (content_hash, QUEUED, RUNNING, DONE),
+        )
+        for row in rows:
+            if row["status"] != DONE or os.path.exists(row["output_path"]):
+                return dict(row)
+        return None
+
+    async def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        await self._ensure_schema()
+        rows = await self.database.fetchall("SELECT * FROM outreach_jobs ORDER BY created_at DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    async def queue_depth(self) -> int:
+        await self._ensure_schema()
+        row = await self.database.fetchone("SELECT COUNT(*) AS n FROM outreach_jobs WHERE status = ?", (QUEUED,))
+        return row["n"] if row else 0
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Cancels a queued or running job. Finished jobs are left unchanged.
+        """
+        job = await self.get(job_id)
+        if job is None or job["status"] not in ACTIVE_STATES:
+            return job
+
+        self._cancel_requested.add(job_id)
+        await self._finish(job_id, CANCELLED, from_states=ACTIVE_STATES)
+        # A job running in another process (JOB_RUNNER=external) notices the status change in _watch.
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        logger.info(f"Cancelled outreach job {job_id}")
+        return await self.get(job_id)
+
+    async def _finish(self, job_id: str, status: str, error: Optional[str] = None, from_states: Tuple[str, ...] = (RUNNING,)) -> bool:
+        """
+        Moves a job to a final status, unless it has left `from_states` meanwhile (e.g. it was
+        cancelled from another process). Returns whether the job was updated.
+        """
+        placeholders = ", ".join("?" for _ in from_states)
+        updated = await self.database.execute(
+            f"UPDATE outreach_jobs SET status = ?, error = ?, finished_at = ? WHERE id = ? AND status IN ({placeholders})",
+            (status, error, time.time(), job_id, *from_states),
+        )
+        return bool(updated)
+
+    async def _watch(self, job_id: str, task: asyncio.Task) -> None:
+        """
+        Cancels a running job's task once its status in the database is no longer 'running',
+        which is how a cancel from another process reaches the process running the job.
+        """
+        while not task.done():
+            await asyncio.sleep(self.poll_interval)
+            job = await self.get(job_id)
+            if job is not None and job["status"] != RUNNING and not task.done():
+                logger.info(f"Outreach job {job_id} is now {job['status']}; stopping it")
+                self._cancel_requested.add(job_id)
+                task.cancel()
+                return
+
+    async def _next_queued(self) -> Optional[str]:
+        row = await self.database.fetchone("SELECT id FROM outreach_jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,))
+        return row["id"] if row else None
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            try:
+                job_id = await asyncio.wait_for(self._queue.get(), timeout=self.poll_interval)  # type: ignore[union-attr]
+            except asyncio.TimeoutError:
+                # Pick up jobs submitted by other processes.
+                job_id = await self._next_queued()
+                if job_id is None:
+                    continue
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed on {job_id}: {e}")
+
+    async def _run(self, job_id: str) -> None:
+        # Claim the job atomically; another worker or process may have taken it already.
+        claimed = await self.database.execute(
+            "UPDATE outreach_jobs SET status = ?, started_at = COALESCE(started_at, ?) WHERE id = ? AND status = ?",
+            (RUNNING, time.time(), job_id, QUEUED),
+        )
+        job = await self.get(job_id)
+        if not claimed or job is None:
+            return
+
+        logger.info(f"Starting outreach job {job_id}")
+
+        last_flush = 0.0
+        latest = (0, 0)
+
+        async def save_progress() -> None:
+            await self.database.execute(
+                "UPDATE outreach_jobs SET processed_rows = ?, failed_rows = ? WHERE id = ?",
+                (*latest, job_id),
+            )
+
+        async def on_progress(processed: int, failed: int) -> None:
+            nonlocal last_flush, latest
+            latest = (processed, failed)
+            now = time.monotonic()
+            if now - last_flush >= self.progress_interval:
+                last_flush = now
+                await save_progress()
+
+        # The pipeline (pandas, LangChain) is imported on the first job, not at app import.
+        from app.services.sharding import process_outreach_sharded
+
+        task = asyncio.create_task(
+            process_outreach_sharded(job["input_path"], job["output_path"], use_cache=bool(job["use_cache"]), on_progress=on_progress)
+        )
+        self._running[job_id] = task
+        watcher = asyncio.create_task(self._watch(job_id, task))
+        jobs_running.labels().inc()
+        try:
+            with track("job"):
+                output = await task
+        except asyncio.CancelledError:
+            if job_id in self._cancel_requested:
+                self._cancel_requested.discard(job_id)
+                return
+            # The app is shutting down: leave the job 'running' so it resumes on restart.
+            task.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Outreach job {job_id} failed: {e}")
+            await self._finish(job_id, FAILED, str(e))
+            return
+        finally:
+            watcher.cancel()
+            self._running.pop(job_id, None)
+            jobs_running.labels().dec()
+
+        await save_progress()
+        if output is None:
+            finished = await self._finish(job_id, FAILED, "No valid prospects found in the file.")
+        else:
+            finished = await self._finish(job_id, DONE)
+        if finished:
+            logger.success(f"Outreach job {job_id} finished")
+        else:
+            logger.info(f"Outreach job {job_id} was cancelled before it finished")
+
+
+def job_status(job: Dict[str, Any]) -> JobStatus:
+    """
+    Builds the API view of a job row, including percentage and ETA.
+    """
+    total = job["total_rows"]
+    processed = job["processed_rows"]
+    rejects = reject_path(job["output_path"])
+    percent = None
+    eta = None
+    if total:
+        percent = round(min(100.0, processed * 100.0 / total), 1)
+    if job["status"] == DONE:
+        percent = 100.0
+    elif job["status"] == RUNNING and total and processed and job["started_at"]:
+        elapsed = time.time() - job["started_at"]
+        eta = round(max(0.0, total - processed) * elapsed / processed, 1)
+
+    return JobStatus(
+        job_id=job["id"],
+        status=job["status"],
+        filename=job["filename"],
+        content_hash=job["content_hash"],
+        total_rows=total,
+        processed_rows=processed,
+        failed_rows=job["failed_rows"],
+        percent_complete=percent,
+        eta_seconds=eta,
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        error=job["error"],
+        download_url=f"/outreach/download/{os.path.basename(job['output_path'])}",
+        rejects_url=f"/outreach/download/{os.path.basename(rejects)}" if os.path.exists(rejects) else None,
+        status_url=f"/outreach/jobs/{job['id']}",
+    )
+
+
+job_manager = JobManager(db, concurrency=settings.max_concurrent_jobs, poll_interval=settings.job_poll_interval)
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from app.core.database import Database, db
+from app.core.settings import settings
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created_at ON llm_cache (created_at);
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def make_cache_key(prompt: str, model: str) -> str:
+    """
+    Builds a content-addressed cache key from a rendered prompt and the model name.
+
+    Whitespace is collapsed so formatting-only differences map to the same entry.
+    """
+    normalized = _WHITESPACE.sub(" ", prompt).strip()
+    return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache for parsed LLM outputs.
+
+    The first tier is an in-memory LRU; the second is a SQLite table that survives restarts.
+    Both tiers expire entries after `ttl` seconds, and the disk tier is pruned down to
+    `max_rows` entries every `prune_every` writes.
+    """
+
+    def __init__(self, database: Database, max_entries: int, max_rows: int, ttl: float, prune_every: int = 500):
+        self.database = database
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._schema_ready = False
+        self._writes = 0
+
+    async def _ensure_schema(self) -> None:
+        if not self._schema_ready:
+            await self.database.executescript(CACHE_SCHEMA)
+            self._schema_ready = True
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl > 0 and time.time() - created_at > self.ttl
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, Any]) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            created_at, value = entry
+            if not self._expired(created_at):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._memory[key]
+
+        try:
+            await self._ensure_schema()
+            row = await self.database.fetchone("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,))
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            row = None
+
+        if row is None or self._expired(row["created_at"]):
+            self.misses += 1
+            return None
+
+        value = json.loads(row["value"])
+        self._remember(key, row["created_at"], value)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, model: str, value: Dict[str, Any]) -> None:
+        created_at = time.time()
+        self._remember(key, created_at, value)
+
+        try:
+            await self._ensure_schema()
+            await self.database.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, value, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, json.dumps(value), created_at),
+            )
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                await self.prune()
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    async def prune(self) -> None:
+        """
+        Drops expired rows and trims the disk tier to `max_rows` most recent entries.
+        """
+        await self._ensure_schema()
+        if self.ttl > 0:
+            await self.database.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+        await self.database.execute(
+            "DELETE FROM llm_cache WHERE key NOT IN (SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT ?)",
+            (self.max_rows,),
+        )
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+
+llm_cache = LLMCache(
+    db,
+    max_entries=settings.llm_cache_max_entries,
+    max_rows=settings.llm_cache_max_rows,
+    ttl=settings.llm_cache_ttl_seconds,
+)
@@ -0,0 +1,202 @@
+import asyncio
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+from app.core.metrics import llm_request_seconds, llm_requests
+from app.core.settings import settings
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+
+T = TypeVar("T")
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class ModelStats:
+    """
+    Rolling latency and error window for one model.
+    """
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.ewma: Optional[float] = None
+        self.last_used = 0.0
+        self.requests = 0
+        self.hedges_won = 0
+
+    def record(self, latency: Optional[float], ok: Optional[bool]) -> None:
+        if latency is not None:
+            self.latencies.append(latency)
+            self.ewma = latency if self.ewma is None else self.ewma + settings.llm_router_ewma_alpha * (latency - self.ewma)
+        if ok is not None:
+            self.outcomes.append(ok)
+        self.last_used = time.monotonic()
+
+    @property
+    def error_rate(self) -> float:
+        return 1.0 - sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def latency(self, q: float) -> Optional[float]:
+        if len(self.latencies) < settings.llm_router_min_samples:
+            return None
+        return percentile(list(self.latencies), q)
+
+
+class ModelRouter:
+    """
+    Sends each LLM request to the healthiest candidate model and hedges slow ones.
+
+    Models are ranked by a moving average of latency, inflated by their recent error rate.
+    Models without enough samples, and models left unused for `llm_router_probe_seconds`,
+    are ranked by `llm_router_default_latency`. Ties keep the caller's order, so the
+    generator's own model wins until the others prove faster.
+
+    If the chosen model has not answered by its `llm_router_hedge_percentile` latency, a
+    duplicate request goes to the next-ranked model. The first valid result wins and the
+    other request is cancelled. At most `llm_router_hedge_ratio` of requests are hedged,
+    which bounds the extra token spend.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, ModelStats] = {}
+        self.requests = 0
+        self.hedged = 0
+
+    def _stats(self, model: str) -> ModelStats:
+        if model not in self.stats:
+            self.stats[model] = ModelStats(settings.llm_router_window)
+        return self.stats[model]
+
+    def score(self, model: str) -> float:
+        stats = self._stats(model)
+        latency = stats.ewma
+        stale = time.monotonic() - stats.last_used > settings.llm_router_probe_seconds
+        if latency is None or len(stats.latencies) < settings.llm_router_min_samples or stale:
+            latency = settings.llm_router_default_latency
+        return latency / max(0.05, 1.0 - stats.error_rate)
+
+    def rank(self, candidates: List[Tuple[str, "BaseChatModel"]]) -> List[Tuple[str, "BaseChatModel"]]:
+        return sorted(candidates, key=lambda candidate: self.score(candidate[0]))
+
+    def choose(self, candidates: List[Tuple[str, "BaseChatModel"]]) -> Tuple[str, "BaseChatModel"]:
+        """
+        Returns the best-ranked candidate, for requests that cannot be hedged (e.g. streams).
+        """
+        self.requests += 1
+        return self.rank(candidates)[0]
+
+    def hedge_deadline(self, model: str) -> float:
+        deadline = self._stats(model).latency(settings.llm_router_hedge_percentile)
+        return max(settings.llm_router_min_hedge_seconds, deadline if deadline is not None else settings.llm_router_default_latency)
+
+    def _may_hedge(self) -> bool:
+        return self.hedged < settings.llm_router_hedge_ratio * max(1, self.requests)
+
+    async def attempt(self, model: str, llm: "BaseChatModel", call: Callable[["BaseChatModel"], Awaitable[T]]) -> T:
+        """
+        Runs `call(llm)` on one model, recording its latency and outcome.
+        """
+        stats = self._stats(model)
+        stats.requests += 1
+        started = time.monotonic()
+        try:
+            result = await call(llm)
+        except asyncio.CancelledError:
+            # Lost a hedge race: the model took at least this long.
+            elapsed = time.monotonic() - started
+            stats.record(elapsed, ok=None)
+            self._observe(model, elapsed, "cancelled")
+            raise
+        except Exception:
+            stats.record(None, ok=False)
+            self._observe(model, time.monotonic() - started, "error")
+            raise
+        elapsed = time.monotonic() - started
+        stats.record(elapsed, ok=True)
+        self._observe(model, elapsed, "ok")
+        return result
+
+    @staticmethod
+    def _observe(model: str, elapsed: float, outcome: str) -> None:
+        llm_request_seconds.labels(model).observe(elapsed)
+        llm_requests.labels(model, outcome).inc()
+
+    async def invoke(self, candidates: List[Tuple[str, "BaseChatModel"]], call: Callable[["BaseChatModel"], Awaitable[T]]) -> T:
+        """
+        Runs `call(llm)` on the best candidate, hedging to the runner-up when it is slow.
+
+        Parameters:
+            candidates (list): (model name, chat model) pairs, in order of preference.
+            call (callable): Performs the request on a model and returns a validated result.
+                Raising marks the attempt as failed.
+
+        Returns:
+            T: The first successful result.
+        """
+        self.requests += 1
+        ranked = self.rank(candidates)
+        if len(ranked) == 1:
+            return await self.attempt(*ranked[0], call)
+
+        (primary, primary_llm), (backup, backup_llm) = ranked[0], ranked[1]
+        tasks: Dict[asyncio.Task, str] = {asyncio.create_task(self.attempt(primary, primary_llm, call)): primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_deadline(primary))
+
+            if not done and self._may_hedge():
+                self.hedged += 1
+                logger.info(f"{primary} is slow; hedging the request to {backup}")
+                tasks[asyncio.create_task(self.attempt(backup, backup_llm, call))] = backup
+            elif done and next(iter(done)).exception() is not None:
+                # The primary failed fast: fall back to the runner-up instead of failing the row.
+                logger.warning(f"{primary} failed ({next(iter(done)).exception()}); retrying on {backup}")
+                return await self.attempt(backup, backup_llm, call)
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if tasks[task] != primary:
+                            self._stats(tasks[task]).hedges_won += 1
+                        return task.result()
+                    error = task.exception()
+            raise error  # type: ignore[misc]
+        finally:
+            # Cancel the losing request, or everything if the caller was cancelled, and wait for
+            # it to unwind so its rate limiter slot is free again before this returns.
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "models": {
+                model: {
+                    "requests": stats.requests,
+                    "p50_seconds": stats.latency(0.5),
+                    "p95_seconds": stats.latency(0.95),
+                    "error_rate": round(stats.error_rate, 3),
+                    "hedges_won": stats.hedges_won,
+                    "score": round(self.score(model), 3),
+                }
+                for model, stats in self.stats.items()
+            },
+        }
+
+
+model_router = ModelRouter()
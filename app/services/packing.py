@@ -0,0 +1,182 @@
+import asyncio
+import re
+from typing import Any, Callable, Dict, Generic, List, Optional, Set, Tuple
+
+from langchain_core.prompts import PromptTemplate
+from loguru import logger
+
+from app.core.settings import settings
+from app.services.generation import ResponseT, StructuredGenerator
+
+_Pending = Tuple[Dict[str, Any], asyncio.Future, bool]
+
+
+def normalize_email(value: Any) -> str:
+    return str(value or "").strip().lower()
+
+
+def normalize_phone(value: Any) -> str:
+    return re.sub(r"\D", "", str(value or ""))
+
+
+def extract_items(parsed: Any) -> List[Any]:
+    """
+    Returns the list of entries from a packed response, whether the model returned a bare
+    array or wrapped it in an object (e.g. {"results": [...]}).
+    """
+    if isinstance(parsed, list):
+        return parsed
+    if isinstance(parsed, dict):
+        for value in parsed.values():
+            if isinstance(value, list):
+                return value
+    return []
+
+
+class PackedGenerator(Generic[ResponseT]):
+    """
+    Micro-batcher that packs several prospects into one structured LLM request.
+
+    Concurrent `agenerate` calls are collected for up to `max_wait` seconds, or until
+    `pack_size` are waiting, and sent as one prompt that asks for a JSON array with an
+    entry per prospect. Entries are validated and matched back to their requests by
+    `key_field` (email or phone), never by position. Requests whose entry is missing or
+    malformed fall back to the single-prospect `generator`, one by one.
+
+    Packed results are cached under each prospect's single-prompt key, so they stay
+    interchangeable with unpacked generation.
+    """
+
+    def __init__(
+        self,
+        generator: StructuredGenerator[ResponseT],
+        packed_template: PromptTemplate,
+        key_field: str,
+        item_fields: List[str],
+        normalize_key: Callable[[Any], str] = normalize_email,
+        pack_size: Optional[int] = None,
+        max_wait: Optional[float] = None,
+    ):
+        self.generator = generator
+        self.packed_template = packed_template
+        self.key_field = key_field
+        self.item_fields = item_fields
+        self.normalize_key = normalize_key
+        self.pack_size = pack_size
+        self.max_wait = max_wait
+        self.name = f"{generator.name}_packed"
+        self._pending: List[_Pending] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def size(self) -> int:
+        return max(1, self.pack_size or settings.pack_size)
+
+    async def agenerate(self, params: Dict[str, Any], use_cache: bool = True) -> ResponseT:
+        """
+        Generates one prospect's response, sharing an LLM request with other waiting prospects.
+        """
+        if self.size <= 1:
+            return await self.generator.agenerate(params, use_cache=use_cache)
+
+        if use_cache:
+            cached = await self.generator.cached(params)
+            if cached is not None:
+                return cached
+
+        loop = asyncio.get_running_loop()
+        key = self.normalize_key(params.get(self.key_field))
+        # Keys must be unique within a pack, or entries could not be matched back.
+        if any(self.normalize_key(p.get(self.key_field)) == key for p, _, _ in self._pending):
+            self._flush()
+
+        future = loop.create_future()
+        self._pending.append((params, future, use_cache))
+        if len(self._pending) >= self.size:
+            self._flush()
+        elif self._timer is None:
+            max_wait = self.max_wait if self.max_wait is not None else settings.pack_max_wait_ms / 1000
+            self._timer = loop.call_later(max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _single(self, params: Dict[str, Any], future: asyncio.Future, use_cache: bool) -> None:
+        try:
+            response = await self.generator.agenerate(params, use_cache=use_cache)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(response)
+
+    async def _run(self, batch: List[_Pending]) -> None:
+        batch = [entry for entry in batch if not entry[1].done()]
+        if len(batch) <= 1:
+            await asyncio.gather(*(self._single(*entry) for entry in batch))
+            return
+
+        try:
+            entries = await self._generate_packed([params for params, _, _ in batch])
+        except Exception as e:
+            logger.warning(f"Packed {self.generator.name} request for {len(batch)} prospects failed, retrying individually: {e}")
+            entries = {}
+
+        retry: List[_Pending] = []
+        for params, future, use_cache in batch:
+            entry = entries.get(self.normalize_key(params.get(self.key_field)))
+            try:
+                if not isinstance(entry, dict):
+                    raise ValueError("missing from packed response")
+                response = self.generator.schema.model_validate({**entry, self.key_field: params[self.key_field]})
+            except Exception as e:
+                logger.debug(f"Packed entry for {params.get(self.key_field)} unusable: {e}")
+                retry.append((params, future, use_cache))
+                continue
+
+            if use_cache:
+                await self.generator.remember(params, response)
+            if not future.done():
+                future.set_result(response)
+
+        if retry:
+            logger.info(f"Retrying {len(retry)} of {len(batch)} packed {self.generator.name} prospects individually")
+            await asyncio.gather(*(self._single(*entry) for entry in retry))
+
+    async def _generate_packed(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Sends one packed request and returns its entries keyed by normalized prospect key.
+        """
+        prospects = "\n\n".join(
+            f"Prospect {i}:\n" + "\n".join(f"- {field}: {params.get(field, '')}" for field in self.item_fields)
+            for i, params in enumerate(batch, start=1)
+        )
+        prompt_value = self.packed_template.format_prompt(prospects=prospects, count=len(batch))
+
+        def parse(payload: Any) -> Dict[str, Any]:
+            entries: Dict[str, Any] = {}
+            for item in extract_items(payload):
+                if isinstance(item, dict) and item.get(self.key_field):
+                    entries.setdefault(self.normalize_key(item[self.key_field]), item)
+            if not entries:
+                raise ValueError("packed response has no usable entries")
+            return entries
+
+        return await self.generator.complete(
+            prompt_value,
+            prompt_value.to_string(),
+            parse,
+            name=self.name,
+            expected_completion_tokens=settings.groq_expected_completion_tokens * len(batch),
+        )
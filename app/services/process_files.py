@@ -1,9 +1,131 @@
+from collections import deque
+
 import pandas as pd
 from loguru import logger
-from app.utils.process_files import read_file
+from app.core.metrics import rows_processed, track
+from app.core.settings import settings
+from app.utils.process_files import read_file, stream_file
 from app.services.email import generate_email_content, send_email
 from app.services.call import generate_call_script, make_call
-from langchain.schema.runnable import RunnableBranch
+from app.services.campaign import campaign_generator
+from app.services.generation import token_usage
+from app.services.checkpoint import checkpoints, make_row_id
+from app.services.dialer import CallPipeline
+from app.services.result_writer import RejectWriter, open_result_writer, reject_path, result_columns
+from app.services.suppression import contact_index, contact_of
+from app.services.validation import REJECT_REASON, validate_batch
+from app.services.row_engine import RowEngine
+from langchain_core.runnables import RunnableBranch
+
+REQUIRED_COLUMNS = {
+    "email": ["prospect_email", "prospect_name", "company_name", "prospect_title", "industry", "engagement_level", "objections", "outreach_type", "sender_name", "sender_title", "insurance_company_name", "outreach_description"],
+    "call": ["prospect_phone", "prospect_name", "company_name", "prospect_title", "industry", "engagement_level", "objections", "outreach_type", "sender_name", "sender_title", "insurance_company_name", "outreach_description"]
+}
+
+VALID_OUTREACH_TYPES = {"email", "call"}
+
+def _json_value(value):
+    return None if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)) else value
+
+async def suppression_reasons(records, seen_contacts):
+    """
+    Checks prospect rows against earlier rows of the same run and the contact index.
+
+    Parameters:
+        records (list): Validated prospect rows (dicts).
+        seen_contacts (set): (channel, contact) pairs already queued by this run; updated in place.
+
+    Returns:
+        list: Per row, the reason it must be skipped ("duplicate contact in file", a suppression
+            or "contacted within cooldown"), or None if it may be contacted.
+    """
+    reasons = [None] * len(records)
+    by_channel = {}
+    for position, row in enumerate(records):
+        key = contact_of(row)
+        if key in seen_contacts:
+            reasons[position] = "duplicate contact in file"
+            continue
+        seen_contacts.add(key)
+        by_channel.setdefault(key[0], []).append(position)
+    for channel, positions in by_channel.items():
+        blocked = await contact_index.check(channel, [contact_of(records[position])[1] for position in positions])
+        for position in positions:
+            reasons[position] = blocked.get(contact_of(records[position])[1])
+    return reasons
+
+async def record_contact(row):
+    """
+    Records a successful email or call in the contact index, which starts the contact's cooldown.
+    """
+    try:
+        await contact_index.mark_contacted(*contact_of(row))
+    except Exception as e:
+        logger.error(f"Failed to record contact for {row.get('company_name')}: {e}")
+
+def delivered(row):
+    """
+    Returns whether an outreach row reached the prospect: its email was sent or its call placed.
+    Rows whose generation or delivery failed are not, and are retried when the job is resumed.
+    """
+    if row.get("outreach_type") == "email":
+        return row.get("send_status") == "sent"
+    if row.get("outreach_type") == "call":
+        return bool(row.get("call_sid"))
+    return True
+
+def record_outcomes(df, outcome):
+    """
+    Counts skipped rows in the outreach_rows_total metric, per outreach type.
+    """
+    if "outreach_type" in df.columns:
+        channels = df["outreach_type"].astype("string").str.strip().str.lower()
+        channels = channels.where(channels.isin(VALID_OUTREACH_TYPES), "unknown")
+    else:
+        channels = pd.Series("unknown", index=df.index)
+    for channel, count in channels.value_counts().items():
+        rows_processed.labels(channel, outcome).inc(count)
+
+def validate_prospects(df, warn_missing=True, on_reject=None):
+    """
+    Validates a DataFrame (or one batch of a streamed file) of prospects.
+
+    Validation runs over whole columns (see `app.services.validation.validate_batch`):
+    rows with an invalid outreach type, missing required values, a malformed email or
+    phone number, or an engagement level outside 0-4 are rejected before any generation.
+
+    Parameters:
+        df (pd.DataFrame): Prospect rows.
+        warn_missing (bool): Log a warning for missing optional columns.
+        on_reject (callable): Optional function called with the rejected rows, which carry a `reject_reason` column.
+
+    Returns:
+        pd.DataFrame: Valid, normalized rows, or None if there are none.
+    """
+    if "outreach_type" not in df.columns:
+        logger.error("Missing required column: outreach_type.")
+        return None
+
+    if warn_missing:
+        for outreach_type in VALID_OUTREACH_TYPES:
+            missing_cols = [col for col in REQUIRED_COLUMNS[outreach_type] if col not in df.columns]
+            if missing_cols:
+                logger.warning(f"Missing columns {missing_cols}. Some {outreach_type} rows may be skipped.")
+
+    with track("validate"):
+        df, rejected = validate_batch(df)
+
+    if not rejected.empty:
+        counts = rejected[REJECT_REASON].value_counts()
+        logger.warning(f"Rejected {len(rejected)} rows: " + ", ".join(f"{reason} ({count})" for reason, count in counts.items()))
+        record_outcomes(rejected, "rejected")
+        if on_reject is not None:
+            on_reject(rejected)
+
+    if df.empty:
+        return None
+
+    return df
 
 async def extract_prospects(file_path):
     """
@@ -19,56 +141,260 @@ async def extract_prospects(file_path):
     if df is None:
         return None
 
-    required_columns = {
-        "email": ["prospect_email", "prospect_name", "company_name", "prospect_title", "industry", "engagement_level", "objections", "outreach_type", "sender_name", "sender_title", "insurance_company_name", "outreach_description"],
-        "call": ["prospect_phone", "prospect_name", "company_name", "prospect_title", "industry", "engagement_level", "objections", "outreach_type", "sender_name", "sender_title", "insurance_company_name", "outreach_description"]
-    }
-
     if "outreach_type" not in df.columns:
         logger.error("Missing required column: outreach_type.")
         return None
-    
-    valid_types = {"email", "call"}
-    df = df[df["outreach_type"].isin(valid_types)]
-    
-    if df.empty:
+
+    df = validate_prospects(df)
+    if df is None:
         logger.error("No valid outreach type (email/call) found in the file.")
         return None
 
-    for outreach_type in valid_types:
-        missing_cols = [col for col in required_columns[outreach_type] if col not in df.columns]
-        if missing_cols:
-            logger.warning(f"Missing columns {missing_cols}. Some {outreach_type} rows may be skipped.")
-
-    if "objections" in df.columns:
-        df["objections"] = df["objections"].apply(lambda x: x.split(",") if isinstance(x, str) else [])
-
     logger.success(f"Successfully processed file: {file_path} with {len(df)} rows.")
     return df
 
-async def process_outreach(file_path, output_file):
+async def stream_prospects(file_path, batch_size=None, on_reject=None):
+    """
+    Streams validated prospect batches from a file without loading it whole.
+
+    Parameters:
+        file_path (str): Path to the file.
+        batch_size (int): Rows per batch. Defaults to settings.ingest_batch_size.
+        on_reject (callable): Optional function called with each batch's rejected rows.
+
+    Yields:
+        pd.DataFrame: Batches of valid prospect rows, in file order.
+    """
+    total = 0
+    first = True
+
+    async for batch in stream_file(file_path, batch_size or settings.ingest_batch_size):
+        if "outreach_type" not in batch.columns:
+            logger.error("Missing required column: outreach_type.")
+            return
+
+        valid = validate_prospects(batch, warn_missing=first, on_reject=on_reject)
+        first = False
+        if valid is None:
+            continue
+
+        total += len(valid)
+        yield valid
+
+    if total == 0:
+        logger.error("No valid outreach type (email/call) found in the file.")
+    else:
+        logger.success(f"Successfully processed file: {file_path} with {total} rows.")
+
+async def stream_email_outreach(file_path, output_file, email_concurrency=None, use_cache=True):
+    """
+    Generates and sends an email to every prospect in a file, yielding one event per prospect
+    as soon as it completes.
+
+    The file is streamed in batches and validated like `process_outreach`; without an
+    outreach_type column every row is taken as an email prospect, and call rows are rejected.
+    Repeated contacts and contacts that are suppressed or in cooldown in the contact index are
+    rejected too, and every sent email is recorded there.
+    New rows are only scheduled while the consumer keeps reading events (the row engine's
+    window), so a slow client holds back generation instead of buffering results in memory.
+
+    Events, in file order (rejected rows are reported as soon as their batch is read):
+        {"type": "rejected", "row_number", "prospect_email", "reason"}
+        {"type": "result", "row_number", "prospect_email", "subject", "email", "engagement_advice", "send_status"}
+        {"type": "error", "row_number", "prospect_email", "detail"}
+        {"type": "summary", "processed", "sent", "failed", "rejected", "output_file", "rejects_file"}
+
+    Parameters:
+        file_path (str): Path to the file.
+        output_file (str): Where results are also written, in the format of its extension.
+            Rejected rows go to `reject_path(output_file)`.
+        email_concurrency (int): Max email requests in flight. Defaults to settings.email_concurrency.
+        use_cache (bool): Set to False to regenerate content instead of reusing cached LLM output.
+
+    Yields:
+        dict: One event per prospect, then the summary.
+    """
+    rejects = RejectWriter(reject_path(output_file))
+    rejected_events = deque()
+    columns = None
+    writer = None
+    counts = {"processed": 0, "sent": 0, "failed": 0, "rejected": 0}
+    seen_contacts = set()  # (channel, contact) pairs queued by this run
+
+    def on_reject(rejected):
+        rejects.write(rejected)
+        counts["rejected"] += len(rejected)
+        for index, row in zip(rejected.index, rejected.to_dict(orient="records")):
+            rejected_events.append({
+                "type": "rejected",
+                "row_number": int(index),
+                "prospect_email": _json_value(row.get("prospect_email")),
+                "reason": row[REJECT_REASON],
+            })
+
+    async def rows():
+        nonlocal columns
+        first = True
+        async for batch in stream_file(file_path, settings.ingest_batch_size):
+            if "outreach_type" not in batch.columns:
+                batch = batch.assign(outreach_type="email")
+            valid = validate_prospects(batch, warn_missing=False, on_reject=on_reject)
+            if first:
+                missing_cols = [col for col in REQUIRED_COLUMNS["email"] if col not in batch.columns]
+                if missing_cols:
+                    logger.warning(f"Missing columns {missing_cols}. Email rows missing them are rejected.")
+                first = False
+            if valid is None:
+                continue
+
+            calls = valid[valid["outreach_type"] != "email"]
+            if not calls.empty:
+                calls = calls.assign(**{REJECT_REASON: "not an email prospect"})
+                record_outcomes(calls, "rejected")
+                on_reject(calls)
+                valid = valid[valid["outreach_type"] == "email"]
+            if columns is None and not valid.empty:
+                columns = list(valid.columns)
+
+            indexed = list(zip(valid.index, valid.to_dict(orient="records")))
+            if settings.suppression_enabled:
+                reasons = await suppression_reasons([row for _, row in indexed], seen_contacts)
+                skipped = [(index, row, reason) for (index, row), reason in zip(indexed, reasons) if reason]
+                if skipped:
+                    frame = pd.DataFrame([row for _, row, _ in skipped], index=[index for index, _, _ in skipped])
+                    frame[REJECT_REASON] = [reason for _, _, reason in skipped]
+                    record_outcomes(frame, "suppressed")
+                    on_reject(frame)
+                    indexed = [(index, row) for (index, row), reason in zip(indexed, reasons) if not reason]
+
+            for index, row in indexed:
+                row["row_number"] = int(index)
+                yield row
+
+    async def handle(row):
+        with track("row"):
+            response = await generate_email_content(row, use_cache=use_cache)
+            row["subject"] = response.subject
+            row["email"] = response.email
+            row["engagement_advice"] = response.engagement_advice
+            send_status = await send_email(response)
+            row["send_status"] = "sent" if send_status else "failed"
+            rows_processed.labels("email", "sent" if send_status else "send_failed").inc()
+        if send_status:
+            await record_contact(row)
+        return row
+
+    # Rows run concurrently so that they can share packed LLM requests.
+    engine = RowEngine(
+        handler=handle,
+        limits={"email": (email_concurrency or settings.email_concurrency) * max(1, settings.pack_size)},
+        channel_of=lambda row: "email",
+    )
+
+    try:
+        async for outcome in engine.run(rows()):
+            while rejected_events:
+                yield rejected_events.popleft()
+
+            row = outcome.row
+            counts["processed"] += 1
+            if not outcome.ok:
+                counts["failed"] += 1
+                rows_processed.labels("email", "error").inc()
+                logger.error(f"Error generating email for {row.get('company_name')}: {outcome.error}")
+                yield {"type": "error", "row_number": row["row_number"], "prospect_email": row["prospect_email"], "detail": "Email generation failed."}
+                continue
+
+            result = outcome.result
+            if result["send_status"] == "sent":
+                counts["sent"] += 1
+            if writer is None:
+                writer = open_result_writer(output_file, result_columns(columns))
+            writer.write(result)
+            yield {
+                "type": "result",
+                "row_number": result["row_number"],
+                "prospect_email": result["prospect_email"],
+                "subject": result["subject"],
+                "email": result["email"],
+                "engagement_advice": result["engagement_advice"],
+                "send_status": result["send_status"],
+            }
+
+        while rejected_events:
+            yield rejected_events.popleft()
+    finally:
+        if writer is not None:
+            writer.close()
+
+    logger.success(f"Bulk email completed: {counts['sent']} of {counts['processed']} sent, {counts['failed']} failed, {counts['rejected']} rejected.")
+    yield {
+        "type": "summary",
+        **counts,
+        "output_file": output_file if writer is not None else None,
+        "rejects_file": rejects.path if rejects.rows_written else None,
+    }
+
+async def process_outreach(file_path, output_file, email_concurrency=None, call_concurrency=None, use_cache=True, resume=True, on_progress=None, row_offset=0, campaign_mode=None, seen_contacts=None):
     """
     Processes outreach data (email or call) using LangChain's RunnableBranch.
 
+    Rows are processed concurrently with a separate in-flight limit per outreach type,
+    and appended to the output file in the same order as the input file as they complete.
+    Call rows go through a two-stage `CallPipeline`: scripts are generated ahead into a
+    bounded buffer that the dialer drains within the calling window.
+    Every delivered row is checkpointed; when a job is restarted, checkpointed rows are
+    replayed into the output instead of being generated and sent again. Rows whose generation
+    or delivery failed are written to the output too, but counted as failed and left out of the
+    checkpoint, so a resumed job retries them.
+    Rows that fail validation, repeat a contact from earlier in the file, or are suppressed
+    or in cooldown in the contact index are written to `reject_path(output_file)` and never generated.
+
     Parameters:
         file_path (str): Path to the file.
         output_file (str): Path to save the processed file.
+        email_concurrency (int): Max email rows in flight. Defaults to settings.email_concurrency.
+        call_concurrency (int): Max call scripts generated at once. Defaults to settings.call_concurrency.
+        use_cache (bool): Set to False to regenerate content instead of reusing cached LLM output.
+        resume (bool): Skip rows already completed by a previous run of the same job.
+        on_progress (callable): Optional coroutine function called as on_progress(processed, failed) after each row.
+        row_offset (int): Position of the file's first row in the original upload, when processing a shard.
+        campaign_mode (bool): Generate one template per campaign group and only personalize it per
+            prospect. Defaults to settings.campaign_mode.
+        seen_contacts (set): (channel, contact) pairs already queued by earlier shards of the same
+            file; their rows here are rejected as duplicates.
 
     Returns:
         str: Path to the updated file.
     """
-    df = await extract_prospects(file_path)
-    if df is None:
-        return None
-
-    results = []
+    job_key = output_file
+    columns = None
+    writer = None
+    replayed = {}  # row_id -> checkpointed result, for rows of the batches currently in flight
+    seen = failed = resumed = 0
+    rejects = RejectWriter(reject_path(output_file), row_offset=row_offset)
+    check_suppression = settings.suppression_enabled
+    seen_contacts = set(seen_contacts or ())  # (channel, contact) pairs queued by this run
+    if campaign_mode is None:
+        campaign_mode = settings.campaign_mode
+    generate_email = campaign_generator.generate_email if campaign_mode else generate_email_content
+    generate_call = campaign_generator.generate_call if campaign_mode else generate_call_script
+    tokens_before = token_usage.total()
+    # With packing, every in-flight slot holds a whole pack of rows.
+    pack_size = 1 if campaign_mode else max(1, settings.pack_size)
+    calls = CallPipeline(
+        generate=lambda row: generate_call(row, use_cache=use_cache),
+        dial=make_call,
+        generate_concurrency=(call_concurrency or settings.call_concurrency) * pack_size,
+    )
 
     async def handle_email(row):
         logger.info(f"Generating email for {row['company_name']}")
-        response = generate_email_content(row)
+        response = await generate_email(row, use_cache=use_cache)
 
         if not response or not response.subject:
             logger.warning(f"Email generation failed for {row['company_name']}")
+            rows_processed.labels("email", "generation_failed").inc()
             return row  # Return row unchanged
 
         logger.info(f"Generated email - Subject: {response.subject} for {row['company_name']}")
@@ -80,10 +406,12 @@ async def process_outreach(file_path, output_file):
         # Send the email
         logger.info(f"Sending email to {row['prospect_email']} for {row['company_name']}")
         send_status = await send_email(response)
-        logger.critical(f"Sent email to {row['prospect_email']}")
+        row["send_status"] = "sent" if send_status else "failed"
+        rows_processed.labels("email", "sent" if send_status else "send_failed").inc()
 
         if send_status:
             logger.success(f"Email successfully sent to {row['prospect_email']} for {row['company_name']}")
+            await record_contact(row)
         else:
             logger.error(f"Failed to send email to {row['prospect_email']} for {row['company_name']}")
 
@@ -119,25 +447,26 @@ async def process_outreach(file_path, output_file):
 
     async def handle_call(row):
         logger.info(f"Generating call script for {row['company_name']}")
-        response = await generate_call_script(row)
+        # Generates the script, then waits while the dialer stage places the call
+        response, call = await calls.run(row)
 
         if not response or not response.call_script:
             logger.warning(f"Call script generation failed for {row['company_name']}")
+            rows_processed.labels("call", "generation_failed").inc()
             return row  # Return row unchanged
 
-        logger.info(f"Generated call script for {row['company_name']}")
-
         # Ensure the row is updated correctly
         updated_row = row.copy()
         updated_row["call_script"] = response.call_script
         updated_row["engagement_advice"] = response.engagement_advice
 
-        # Make the call
-        logger.info(f"Making call to {updated_row['prospect_phone']} for {updated_row['company_name']}")
-        call_status = await make_call(updated_row["prospect_phone"], response.call_script)
+        updated_row["call_sid"] = call.call_sid
+        updated_row["call_status"] = call.call_status
+        rows_processed.labels("call", "called" if call.call_sid else "call_failed").inc()
 
-        if call_status:
+        if call.call_sid:
             logger.success(f"Call successfully placed to {row['prospect_phone']} for {row['company_name']}")
+            await record_contact(row)
         else:
             logger.error(f"Failed to place call to {row['prospect_phone']} for {row['company_name']}")
 
@@ -151,18 +480,101 @@ async def process_outreach(file_path, output_file):
         lambda x: x  # Default case (do nothing)
     )
     
-    for _, row in df.iterrows():
+    async def handle_row(row):
+        row_id = row["row_id"]
+        if row_id in replayed:
+            rows_processed.labels(row.get("outreach_type"), "resumed").inc()
+            return replayed.pop(row_id)
+
+        with track("row"):
+            processed_row = await branch.ainvoke(row)
+        if not delivered(processed_row):
+            return processed_row  # Not checkpointed, so a resumed job retries it
         try:
-            logger.info(f"Processing {row['outreach_type']} for {row['company_name']}")
-            row_dict = row.to_dict()  # Convert Pandas Series to dictionary
-            processed_row = await branch.ainvoke(row_dict)  # Pass mutable dict
-            results.append(processed_row)  # Append updated row
+            await checkpoints.mark(job_key, row_id, processed_row)
         except Exception as e:
-            logger.error(f"Error processing {row['outreach_type']} for {row['company_name']}: {e}")
+            logger.error(f"Failed to checkpoint row {row_id}: {e}")
+        return processed_row
+
+    engine = RowEngine(
+        handler=handle_row,
+        limits={
+            "email": (email_concurrency or settings.email_concurrency) * pack_size,
+            "call": calls.capacity,
+        },
+        channel_of=lambda row: row.get("outreach_type"),
+    )
+
+    async def rows():
+        nonlocal columns, resumed
+        async for batch in stream_prospects(file_path, on_reject=rejects.write):
+            if columns is None:
+                columns = list(batch.columns)
+
+            records = batch.to_dict(orient="records")
+            for index, row in zip(batch.index, records):
+                row["row_id"] = make_row_id(index + row_offset, row)
+
+            done = await checkpoints.lookup(job_key, [row["row_id"] for row in records]) if resume else {}
+            done = {row_id: result for row_id, result in done.items() if delivered(result)}  # Retry anything else
+            resumed += len(done)
+            replayed.update(done)
+
+            # Rows already completed by this job are replayed; the rest are checked for suppression.
+            if check_suppression:
+                pending = [(index, row) for index, row in zip(batch.index, records) if row["row_id"] not in done]
+                reasons = await suppression_reasons([row for _, row in pending], seen_contacts)
+                skipped = [(index, row, reason) for (index, row), reason in zip(pending, reasons) if reason]
+                if skipped:
+                    frame = pd.DataFrame([row for _, row, _ in skipped], index=[index for index, _, _ in skipped])
+                    frame[REJECT_REASON] = [reason for _, _, reason in skipped]
+                    record_outcomes(frame, "suppressed")
+                    rejects.write(frame.drop(columns=["row_id"]))
+                    blocked = {row["row_id"] for _, row, _ in skipped}
+                    records = [row for row in records if row["row_id"] not in blocked]
+
+            for row in records:
+                yield row
+
+    try:
+        async for outcome in engine.run(rows()):
+            seen += 1
+            if not outcome.ok:
+                failed += 1
+                rows_processed.labels(outcome.row.get("outreach_type"), "error").inc()
+                logger.error(f"Error processing {outcome.row.get('outreach_type')} for {outcome.row.get('company_name')}: {outcome.error}")
+            else:
+                if not delivered(outcome.result):
+                    failed += 1  # Generation or delivery failed; the row is still written for the record
+                if writer is None:
+                    writer = open_result_writer(output_file, result_columns(columns))
+                writer.write(outcome.result)  # Append updated row
+
+            if on_progress is not None:
+                await on_progress(seen, failed)
+    finally:
+        await calls.close()
+        if writer is not None:
+            writer.close()
+
+    if seen == 0:
+        return None
+
+    generated = seen - resumed
+    if generated:
+        # Approximate when several jobs share the process.
+        tokens = token_usage.total() - tokens_before
+        logger.info(f"Used {tokens} LLM tokens for {generated} prospects ({tokens / generated:.0f} per prospect, campaign mode {'on' if campaign_mode else 'off'}).")
+
+    if rejects.rows_written:
+        logger.warning(f"{rejects.rows_written} invalid rows were skipped and saved to {rejects.path}")
 
+    if resumed:
+        logger.info(f"Resumed job: {resumed} rows were replayed from the checkpoint.")
 
-    output_df = pd.DataFrame(results)
-    output_df.to_csv(output_file, index=False)
+    # Keep the checkpoint while rows are failing, so a re-run only retries those rows.
+    if failed == 0:
+        await checkpoints.clear(job_key)
 
     logger.success(f"Processing completed. File saved at {output_file}")
     return output_file
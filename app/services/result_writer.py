@@ -0,0 +1,340 @@
+import csv
+import gzip
+import io
+import math
+import os
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.settings import settings
+from app.utils.negotiation import parse_accept, quality
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Columns added to the input columns by the outreach pipeline.
+RESULT_COLUMNS = [
+    "row_id",
+    "subject",
+    "email",
+    "engagement_advice",
+    "send_status",
+    "call_script",
+    "call_sid",
+    "call_status",
+]
+
+
+# Result formats: (file extension, media type when downloaded as a file, content encoding of the CSV inside)
+RESULT_FORMATS: Dict[str, Tuple[str, str, Optional[str]]] = {
+    "csv": (".csv", "text/csv", None),
+    "csv.gz": (".csv.gz", "application/gzip", "gzip"),
+    "csv.zst": (".csv.zst", "application/zstd", "zstd"),
+    "parquet": (".parquet", "application/vnd.apache.parquet", None),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file", None),
+}
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+
+def result_format_of(path: str) -> str:
+    """
+    Returns the result format of a file from its extension, defaulting to CSV.
+    """
+    for name, (extension, _, _) in sorted(RESULT_FORMATS.items(), key=lambda item: -len(item[1][0])):
+        if path.endswith(extension):
+            return name
+    return "csv"
+
+
+def with_format(path: str, result_format: str) -> str:
+    """
+    Returns `path` with its result-format extension replaced by the one of `result_format`.
+    """
+    extension = RESULT_FORMATS[result_format_of(path)][0]
+    root = path[:-len(extension)] if path.endswith(extension) else os.path.splitext(path)[0]
+    return root + RESULT_FORMATS[result_format][0]
+
+
+def result_columns(input_columns: List[str]) -> List[str]:
+    """
+    Returns the output column order: the input columns followed by the result columns.
+    """
+    return list(input_columns) + [col for col in RESULT_COLUMNS if col not in input_columns]
+
+
+def _clean(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return value
+
+
+def _text(value: Any) -> Optional[str]:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def _makedirs_for(path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+
+def _open_text(path: str, encoding: Optional[str]) -> io.TextIOBase:
+    if encoding == "gzip":
+        return gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=6)
+    if encoding == "zstd":
+        import zstandard
+
+        stream = zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+class CsvResultWriter:
+    """
+    Appends processed rows to a CSV file (optionally gzip or zstd compressed) as they complete.
+
+    Plain CSV is flushed after every row, so a crash never loses finished rows and memory
+    use does not grow with the size of the job. Compressed CSV is flushed every
+    `flush_rows` rows instead, since every flush costs compression ratio.
+    """
+
+    def __init__(self, path: str, columns: List[str], encoding: Optional[str] = None, flush_rows: int = 1):
+        self.path = path
+        self.columns = columns
+        self.rows_written = 0
+        self.flush_rows = max(1, flush_rows)
+        _makedirs_for(path)
+        self._file = _open_text(path, encoding)
+        self._writer = csv.DictWriter(self._file, fieldnames=columns, extrasaction="ignore", restval="")
+        self._writer.writeheader()
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._writer.writerow({key: _clean(value) for key, value in row.items()})
+        self.rows_written += 1
+        if self.rows_written % self.flush_rows == 0:
+            self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class ColumnarResultWriter:
+    """
+    Writes processed rows to a Parquet or Arrow IPC file, one row group (record batch) at a time.
+
+    Rows are buffered until `row_group_size` have arrived and then written as one group,
+    so memory use stays bounded. All columns are stored as nullable strings, matching the
+    CSV output. The file is only readable once closed; rows lost to a crash are replayed
+    from the job checkpoint.
+    """
+
+    def __init__(self, path: str, columns: List[str], result_format: str, row_group_size: int):
+        import pyarrow as pa
+
+        self.path = path
+        self.columns = columns
+        self.result_format = result_format
+        self.row_group_size = max(1, row_group_size)
+        self.rows_written = 0
+        self._pa = pa
+        self._schema = pa.schema([(column, pa.string()) for column in columns])
+        self._buffer: List[Dict[str, Any]] = []
+        _makedirs_for(path)
+        if result_format == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self._schema)
+
+    def write(self, row: Dict[str, Any]) -> None:
+        self._buffer.append(row)
+        self.rows_written += 1
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        pa = self._pa
+        arrays = [pa.array([_text(row.get(column)) for row in self._buffer], type=pa.string()) for column in self.columns]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self._schema))
+        self._buffer = []
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+
+def open_result_writer(path: str, columns: List[str], result_format: Optional[str] = None):
+    """
+    Opens the writer for a result file with the given columns. The format defaults to the
+    one of the path's extension.
+    """
+    result_format = result_format or result_format_of(path)
+    if result_format in COLUMNAR_FORMATS:
+        return ColumnarResultWriter(path, columns, result_format, settings.result_row_group_size)
+    encoding = RESULT_FORMATS[result_format][2]
+    return CsvResultWriter(path, columns, encoding=encoding, flush_rows=settings.result_row_group_size if encoding else 1)
+
+
+def iter_result_batches(path: str, batch_size: int) -> Iterator["pd.DataFrame"]:
+    """
+    Reads a result file of any format in batches, keeping every value as text.
+    """
+    if result_format_of(path) in COLUMNAR_FORMATS:
+        from app.utils.process_files import iter_file_batches
+
+        yield from iter_file_batches(path, batch_size)
+        return
+
+    import pandas as pd
+
+    # The compression is inferred from the extension.
+    with pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=batch_size) as reader:
+        yield from reader
+
+
+def read_result_columns(path: str) -> List[str]:
+    """
+    Returns the column names of a result file of any format, read from its header or schema.
+    """
+    result_format = result_format_of(path)
+    if result_format == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_schema(path).names
+    if result_format == "arrow":
+        import pyarrow as pa
+
+        with pa.memory_map(path) as source:
+            return pa.ipc.open_file(source).schema.names
+
+    import pandas as pd
+
+    return list(pd.read_csv(path, dtype=str, nrows=0).columns)
+
+
+def convert_results(sources: List[str], target: str) -> int:
+    """
+    Streams one or more result files, in order, into `target` in the format of its extension.
+    The target is written under a temporary name and renamed into place when complete.
+    Sources without rows still produce a target with their columns.
+
+    Returns:
+        int: Number of rows written.
+    """
+    temporary = os.path.join(os.path.dirname(target), f".{uuid.uuid4().hex}.{os.path.basename(target)}")
+    writer = None
+    try:
+        for source in sources:
+            for batch in iter_result_batches(source, settings.result_row_group_size):
+                if writer is None:
+                    writer = open_result_writer(temporary, list(batch.columns), result_format_of(target))
+                for row in batch.to_dict(orient="records"):
+                    writer.write(row)
+        if writer is None:
+            if not sources:
+                return 0
+            writer = open_result_writer(temporary, read_result_columns(sources[0]), result_format_of(target))
+        writer.close()
+        os.replace(temporary, target)
+        return writer.rows_written
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def result_variant(path: str, result_format: str) -> str:
+    """
+    Returns a copy of a result file in another format, converting it on first request.
+    The copy sits next to the original and is rebuilt when the original is newer.
+    """
+    target = with_format(path, result_format)
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(path):
+        convert_results([path], target)
+    return target
+
+
+def reject_path(output_path: str) -> str:
+    """
+    Returns where the rows rejected by validation are written for a given output file.
+    """
+    root = with_format(output_path, "csv")[:-len(".csv")]
+    return f"{root}.rejected.csv"
+
+
+class RejectWriter:
+    """
+    Appends batches of rejected rows, with their input row number and reject reason, to a CSV file.
+    The file is only created once the first row is rejected.
+    """
+
+    def __init__(self, path: str, row_offset: int = 0):
+        self.path = path
+        self.row_offset = row_offset
+        self.rows_written = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)  # Left over from a previous run of the same job
+
+    def write(self, rejected: "pd.DataFrame") -> None:
+        if rejected.empty:
+            return
+        rejected = rejected.set_axis(rejected.index + self.row_offset)
+        rejected.to_csv(self.path, mode="a" if self.rows_written else "w", header=not self.rows_written, index_label="row_number")
+        self.rows_written += len(rejected)
+
+
+# Media types that select each result format in an Accept header
+FORMAT_MEDIA_TYPES: Dict[str, Tuple[str, ...]] = {
+    "csv": ("text/csv",),
+    "csv.gz": ("application/gzip", "application/x-gzip"),
+    "csv.zst": ("application/zstd",),
+    "parquet": ("application/vnd.apache.parquet", "application/x-parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "application/vnd.apache.arrow"),
+}
+CSV_FORMATS = ("csv", "csv.gz", "csv.zst")
+
+
+def negotiate_result_format(stored: str, accept: Optional[str], accept_encoding: Optional[str]) -> Optional[Tuple[str, bool]]:
+    """
+    Picks how to serve a result file stored as `stored` from the request's Accept and
+    Accept-Encoding headers. Ties go to the stored format, so nothing is converted needlessly.
+
+    When the client takes CSV and accepts gzip or zstd, the CSV is sent compressed with a
+    Content-Encoding header ("transparent"); asking for application/gzip or application/zstd
+    instead downloads the compressed file as such.
+
+    Returns:
+        tuple: (result format to serve, whether its compression is a Content-Encoding), or
+            None if no result format is acceptable.
+    """
+    accepted = parse_accept(accept or "*/*")
+    qualities = {name: max(quality(accepted, media_type) for media_type in media_types) for name, media_types in FORMAT_MEDIA_TYPES.items()}
+    best = max(qualities.values())
+    if best <= 0:
+        return None
+
+    tied = [name for name in RESULT_FORMATS if qualities[name] == best]
+    chosen = stored if stored in tied else ("csv" if "csv" in tied else tied[0])
+    if chosen not in CSV_FORMATS or qualities["csv"] < best:
+        return chosen, False
+
+    # Plain CSV was acceptable: compress it on the wire if the client allows it.
+    encodings = parse_accept(accept_encoding)
+    options = [stored] if stored in CSV_FORMATS and stored != "csv" else []
+    options += sorted(("csv.zst", "csv.gz"), key=lambda name: -quality(encodings, RESULT_FORMATS[name][2]))
+    for name in options:
+        if quality(encodings, RESULT_FORMATS[name][2]) > 0:
+            return name, True
+    return "csv", False
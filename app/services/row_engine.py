@@ -0,0 +1,123 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Union
+
+from loguru import logger
+
+
+@dataclass
+class RowOutcome:
+    """
+    Result of running a single row through the engine.
+
+    Attributes:
+        index (int): Position of the row in the input stream.
+        row (dict): The row as it was submitted.
+        result (dict | None): The handler's return value, or None if it failed.
+        error (Exception | None): The exception raised by the handler, if any.
+    """
+    index: int
+    row: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+RowHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class RowEngine:
+    """
+    Runs rows through an async handler concurrently while yielding results in input order.
+
+    Every row is routed to a channel (e.g. 'email' or 'call') and each channel has its own
+    in-flight limit, so slow calls never starve email rows and vice versa. A failing row is
+    reported as a failed `RowOutcome` and never stops the other rows.
+    """
+
+    def __init__(
+        self,
+        handler: RowHandler,
+        limits: Dict[str, int],
+        channel_of: Callable[[Dict[str, Any]], str],
+        default_limit: int = 1,
+        window: Optional[int] = None,
+    ):
+        """
+        Parameters:
+            handler (callable): Coroutine function that processes one row and returns the updated row.
+            limits (dict): Max in-flight rows per channel.
+            channel_of (callable): Returns the channel name for a row.
+            default_limit (int): Limit used for channels missing from `limits`.
+            window (int): Max rows scheduled but not yet yielded. Bounds memory and keeps ordering cheap.
+        """
+        self.handler = handler
+        self.limits = dict(limits)
+        self.channel_of = channel_of
+        self.default_limit = max(1, default_limit)
+        self.window = window or max(1, sum(self.limits.values()) * 4)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, channel: str) -> asyncio.Semaphore:
+        if channel not in self._semaphores:
+            limit = max(1, self.limits.get(channel, self.default_limit))
+            self._semaphores[channel] = asyncio.Semaphore(limit)
+        return self._semaphores[channel]
+
+    async def _run_one(self, index: int, row: Dict[str, Any]) -> RowOutcome:
+        try:
+            channel = self.channel_of(row)
+        except Exception as e:
+            return RowOutcome(index=index, row=row, error=e)
+
+        async with self._semaphore(channel):
+            try:
+                result = await self.handler(row)
+                return RowOutcome(index=index, row=row, result=result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Row {index} ({channel}) failed: {e}")
+                return RowOutcome(index=index, row=row, error=e)
+
+    async def run(
+        self, rows: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+    ) -> AsyncIterator[RowOutcome]:
+        """
+        Schedules rows as they arrive and yields their outcomes in input order.
+
+        Parameters:
+            rows (iterable | async iterable): Rows to process.
+
+        Yields:
+            RowOutcome: One outcome per input row, in the order the rows were given.
+        """
+        pending: deque = deque()
+
+        async def _rows() -> AsyncIterator[Dict[str, Any]]:
+            if hasattr(rows, "__aiter__"):
+                async for row in rows:  # type: ignore[union-attr]
+                    yield row
+            else:
+                for row in rows:  # type: ignore[union-attr]
+                    yield row
+
+        try:
+            index = 0
+            async for row in _rows():
+                pending.append(asyncio.create_task(self._run_one(index, row)))
+                index += 1
+
+                # Drain finished rows from the head, and block on the head once the window is full.
+                while pending and (pending[0].done() or len(pending) >= self.window):
+                    yield await pending.popleft()
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,276 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from loguru import logger
+
+from app.core.settings import settings
+from app.services.checkpoint import checkpoints
+from app.services.process_files import process_outreach
+from app.services.result_writer import convert_results, reject_path, result_format_of
+from app.services.suppression import contact_of
+from app.services.validation import validate_batch
+from app.utils.process_files import count_rows, iter_file_batches
+
+Contact = Tuple[str, Optional[str]]
+
+
+def split_into_shards(
+    file_path: str,
+    shard_dir: str,
+    n_shards: int,
+    total_rows: int,
+    on_rows: Optional[Callable[[int, pd.DataFrame], None]] = None,
+) -> List[Tuple[str, int]]:
+    """
+    Splits a prospect file into contiguous CSV shards without loading it whole.
+
+    Parameters:
+        file_path (str): Path to the input file.
+        shard_dir (str): Directory for the shard files.
+        n_shards (int): Number of shards to create.
+        total_rows (int): Number of rows in the input file.
+        on_rows (callable): Optional function called as on_rows(shard index, rows) for every slice written.
+
+    Returns:
+        list: (shard path, offset of the shard's first row in the input) per non-empty shard.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    rows_per_shard = max(1, math.ceil(total_rows / n_shards))
+    shards: List[Tuple[str, int]] = []
+    position = 0
+
+    for batch in iter_file_batches(file_path, settings.ingest_batch_size):
+        start = 0
+        while start < len(batch):
+            shard_index = position // rows_per_shard
+            take = min(len(batch) - start, (shard_index + 1) * rows_per_shard - position)
+            shard_path = os.path.join(shard_dir, f"shard_{shard_index:04d}.csv")
+            is_new = not shards or shards[-1][0] != shard_path
+            if is_new:
+                shards.append((shard_path, position))
+            rows = batch.iloc[start:start + take]
+            rows.to_csv(shard_path, mode="w" if is_new else "a", header=is_new, index=False)
+            if on_rows is not None:
+                on_rows(len(shards) - 1, rows)
+            start += take
+            position += take
+
+    return shards
+
+
+class ShardContacts:
+    """
+    Tracks which contacts of a file being split reappear in a later shard.
+
+    Each shard only sees its own rows, so `process_outreach` cannot tell that a contact was
+    already queued by an earlier shard. Seeding each shard with the contacts it shares with
+    earlier shards makes it reject those rows as duplicates, as a single process would.
+    """
+
+    def __init__(self):
+        self._first_shard: Dict[Contact, int] = {}
+        self.repeated: Dict[int, Set[Contact]] = {}
+
+    def __call__(self, shard_index: int, rows: pd.DataFrame) -> None:
+        valid, _ = validate_batch(rows)  # Rejected rows are never queued, so they cannot be duplicated
+        columns = [column for column in ("outreach_type", "prospect_email", "prospect_phone") if column in valid.columns]
+        for row in valid[columns].to_dict(orient="records"):
+            key = contact_of(row)
+            if self._first_shard.setdefault(key, shard_index) != shard_index:
+                self.repeated.setdefault(shard_index, set()).add(key)
+
+
+def shard_settings(n_shards: int) -> Dict[str, float]:
+    """
+    Returns the settings each shard process runs with. Every shard builds its own LLM
+    limiters, SMTP pool and Twilio dispatcher, so the account-wide ceilings are split across
+    the shards of all the jobs that may be sharded at once.
+    """
+    share = 1.0 / (n_shards * max(1, settings.max_concurrent_jobs))
+    overrides = {
+        "groq_rate_limit_share": settings.groq_rate_limit_share * share,
+        "twilio_calls_per_second": settings.twilio_calls_per_second * share,
+    }
+    if settings.smtp_domain_rate_per_minute > 0:  # 0 turns the limit off
+        overrides["smtp_domain_rate_per_minute"] = settings.smtp_domain_rate_per_minute * share
+    return overrides
+
+
+def merge_shard_outputs(shard_outputs: List[str], output_file: str) -> int:
+    """
+    Concatenates shard result CSVs into one file, keeping the first header only. Outputs
+    in another result format (compressed CSV, Parquet, Arrow) are re-encoded while streaming.
+
+    Returns:
+        int: Number of shard outputs merged.
+    """
+    if result_format_of(output_file) != "csv":
+        existing = [path for path in shard_outputs if os.path.exists(path)]
+        convert_results(existing, output_file)
+        return len(existing)
+
+    merged = 0
+    with open(output_file, "wb") as out:
+        for path in shard_outputs:
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                header = f.readline()
+                if merged == 0:
+                    out.write(header)
+                shutil.copyfileobj(f, out, 1 << 20)
+            merged += 1
+    return merged
+
+
+def terminate_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Stops a process pool without waiting: queued shards are dropped and running worker
+    processes are killed, so a cancelled job stops sending emails and placing calls at once.
+    """
+    processes = list((pool._processes or {}).values())  # Snapshot before shutdown clears it
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout=5)
+
+
+def run_shard(
+    shard_path: str,
+    output_path: str,
+    use_cache: bool,
+    row_offset: int,
+    overrides: Dict[str, float],
+    seen_contacts: Optional[Set[Contact]] = None,
+) -> Tuple[Optional[str], int, int]:
+    """
+    Process-pool entry point: runs the outreach pipeline over one shard in its own event loop.
+
+    Parameters:
+        overrides (dict): Settings for this process, from `shard_settings`.
+        seen_contacts (set): Contacts of this shard already queued by earlier shards.
+
+    Returns:
+        tuple: (output path or None, rows processed, rows failed)
+    """
+    # Applied before the SMTP pool and Twilio dispatcher are created from settings.
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    from app.services.smtp_pool import smtp_pool
+    from app.services.twilio_dispatcher import twilio_dispatcher
+
+    async def main() -> Tuple[Optional[str], int, int]:
+        counts = [0, 0]
+
+        async def on_progress(processed: int, failed: int) -> None:
+            counts[0], counts[1] = processed, failed
+
+        try:
+            output = await process_outreach(
+                shard_path, output_path, use_cache=use_cache, on_progress=on_progress, row_offset=row_offset, seen_contacts=seen_contacts
+            )
+        finally:
+            await smtp_pool.close()
+            await twilio_dispatcher.close()
+        return output, counts[0], counts[1]
+
+    return asyncio.run(main())
+
+
+async def process_outreach_sharded(file_path, output_file, workers=None, use_cache=True, on_progress=None):
+    """
+    Processes a large outreach file across several worker processes.
+
+    The file is split into contiguous shards, each shard runs through `process_outreach` in
+    its own process (with its own event loop and a share of the Groq, Twilio and SMTP rate
+    limits), and the shard outputs are merged in order into `output_file`. A contact repeated
+    across shards is only contacted by its first row. Small files, or `workers` <= 1, fall
+    back to in-process `process_outreach`.
+
+    Parameters:
+        file_path (str): Path to the file.
+        output_file (str): Path to save the processed file.
+        workers (int): Number of worker processes. Defaults to settings.worker_processes.
+        use_cache (bool): Set to False to regenerate content instead of reusing cached LLM output.
+        on_progress (callable): Optional coroutine function called as on_progress(processed, failed).
+
+    Returns:
+        str: Path to the merged file, or None if nothing was processed.
+    """
+    workers = workers or settings.worker_processes
+    total_rows = await asyncio.to_thread(count_rows, file_path)
+
+    if workers <= 1 or not total_rows or total_rows < settings.shard_min_rows:
+        return await process_outreach(file_path, output_file, use_cache=use_cache, on_progress=on_progress)
+
+    shard_dir = f"{output_file}.shards"
+    # In-file duplicates are only detected alongside suppression, as in process_outreach.
+    contacts = ShardContacts() if settings.suppression_enabled else None
+    shards = await asyncio.to_thread(split_into_shards, file_path, shard_dir, workers, total_rows, contacts)
+    shard_outputs = [os.path.join(shard_dir, f"processed_{os.path.basename(path)}") for path, _ in shards]
+    logger.info(f"Split {file_path} into {len(shards)} shards across {workers} worker processes")
+
+    overrides = shard_settings(len(shards))
+    repeated = contacts.repeated if contacts is not None else {}
+
+    loop = asyncio.get_running_loop()
+    # Spawn rather than fork: the parent has a running event loop and live connections.
+    # Not a `with` block: Executor.__exit__ waits for every shard, which would block the loop on cancellation.
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    futures: List[asyncio.Future] = []
+    try:
+        futures = [
+            loop.run_in_executor(pool, run_shard, path, shard_output, use_cache, offset, overrides, repeated.get(index))
+            for index, ((path, offset), shard_output) in enumerate(zip(shards, shard_outputs))
+        ]
+
+        pending = set(futures)
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=settings.job_poll_interval)
+            if on_progress is not None:
+                processed = failed = 0
+                for future, shard_output in zip(futures, shard_outputs):
+                    if future.done() and not future.exception():
+                        _, shard_processed, shard_failed = future.result()
+                        processed += shard_processed
+                        failed += shard_failed
+                    else:
+                        processed += await checkpoints.count(shard_output)
+                await on_progress(processed, failed)
+    except BaseException:
+        # Cancelled (job cancel or app shutdown): stop the shards now rather than letting them keep
+        # sending. Their checkpoints let the job resume if it is re-queued.
+        logger.warning(f"Stopping {len(shards)} shard processes for {file_path}")
+        for future in futures:
+            future.cancel()
+        await asyncio.shield(asyncio.to_thread(terminate_pool, pool))
+        raise
+    await asyncio.to_thread(pool.shutdown)
+
+    results = [future.result() for future in futures]
+
+    shard_rejects = [reject_path(path) for path in shard_outputs if os.path.exists(reject_path(path))]
+    if shard_rejects:
+        await asyncio.to_thread(merge_shard_outputs, shard_rejects, reject_path(output_file))
+    elif os.path.exists(reject_path(output_file)):
+        os.remove(reject_path(output_file))  # Left over from a previous run
+
+    if not any(output for output, _, _ in results):
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        return None
+
+    await asyncio.to_thread(merge_shard_outputs, [output for output, _, _ in results if output], output_file)
+    shutil.rmtree(shard_dir, ignore_errors=True)
+
+    logger.success(f"Merged {len(shards)} shard outputs into {output_file}")
+    return output_file
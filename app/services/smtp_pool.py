@@ -0,0 +1,200 @@
+import asyncio
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+
+import aiosmtplib
+from loguru import logger
+
+from app.core.metrics import retries
+from app.core.rate_limiter import TokenBucket
+from app.core.settings import settings
+
+
+class _TrackedSMTP(aiosmtplib.SMTP):
+    """
+    SMTP client that records whether the current message got as far as the DATA command.
+    """
+
+    data_sent = False
+
+    async def data(self, *args, **kwargs):
+        self.data_sent = True
+        return await super().data(*args, **kwargs)
+
+
+class _Slot:
+    """
+    One pooled SMTP session and the number of messages it has sent.
+    """
+
+    def __init__(self):
+        self.client: Optional[_TrackedSMTP] = None
+        self.sent = 0
+
+
+class SMTPPool:
+    """
+    Pool of long-lived, authenticated SMTP sessions.
+
+    Each session is reused for up to `max_messages_per_connection` messages, so the
+    TCP + STARTTLS + AUTH handshake is paid once per session instead of once per email.
+    Dropped sessions are reconnected transparently, and sends are shaped per recipient
+    domain so one large provider is never flooded.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str],
+        password: Optional[str],
+        use_tls: bool,
+        start_tls: bool,
+        validate_certs: bool,
+        size: int,
+        max_messages_per_connection: int,
+        domain_rate_per_minute: float,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.start_tls = start_tls
+        self.validate_certs = validate_certs
+        self.size = max(1, size)
+        self.max_messages_per_connection = max_messages_per_connection
+        self.domain_rate_per_minute = domain_rate_per_minute
+        self._slots: Optional[asyncio.Queue] = None
+        self._domain_buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_settings(cls) -> "SMTPPool":
+        return cls(
+            hostname=settings.mail_server,
+            port=settings.mail_port,
+            username=settings.mail_username if settings.use_credentials else None,
+            password=settings.mail_password.get_secret_value() if settings.use_credentials else None,
+            use_tls=settings.mail_ssl_tls,
+            start_tls=settings.mail_starttls,
+            validate_certs=settings.validate_certs,
+            size=settings.smtp_pool_size,
+            max_messages_per_connection=settings.smtp_max_messages_per_connection,
+            domain_rate_per_minute=settings.smtp_domain_rate_per_minute,
+        )
+
+    def _ensure_slots(self) -> asyncio.Queue:
+        if self._slots is None:
+            self._slots = asyncio.Queue()
+            for _ in range(self.size):
+                self._slots.put_nowait(_Slot())
+        return self._slots
+
+    async def _connect(self, slot: _Slot) -> _TrackedSMTP:
+        client = _TrackedSMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls if not self.use_tls else False,
+            validate_certs=self.validate_certs,
+        )
+        await client.connect()
+        slot.client = client
+        slot.sent = 0
+        logger.info(f"Opened SMTP session to {self.hostname}:{self.port}")
+        return client
+
+    async def _disconnect(self, slot: _Slot) -> None:
+        client, slot.client, slot.sent = slot.client, None, 0
+        if client is None:
+            return
+        try:
+            if client.is_connected:
+                await client.quit()
+        except Exception:
+            client.close()
+
+    async def start(self, prewarm: int = 1) -> None:
+        """
+        Creates the pool and opens up to `prewarm` sessions ahead of the first send.
+        """
+        slots = self._ensure_slots()
+        warmed: List[_Slot] = []
+        for _ in range(min(prewarm, self.size)):
+            slot = await slots.get()
+            try:
+                await self._connect(slot)
+            except Exception as e:
+                logger.warning(f"Could not pre-warm SMTP session: {e}")
+            warmed.append(slot)
+        for slot in warmed:
+            slots.put_nowait(slot)
+
+    async def close(self) -> None:
+        if self._slots is None:
+            return
+        slots, self._slots = self._slots, None
+        while not slots.empty():
+            await self._disconnect(slots.get_nowait())
+
+    async def _throttle(self, recipient: str) -> None:
+        if self.domain_rate_per_minute <= 0:
+            return
+        domain = recipient.rsplit("@", 1)[-1].lower()
+        bucket = self._domain_buckets.get(domain)
+        if bucket is None:
+            bucket = TokenBucket(self.domain_rate_per_minute, self.domain_rate_per_minute / 60.0)
+            self._domain_buckets[domain] = bucket
+        await bucket.acquire(1)
+
+    async def send(self, message: EmailMessage) -> bool:
+        """
+        Sends one message over a pooled session, reconnecting once if the session dropped
+        before the message was handed over. A session that drops during or after DATA is not
+        retried, since the server may already have accepted the message.
+
+        Returns:
+            bool: True if the server accepted the message.
+        """
+        await self._throttle(str(message["To"]))
+
+        slots = self._ensure_slots()
+        slot = await slots.get()
+        try:
+            for attempt in range(2):
+                client = None
+                try:
+                    client = slot.client if slot.client is not None and slot.client.is_connected else await self._connect(slot)
+                    client.data_sent = False
+                    await client.send_message(message)
+                    slot.sent += 1
+                    if slot.sent >= self.max_messages_per_connection:
+                        await self._disconnect(slot)
+                    return True
+                except (aiosmtplib.SMTPServerDisconnected, ConnectionError) as e:
+                    await self._disconnect(slot)
+                    if client is not None and client.data_sent:
+                        logger.error(f"SMTP session dropped after DATA while sending to {message['To']}; not retrying to avoid a duplicate: {e}")
+                        return False
+                    if not attempt:
+                        retries.labels("smtp").inc()
+                    else:
+                        logger.error(f"SMTP session dropped while sending to {message['To']}: {e}")
+                except Exception as e:
+                    logger.error(f"SMTP send to {message['To']} failed: {e}")
+                    await self._disconnect(slot)
+                    return False
+            return False
+        finally:
+            slots.put_nowait(slot)
+
+    async def send_batch(self, messages: List[EmailMessage]) -> List[bool]:
+        """
+        Sends many messages concurrently across the pool's sessions.
+        """
+        return list(await asyncio.gather(*(self.send(message) for message in messages)))
+
+
+smtp_pool = SMTPPool.from_settings()
@@ -0,0 +1,177 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class IndustrySnippets:
+    """
+    Reusable messaging for one industry, used in LLM prompts (`focus`) and to render
+    template-tier emails and call scripts.
+
+    Attributes:
+        focus (str): What outreach to this industry should emphasize.
+        subject_hook (str): Short phrase for subject lines.
+        pain_point (str): A risk or challenge the industry commonly faces.
+        value_prop (str): How coverage addresses it (completes "we ...").
+        proof_point (str): A concrete, non-numeric proof of relevance.
+    """
+    focus: str
+    subject_hook: str
+    pain_point: str
+    value_prop: str
+    proof_point: str
+
+
+DEFAULT_SNIPPETS = IndustrySnippets(
+    focus="highlight tailored benefits.",
+    subject_hook="coverage that fits how you work",
+    pain_point="Most businesses only find the gaps in their coverage when a claim is denied.",
+    value_prop="review your current policies and tailor coverage to the risks your business actually faces",
+    proof_point="Our clients typically come away with broader protection and fewer surprises at renewal.",
+)
+
+INDUSTRY_SNIPPETS: Dict[str, IndustrySnippets] = {
+    "tech": IndustrySnippets(
+        focus="emphasize innovation and cutting-edge technology solutions.",
+        subject_hook="cyber and E&O cover built for tech teams",
+        pain_point="A single data breach or failed release can expose a tech company to claims that general policies exclude.",
+        value_prop="combine cyber liability, technology E&O and IP protection in one policy that scales with your product",
+        proof_point="We work with software and hardware companies from seed stage to public, and handle claims with people who understand the stack.",
+    ),
+    "finance": IndustrySnippets(
+        focus="highlight security and robust ROI potential.",
+        subject_hook="protecting your firm, your clients and your returns",
+        pain_point="Regulators and clients expect financial firms to be covered against fraud, cyber incidents and professional liability claims.",
+        value_prop="bundle professional liability, crime and cyber coverage so your firm is protected without paying for overlapping policies",
+        proof_point="Our financial clients use our coverage reviews to satisfy audits and to keep premiums predictable year over year.",
+    ),
+    "healthcare": IndustrySnippets(
+        focus="stress compliance and efficiency.",
+        subject_hook="compliant coverage for healthcare providers",
+        pain_point="Healthcare providers face malpractice exposure, patient data rules and staffing risks all at once.",
+        value_prop="align malpractice, cyber and workers' compensation coverage with your compliance obligations",
+        proof_point="We help clinics and care providers stay compliant while cutting the time spent on insurance paperwork.",
+    ),
+    "manufacturing": IndustrySnippets(
+        focus="emphasize operational continuity and worker safety.",
+        subject_hook="keeping your lines running",
+        pain_point="Equipment breakdowns, supply chain disruptions and workplace injuries can halt production overnight.",
+        value_prop="cover property, equipment breakdown, business interruption and product liability in a single program",
+        proof_point="Manufacturers we work with get risk assessments from specialists who have walked plant floors.",
+    ),
+    "retail": IndustrySnippets(
+        focus="highlight protection for inventory, storefronts and customer trust.",
+        subject_hook="protection for your stores and stock",
+        pain_point="Retailers carry risk across inventory, premises liability and, increasingly, online payments.",
+        value_prop="protect inventory, premises and e-commerce operations with coverage sized to your seasonal peaks",
+        proof_point="Our retail clients adjust coverage ahead of busy seasons instead of discovering gaps after them.",
+    ),
+    "logistics": IndustrySnippets(
+        focus="emphasize cargo protection and fleet reliability.",
+        subject_hook="coverage that moves with your fleet",
+        pain_point="Cargo loss, vehicle accidents and contract liability add up quickly across a busy fleet.",
+        value_prop="combine cargo, fleet and contractual liability coverage so every shipment is protected end to end",
+        proof_point="We support carriers and 3PLs with fast claims handling that keeps trucks on the road.",
+    ),
+    "construction": IndustrySnippets(
+        focus="stress site safety, contract requirements and project continuity.",
+        subject_hook="coverage that keeps projects on schedule",
+        pain_point="Contractors face site injuries, project delays and the coverage requirements written into every contract.",
+        value_prop="bundle general liability, builder's risk and workers' compensation to meet contract requirements without gaps",
+        proof_point="Our construction clients turn around certificates of insurance quickly, so bids are never held up.",
+    ),
+    "education": IndustrySnippets(
+        focus="highlight student safety and institutional stability.",
+        subject_hook="protecting your students and staff",
+        pain_point="Schools and training providers balance student safety, staff liability and growing cyber risks.",
+        value_prop="cover educators' liability, property and student data under one program built for institutions",
+        proof_point="We work with schools and training providers that need clear coverage their boards can understand.",
+    ),
+    "hospitality": IndustrySnippets(
+        focus="emphasize guest safety and protection against business interruption.",
+        subject_hook="coverage for guests, staff and busy seasons",
+        pain_point="Hotels and restaurants face guest injury claims, liquor liability and revenue lost to closures.",
+        value_prop="protect premises, liquor liability and business income so a bad week never becomes a bad year",
+        proof_point="Our hospitality clients get coverage that reflects seasonal staffing and occupancy.",
+    ),
+    "energy": IndustrySnippets(
+        focus="stress environmental liability and asset protection.",
+        subject_hook="protecting critical energy assets",
+        pain_point="Energy operators carry environmental liability, high-value assets and strict regulatory exposure.",
+        value_prop="structure property, pollution liability and business interruption cover around your assets and permits",
+        proof_point="We place coverage for energy operators with underwriters who specialize in the sector.",
+    ),
+    "real estate": IndustrySnippets(
+        focus="highlight property protection and tenant liability.",
+        subject_hook="coverage across your whole portfolio",
+        pain_point="Property owners and managers juggle tenant liability, property damage and loss of rental income.",
+        value_prop="consolidate property, liability and loss-of-rent coverage across your portfolio",
+        proof_point="Our real estate clients manage every property on one renewal schedule instead of dozens.",
+    ),
+    "legal": IndustrySnippets(
+        focus="emphasize professional liability and client confidentiality.",
+        subject_hook="professional liability cover for your firm",
+        pain_point="Law firms face malpractice claims and hold confidential client data that attackers target.",
+        value_prop="pair lawyers' professional liability with cyber coverage that protects client confidentiality",
+        proof_point="We help firms of every size meet bar and client requirements for coverage.",
+    ),
+}
+
+INDUSTRY_ALIASES = {
+    "technology": "tech",
+    "software": "tech",
+    "it": "tech",
+    "saas": "tech",
+    "financial services": "finance",
+    "banking": "finance",
+    "fintech": "finance",
+    "insurance": "finance",
+    "health": "healthcare",
+    "health care": "healthcare",
+    "medical": "healthcare",
+    "pharma": "healthcare",
+    "transportation": "logistics",
+    "shipping": "logistics",
+    "trucking": "logistics",
+    "ecommerce": "retail",
+    "e-commerce": "retail",
+    "hotels": "hospitality",
+    "restaurants": "hospitality",
+    "oil and gas": "energy",
+    "utilities": "energy",
+    "property": "real estate",
+    "law": "legal",
+}
+
+# Answers for common objections, matched by keyword
+OBJECTION_RESPONSES: List[Tuple[Tuple[str, ...], str]] = [
+    (("budget", "cost", "price", "expensive", "afford"), "I know budgets are tight, so our review often finds savings in overlapping policies that help pay for better coverage."),
+    (("competitor", "already", "current provider", "existing", "broker"), "If you already have a provider, a second opinion costs nothing and often turns up gaps worth knowing about."),
+    (("time", "busy", "later", "timing"), "The review takes about fifteen minutes of your time; we do the heavy lifting."),
+    (("need", "not interested", "covered"), "Even well-covered businesses are often surprised by what their policies exclude."),
+]
+
+
+def industry_key(industry: Any) -> str:
+    key = str(industry or "").strip().lower()
+    return INDUSTRY_ALIASES.get(key, key)
+
+
+def get_snippets(industry: Any) -> Optional[IndustrySnippets]:
+    """
+    Returns the snippets for an industry (or a common alias of it), or None if the library has none.
+    """
+    return INDUSTRY_SNIPPETS.get(industry_key(industry))
+
+
+def objection_response(objections: Any) -> str:
+    """
+    Returns a sentence answering the first recognized objection, or "" if none is recognized.
+    """
+    if isinstance(objections, (list, tuple)):
+        objections = " ".join(str(o) for o in objections if o)
+    text = str(objections or "").lower()
+    for keywords, response in OBJECTION_RESPONSES:
+        if any(keyword in text for keyword in keywords):
+            return response
+    return ""
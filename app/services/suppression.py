@@ -0,0 +1,196 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.database import Database, db
+from app.core.settings import settings
+from app.utils.bloom import BloomFilter
+
+SUPPRESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contact_index (
+    channel TEXT NOT NULL,
+    contact TEXT NOT NULL,
+    last_contacted_at REAL,
+    suppressed TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (channel, contact)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_contact_index_updated ON contact_index (updated_at);
+"""
+
+UNSUBSCRIBED, DO_NOT_CALL = "unsubscribed", "do_not_call"
+SUPPRESSION_REASONS = (UNSUBSCRIBED, DO_NOT_CALL)
+
+# Stay well below SQLite's bound-parameter limit.
+_LOOKUP_CHUNK = 500
+_SCAN_CHUNK = 50_000
+
+
+def contact_of(row: Dict) -> Tuple[str, Optional[str]]:
+    """
+    Returns (channel, normalized contact address) for a validated prospect row.
+    """
+    channel = row.get("outreach_type")
+    return channel, row.get("prospect_email") if channel == "email" else row.get("prospect_phone")
+
+
+def normalize_contacts(channel: str, contacts: Iterable[str]) -> List[str]:
+    import pandas as pd
+
+    from app.services.validation import normalize_emails, normalize_phones
+
+    column = pd.Series(list(contacts), dtype=object)
+    normalized = normalize_emails(column) if channel == "email" else normalize_phones(column)
+    return [contact for contact in normalized.tolist() if contact]
+
+
+class ContactIndex:
+    """
+    Persistent index of contacted and suppressed prospects, per channel.
+
+    Each (channel, contact) row records when the contact was last reached and whether it
+    unsubscribed or is on a do-not-call list. Suppressed contacts are always skipped;
+    contacted ones are skipped for the channel's cooldown (settings.suppression_cooldown_days).
+
+    Membership checks are batched primary-key lookups. With settings.suppression_bloom,
+    a Bloom filter answers the common "never seen" case in memory first, so only likely
+    hits reach SQLite. The filter is refreshed from rows updated by other processes
+    before each check, so it never misses a contact.
+    """
+
+    def __init__(self, database: Database):
+        self.database = database
+        self._schema_ready = False
+        self._bloom: Optional[BloomFilter] = None
+        self._bloom_watermark = 0.0
+        self._bloom_lock = asyncio.Lock()
+
+    async def _ensure_schema(self) -> None:
+        if not self._schema_ready:
+            await self.database.executescript(SUPPRESSION_SCHEMA)
+            self._schema_ready = True
+
+    @staticmethod
+    def _key(channel: str, contact: str) -> str:
+        return f"{channel}:{contact}"
+
+    def _load_bloom(self, since: float) -> float:
+        """
+        Adds rows updated at or after `since` to the Bloom filter, in chunks. Returns the new watermark.
+        """
+        watermark = since
+        last: Tuple[float, str, str] = (since, "", "")
+        while True:
+            rows = self.database.fetchall_sync(
+                "SELECT channel, contact, updated_at FROM contact_index "
+                "WHERE updated_at > ? OR (updated_at = ? AND (channel, contact) > (?, ?)) "
+                "ORDER BY updated_at, channel, contact LIMIT ?",
+                (last[0], last[0], last[1], last[2], _SCAN_CHUNK),
+            )
+            for row in rows:
+                self._bloom.add(self._key(row["channel"], row["contact"]))  # type: ignore[union-attr]
+            if rows:
+                last = (rows[-1]["updated_at"], rows[-1]["channel"], rows[-1]["contact"])
+                watermark = max(watermark, last[0])
+            if len(rows) < _SCAN_CHUNK:
+                return watermark
+
+    async def _refresh_bloom(self) -> Optional[BloomFilter]:
+        if not settings.suppression_bloom:
+            return None
+        async with self._bloom_lock:
+            if self._bloom is None:
+                self._bloom = BloomFilter(settings.suppression_bloom_capacity, settings.suppression_bloom_error_rate)
+                started = time.monotonic()
+                self._bloom_watermark = await asyncio.to_thread(self._load_bloom, 0.0)
+                logger.info(f"Loaded {self._bloom.count} contacts into the suppression Bloom filter in {time.monotonic() - started:.1f}s")
+            else:
+                # Pick up contacts recorded by other processes. A second of overlap covers clock skew.
+                self._bloom_watermark = await asyncio.to_thread(self._load_bloom, max(0.0, self._bloom_watermark - 1.0))
+        return self._bloom
+
+    async def check(self, channel: str, contacts: List[str]) -> Dict[str, str]:
+        """
+        Returns {contact: reason} for the contacts that must not be reached on `channel`.
+        """
+        await self._ensure_schema()
+        bloom = await self._refresh_bloom()
+        candidates = list({contact for contact in contacts if contact and (bloom is None or self._key(channel, contact) in bloom)})
+
+        cooldown = settings.suppression_cooldown_days.get(channel, 0.0) * 86400
+        now = time.time()
+        blocked: Dict[str, str] = {}
+        for start in range(0, len(candidates), _LOOKUP_CHUNK):
+            chunk = candidates[start:start + _LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = await self.database.fetchall(
+                f"SELECT contact, last_contacted_at, suppressed FROM contact_index WHERE channel = ? AND contact IN ({placeholders})",
+                (channel, *chunk),
+            )
+            for row in rows:
+                if row["suppressed"]:
+                    blocked[row["contact"]] = row["suppressed"]
+                elif row["last_contacted_at"] and now - row["last_contacted_at"] < cooldown:
+                    blocked[row["contact"]] = "contacted within cooldown"
+        return blocked
+
+    async def mark_contacted(self, channel: str, contact: str) -> None:
+        await self._ensure_schema()
+        now = time.time()
+        await self.database.execute(
+            "INSERT INTO contact_index (channel, contact, last_contacted_at, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (channel, contact) DO UPDATE SET last_contacted_at = excluded.last_contacted_at, updated_at = excluded.updated_at",
+            (channel, contact, now, now),
+        )
+        if self._bloom is not None:
+            self._bloom.add(self._key(channel, contact))
+
+    async def suppress(self, channel: str, contacts: Iterable[str], reason: str) -> int:
+        """
+        Adds contacts to the suppression list (e.g. unsubscribes or a do-not-call list).
+
+        Returns:
+            int: Number of contacts stored.
+        """
+        await self._ensure_schema()
+        now = time.time()
+        normalized = normalize_contacts(channel, contacts)
+        await self.database.executemany(
+            "INSERT INTO contact_index (channel, contact, suppressed, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (channel, contact) DO UPDATE SET suppressed = excluded.suppressed, updated_at = excluded.updated_at",
+            [(channel, contact, reason, now) for contact in normalized],
+        )
+        if self._bloom is not None:
+            for contact in normalized:
+                self._bloom.add(self._key(channel, contact))
+        logger.info(f"Suppressed {len(normalized)} {channel} contacts ({reason})")
+        return len(normalized)
+
+    async def release(self, channel: str, contacts: Iterable[str]) -> int:
+        """
+        Removes contacts from the index entirely, lifting suppressions and cooldowns.
+        Bloom filters keep stale bits, which only cost an extra lookup.
+        """
+        await self._ensure_schema()
+        normalized = normalize_contacts(channel, contacts)
+        await self.database.executemany(
+            "DELETE FROM contact_index WHERE channel = ? AND contact = ?",
+            [(channel, contact) for contact in normalized],
+        )
+        return len(normalized)
+
+    async def status(self, channel: str, contact: str) -> Optional[Dict]:
+        await self._ensure_schema()
+        normalized = normalize_contacts(channel, [contact])
+        if not normalized:
+            return None
+        row = await self.database.fetchone(
+            "SELECT channel, contact, last_contacted_at, suppressed FROM contact_index WHERE channel = ? AND contact = ?",
+            (channel, normalized[0]),
+        )
+        return dict(row) if row else None
+
+
+contact_index = ContactIndex(db)
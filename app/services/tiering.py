@@ -0,0 +1,201 @@
+import re
+from typing import Any, Dict, List, Tuple, Union
+
+from app.core.metrics import generation_tiers
+from app.core.settings import settings
+from app.schemas.call import CallResponse
+from app.schemas.email import EmailResponse
+from app.services.snippets import DEFAULT_SNIPPETS, IndustrySnippets, get_snippets, industry_key, objection_response
+
+# Generation tiers, cheapest first
+TEMPLATE = "template"
+SMALL_MODEL = "small"
+FULL_MODEL = "full"
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_TRAILING_SPACE = re.compile(r"[ \t]+(?=\n|$)")
+_DOUBLE_SPACE = re.compile(r"(?<=\S)  +")
+
+
+class CompiledTemplate:
+    """
+    Text with {placeholder}s, split once into literal parts and field names so that
+    rendering is a single join. Unknown placeholders render as empty strings.
+    """
+
+    def __init__(self, text: str):
+        self.parts: List[Union[str, Tuple[str]]] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(text):
+            self.parts.append(text[position:match.start()])
+            self.parts.append((match.group(1),))
+            position = match.end()
+        self.parts.append(text[position:])
+
+    def render(self, values: Dict[str, Any]) -> str:
+        text = "".join(part if isinstance(part, str) else str(values.get(part[0], "")) for part in self.parts)
+        # Optional values (e.g. no recognized objection) may leave stray spaces behind
+        return _DOUBLE_SPACE.sub(" ", _TRAILING_SPACE.sub("", text))
+
+
+# Templates per engagement level: 0 is a first touch, 1 a follow-up to a prospect who has seen us before.
+EMAIL_SUBJECTS = {
+    0: CompiledTemplate("{company_name}: {subject_hook}"),
+    1: CompiledTemplate("Following up, {first_name}: {subject_hook}"),
+}
+
+EMAIL_BODIES = {
+    0: CompiledTemplate(
+        "Hi {first_name},\n\n"
+        "{pain_point} {role_line}\n\n"
+        "At {insurance_company_name}, we {value_prop}. {outreach_description}\n\n"
+        "{proof_point} {objection_line}\n\n"
+        "Would you be open to a quick 15-minute call next week to see whether this could help {company_name}?\n\n"
+        "Best regards,\n{signature}"
+    ),
+    1: CompiledTemplate(
+        "Hi {first_name},\n\n"
+        "Thanks again for your interest in {insurance_company_name}. I wanted to follow up with something specific to {company_name}: "
+        "{pain_point_lower}\n\n"
+        "We {value_prop}. {outreach_description}\n\n"
+        "{proof_point} {objection_line}\n\n"
+        "Could we set up a short call or a free coverage review this week? Just reply with a time that suits you.\n\n"
+        "Best regards,\n{signature}"
+    ),
+}
+
+CALL_SCRIPTS = {
+    0: CompiledTemplate(
+        "Hi {first_name}, this is {sender_intro}. Do you have a minute? "
+        "{pain_point} {role_line} "
+        "We {value_prop}. {outreach_description} "
+        "{proof_point} {objection_line} "
+        "Would you be open to a 15-minute call next week so I can show you what this could look like for {company_name}?"
+    ),
+    1: CompiledTemplate(
+        "Hi {first_name}, it's {sender_name} from {insurance_company_name} again. Thanks for taking my call. "
+        "Last time we touched on coverage for {company_name}, and I wanted to follow up: {pain_point_lower} "
+        "We {value_prop}. {outreach_description} "
+        "{objection_line} Could we book a free coverage review this week?"
+    ),
+}
+
+ENGAGEMENT_ADVICE = {
+    ("email", 0): CompiledTemplate("Follow up in 3-4 days with a short industry-specific insight for {company_name}; if there is no reply, try a call after a week."),
+    ("email", 1): CompiledTemplate("Follow up in 2-3 days offering a free coverage review; reference {subject_hook} and suggest two concrete meeting times."),
+    ("call", 0): CompiledTemplate("If {first_name} doesn't pick up, leave a 20-second voicemail and send a short email the same day; try again in 3 days."),
+    ("call", 1): CompiledTemplate("Send a recap email right after the call with a link to book a coverage review; follow up within 2 days."),
+}
+
+
+def engagement_of(params: Dict[str, Any]) -> int:
+    try:
+        return int(float(params.get("engagement_level") or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def choose_tier(params: Dict[str, Any], channel: str) -> str:
+    """
+    Picks the generation tier for a prospect.
+
+    The engagement level, raised by settings.tier_channel_boost for the outreach type and
+    settings.tier_industry_boost for the industry, is compared with the tier thresholds.
+    Template rendering is only used for industries in the snippet library; others start at
+    the small model.
+
+    Parameters:
+        params (dict): Prospect fields (engagement_level, industry, ...).
+        channel (str): 'email' or 'call'.
+
+    Returns:
+        str: TEMPLATE, SMALL_MODEL or FULL_MODEL.
+    """
+    level = engagement_of(params) + settings.tier_channel_boost.get(channel, 0) + settings.tier_industry_boost.get(industry_key(params.get("industry")), 0)
+    if level <= settings.tier_template_max_engagement and get_snippets(params.get("industry")) is not None:
+        return TEMPLATE
+    if level <= settings.tier_small_model_max_engagement:
+        return SMALL_MODEL
+    return FULL_MODEL
+
+
+def record_tier(channel: str, tier: str) -> None:
+    generation_tiers.labels(channel, tier).inc()
+
+
+def _text(value: Any) -> str:
+    """
+    Returns a prospect field as stripped text. Blank cells read by pandas are NaN or NA, which
+    are truthy, so they are mapped to "" here rather than rendering as "nan".
+    """
+    if value is None:
+        return ""
+    if not isinstance(value, (str, list, tuple, dict)):
+        import pandas as pd  # Only rows read by pandas carry NaN/NA, so it is already loaded then
+
+        if pd.isna(value):
+            return ""
+    return str(value).strip()
+
+
+def _values(params: Dict[str, Any], snippets: IndustrySnippets) -> Dict[str, Any]:
+    name = _text(params.get("prospect_name"))
+    title = _text(params.get("prospect_title"))
+    company = _text(params.get("company_name"))
+    description = _text(params.get("outreach_description"))
+    sender_name = _text(params.get("sender_name"))
+    sender_title = _text(params.get("sender_title"))
+    insurer = _text(params.get("insurance_company_name"))
+    objections = params.get("objections")
+    if description and description[-1] not in ".!?":
+        description += "."
+    return {
+        "first_name": name.split()[0] if name else "there",
+        "company_name": company,
+        "role_line": f"As {title} at {company}, you're probably the one who feels that first." if title else f"Teams like {company} feel that first.",
+        "subject_hook": snippets.subject_hook,
+        "pain_point": snippets.pain_point,
+        "pain_point_lower": snippets.pain_point[:1].lower() + snippets.pain_point[1:],
+        "value_prop": snippets.value_prop,
+        "proof_point": snippets.proof_point,
+        "objection_line": objection_response(objections if isinstance(objections, (list, tuple)) else _text(objections)),
+        "outreach_description": description,
+        "insurance_company_name": insurer,
+        "sender_name": sender_name,
+        "sender_title": sender_title,
+        "signature": "\n".join(line for line in (sender_name, sender_title, insurer) if line),
+        "sender_intro": f"{sender_name}, {sender_title} at {insurer}" if sender_title else f"{sender_name} at {insurer}",
+    }
+
+
+def _level(params: Dict[str, Any]) -> int:
+    return min(max(engagement_of(params), 0), max(EMAIL_BODIES))
+
+
+def render_email(params: Dict[str, Any]) -> EmailResponse:
+    """
+    Renders a template-tier email from the industry snippet library, without an LLM request.
+    """
+    snippets = get_snippets(params.get("industry")) or DEFAULT_SNIPPETS
+    values = _values(params, snippets)
+    level = _level(params)
+    return EmailResponse(
+        prospect_email=params["prospect_email"],
+        subject=EMAIL_SUBJECTS[level].render(values),
+        email=EMAIL_BODIES[level].render(values),
+        engagement_advice=ENGAGEMENT_ADVICE[("email", level)].render(values),
+    )
+
+
+def render_call(params: Dict[str, Any]) -> CallResponse:
+    """
+    Renders a template-tier call script from the industry snippet library, without an LLM request.
+    """
+    snippets = get_snippets(params.get("industry")) or DEFAULT_SNIPPETS
+    values = _values(params, snippets)
+    level = _level(params)
+    return CallResponse(
+        prospect_phone=str(params["prospect_phone"]),
+        call_script=CALL_SCRIPTS[level].render(values),
+        engagement_advice=ENGAGEMENT_ADVICE[("call", level)].render(values),
+    )
@@ -0,0 +1,105 @@
+import asyncio
+from typing import Optional
+
+import httpx
+
+from app.core.rate_limiter import TokenBucket
+from app.core.settings import settings
+from app.schemas.call import CallDispatchResult
+
+
+class TwilioCallError(Exception):
+    """
+    Raised when the Twilio Calls API rejects a call.
+    """
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Twilio returned {status_code}: {message}")
+        self.status_code = status_code
+
+
+class TwilioDispatcher:
+    """
+    Non-blocking client for the Twilio Calls REST endpoint.
+
+    Calls are placed over one pooled, keep-alive HTTP client, concurrently up to
+    `max_concurrency`, and never faster than `calls_per_second`. Pointing `base_url`
+    at a local server that mimics the Calls endpoint makes the dispatcher testable offline.
+    """
+
+    def __init__(self, account_sid: str, auth_token: str, from_number: str, base_url: str, calls_per_second: float, max_concurrency: int):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_number = from_number
+        self.base_url = base_url.rstrip("/")
+        self.calls_per_second = calls_per_second
+        self.max_concurrency = max(1, max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._bucket: Optional[TokenBucket] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_settings(cls) -> "TwilioDispatcher":
+        return cls(
+            account_sid=settings.twilio_account_sid.get_secret_value(),
+            auth_token=settings.twilio_auth_token.get_secret_value(),
+            from_number=settings.twilio_phone_number,
+            base_url=settings.twilio_api_base_url,
+            calls_per_second=settings.twilio_calls_per_second,
+            max_concurrency=settings.twilio_max_concurrency,
+        )
+
+    @property
+    def calls_path(self) -> str:
+        return f"/2010-04-01/Accounts/{self.account_sid}/Calls.json"
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(self.account_sid, self.auth_token),
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+                timeout=30.0,
+            )
+            self._bucket = TokenBucket(max(1.0, self.calls_per_second), self.calls_per_second)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def place_call(self, to: str, twiml: str) -> CallDispatchResult:
+        """
+        Places one outbound call.
+
+        Parameters:
+            to (str): Destination phone number in E.164 format.
+            twiml (str): TwiML instructions for the call.
+
+        Returns:
+            CallDispatchResult: The call SID and the status reported by Twilio.
+        """
+        await self.start()
+        await self._bucket.acquire(1)  # type: ignore[union-attr]
+
+        async with self._semaphore:  # type: ignore[union-attr]
+            response = await self._client.post(  # type: ignore[union-attr]
+                self.calls_path,
+                data={"To": to, "From": self.from_number, "Twiml": twiml},
+            )
+
+        try:
+            payload = response.json() if response.content else {}
+        except ValueError:  # e.g. an HTML error page from a proxy
+            payload = None
+        if response.status_code >= 400:
+            message = payload.get("message") if isinstance(payload, dict) else None
+            raise TwilioCallError(response.status_code, message or response.text[:200])
+        if not isinstance(payload, dict):
+            raise TwilioCallError(response.status_code, f"unexpected response body: {response.text[:200]!r}")
+
+        return CallDispatchResult(prospect_phone=to, call_sid=payload.get("sid"), call_status=payload.get("status"))
+
+
+twilio_dispatcher = TwilioDispatcher.from_settings()
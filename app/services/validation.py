@@ -0,0 +1,172 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.settings import settings
+
+# Fields that must have a value, per outreach type. prospect_title and objections may be blank.
+REQUIRED_VALUES: Dict[str, List[str]] = {
+    "email": ["prospect_email", "prospect_name", "company_name", "industry", "engagement_level", "outreach_description", "insurance_company_name"],
+    "call": ["prospect_phone", "prospect_name", "company_name", "industry", "engagement_level", "outreach_description", "insurance_company_name", "sender_name", "sender_title"],
+}
+
+# Text engagement levels accepted in place of the 0-4 score.
+ENGAGEMENT_LEVELS: Dict[str, int] = {
+    "none": 0,
+    "cold": 0,
+    "low": 1,
+    "medium": 2,
+    "warm": 2,
+    "high": 3,
+    "very high": 4,
+    "hot": 4,
+}
+
+EMAIL_PATTERN = r"[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+@[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)+"
+E164_PATTERN = r"\+[1-9]\d{7,14}"
+
+REJECT_REASON = "reject_reason"
+
+
+def _text(column: pd.Series) -> pd.Series:
+    """
+    Returns a column as stripped strings, with missing values as "".
+    """
+    if pd.api.types.is_float_dtype(column):
+        # Numeric columns with gaps (e.g. phone numbers read by pandas) are floats; drop the ".0"
+        # from whole numbers. Others (e.g. 1.5) keep their text and are rejected by validation.
+        whole = (column % 1 == 0) & (column.abs() < 2**53)
+        column = column.astype("string").mask(whole, column.where(whole).astype("Int64").astype("string"))
+    return column.astype("string").fillna("").str.strip()
+
+
+def normalize_emails(column: pd.Series) -> pd.Series:
+    return _text(column).str.lower()
+
+
+def normalize_phones(column: pd.Series) -> pd.Series:
+    """
+    Normalizes phone numbers towards E.164: strips separators, turns a leading 00 into +,
+    and adds settings.default_phone_country_code to numbers without a leading +.
+
+    A number without + that already starts with the country code and is
+    settings.default_phone_national_length digits after it (e.g. 15551234567 for code 1)
+    only gets the +. Other numbers get the code only if they are exactly a national number
+    long; the rest are left as they are, so E.164 validation rejects them rather than a
+    wrong number being dialed.
+    """
+    phones = _text(column).str.replace(r"[\s().\-]", "", regex=True)
+    phones = phones.str.replace(r"^00", "+", regex=True)
+    national = (phones != "") & ~phones.str.startswith("+")
+    country_code = settings.default_phone_country_code
+    if country_code:
+        length = settings.default_phone_national_length
+        digits = phones.str.lstrip("0")  # Drop the national trunk prefix
+        if length:
+            has_code = national & phones.str.startswith(country_code) & (phones.str.len() == len(country_code) + length)
+            phones = phones.mask(has_code, "+" + phones)
+            phones = phones.mask(national & ~has_code & (digits.str.len() == length), "+" + country_code + digits)
+        else:
+            # Without a fixed length, a number starting with the country code is ambiguous.
+            phones = phones.mask(national & ~phones.str.startswith(country_code), "+" + country_code + digits)
+    return phones
+
+
+def normalize_engagement(column: pd.Series) -> pd.Series:
+    """
+    Converts engagement levels to nullable integers, mapping text levels (e.g. "High") to scores.
+    Values that are neither are returned as NA.
+    """
+    if pd.api.types.is_numeric_dtype(column):
+        levels = column.astype("float64")
+    else:
+        levels = pd.to_numeric(column, errors="coerce")
+        words = levels.isna() & column.notna()
+        if words.any():
+            levels = levels.fillna(_text(column[words]).str.lower().map(ENGAGEMENT_LEVELS).astype("float64"))
+    whole = levels.notna() & (levels == levels.round())
+    return levels.where(whole).astype("Int64")
+
+
+def split_objections(column: pd.Series) -> pd.Series:
+    """
+    Splits comma-separated objections into lists, with [] for blanks.
+    """
+    text = _text(column)
+    values = text.str.split(r"\s*,\s*", regex=True).to_numpy(dtype=object, copy=True)
+    blank = (text == "").to_numpy()
+    if blank.any():
+        empty = np.empty(int(blank.sum()), dtype=object)
+        empty[:] = [[] for _ in range(len(empty))]
+        values[blank] = empty
+    return pd.Series(values, index=column.index, dtype=object)
+
+
+def validate_batch(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validates and normalizes a batch of prospects using whole-column operations.
+
+    Checks the outreach type, required values per outreach type, email syntax, E.164 phone
+    numbers and the 0-4 engagement range. Valid rows come back normalized (lower-cased
+    emails, E.164 phones, integer engagement levels, objection lists).
+
+    Parameters:
+        df (pd.DataFrame): Raw prospect rows.
+
+    Returns:
+        tuple: (valid rows, rejected rows). Rejected rows keep their original values plus a
+            `reject_reason` column.
+    """
+    reasons = pd.Series("", index=df.index, dtype="string")
+
+    def reject(mask: pd.Series, reason: str) -> None:
+        nonlocal reasons
+        mask = mask & (reasons == "")  # Report the first problem only
+        reasons = reasons.mask(mask, reason)
+
+    outreach_type = _text(df["outreach_type"]).str.lower() if "outreach_type" in df.columns else pd.Series("", index=df.index, dtype="string")
+    is_email = outreach_type == "email"
+    is_call = outreach_type == "call"
+    reject(~(is_email | is_call), "invalid outreach_type")
+
+    normalized: Dict[str, pd.Series] = {"outreach_type": outreach_type}
+    if "prospect_email" in df.columns:
+        normalized["prospect_email"] = normalize_emails(df["prospect_email"])
+    if "prospect_phone" in df.columns:
+        normalized["prospect_phone"] = normalize_phones(df["prospect_phone"])
+    if "engagement_level" in df.columns:
+        normalized["engagement_level"] = normalize_engagement(df["engagement_level"])
+
+    blanks: Dict[str, pd.Series] = {}
+    for channel, rows in (("email", is_email), ("call", is_call)):
+        for column in REQUIRED_VALUES[channel]:
+            if column not in df.columns:
+                reject(rows, f"missing {column}")
+                continue
+            if column not in blanks:
+                blanks[column] = df[column].isna() if column == "engagement_level" else _text(df[column]) == ""
+            reject(rows & blanks[column], f"missing {column}")
+
+    if "prospect_email" in normalized:
+        emails = normalized["prospect_email"]
+        reject(is_email & ~emails.str.fullmatch(EMAIL_PATTERN).fillna(False).astype(bool), "invalid prospect_email")
+    if "prospect_phone" in normalized:
+        phones = normalized["prospect_phone"]
+        reject(is_call & ~phones.str.fullmatch(E164_PATTERN).fillna(False).astype(bool), "invalid prospect_phone")
+    if "engagement_level" in normalized:
+        levels = normalized["engagement_level"]
+        in_range = levels.between(0, 4).fillna(False).astype(bool)
+        reject((is_email | is_call) & ~in_range, "invalid engagement_level")
+
+    rejected_mask = (reasons != "").to_numpy()
+    rejected = df[rejected_mask].copy()
+    rejected[REJECT_REASON] = reasons[rejected_mask].astype(object)
+
+    valid = df[~rejected_mask].copy()
+    for column, values in normalized.items():
+        valid[column] = values[~rejected_mask].astype(object) if column != "engagement_level" else values[~rejected_mask].astype(int)
+    if "objections" in valid.columns:
+        valid["objections"] = split_objections(valid["objections"])
+
+    return valid, rejected
@@ -0,0 +1,29 @@
+import os
+import tempfile
+
+# Settings are read at import time, so the test environment is set up before anything imports app.
+_workdir = tempfile.mkdtemp(prefix="gamma-tests-")
+for name, value in {
+    "mail_username": "sender@example.com",
+    "mail_password": "test",
+    "mail_from": "sender@example.com",
+    "mail_from_name": "Test Sender",
+    "GROQ_API_KEY": "gsk_test",
+    "twilio_account_sid": "ACtest",
+    "twilio_auth_token": "test",
+    "twilio_phone_number": "+15550000000",
+    "twilio_verified_phone_number": "+15550000000",
+}.items():
+    os.environ.setdefault(name, value)
+os.environ.update({
+    "DATABASE_PATH": os.path.join(_workdir, "test.db"),
+    "UPLOAD_DIR": os.path.join(_workdir, "uploads"),
+    "PREWARM_CLIENTS": "false",
+})
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.campaign import CampaignCallTemplate, CampaignEmailTemplate
+from app.services.campaign import CampaignGenerator, campaign_email_generator, fill_template
+from app.services.generation import IncompleteResponse
+
+EMAIL_TEMPLATE = {
+    "subject_template": "Cover {company_name}",
+    "body_template": "Hi {prospect_name},\n\n{personal_opening}\n\n{objection_handling}",
+    "pitch_summary": "Cold chain coverage.",
+}
+
+
+def test_valid_templates():
+    assert CampaignEmailTemplate.model_validate(EMAIL_TEMPLATE).subject_template == "Cover {company_name}"
+    CampaignCallTemplate(script_template="Hello {prospect_name}, {personal_opening}", pitch_summary="Coverage.")
+
+
+@pytest.mark.parametrize(
+    "field, value, message",
+    [
+        ("subject_template", "Hi {first_name}", "unknown placeholders: {first_name}"),
+        ("body_template", "{personal_opening} Regards, {sender_name}", "unknown placeholders: {sender_name}"),
+        ("body_template", "Hi {prospect_name}, we insure {company_name}.", "missing placeholders: {personal_opening}"),
+    ],
+)
+def test_invalid_email_templates(field, value, message):
+    with pytest.raises(ValidationError, match=message):
+        CampaignEmailTemplate.model_validate({**EMAIL_TEMPLATE, field: value})
+
+
+def test_call_template_requires_personal_opening():
+    with pytest.raises(ValidationError, match="missing placeholders"):
+        CampaignCallTemplate(script_template="Hello {prospect_name}", pitch_summary="Coverage.")
+
+
+def test_invalid_template_field_is_repaired():
+    # Only the bad field is asked for again, the rest of the reply is kept
+    with pytest.raises(IncompleteResponse) as raised:
+        campaign_email_generator.validate({**EMAIL_TEMPLATE, "body_template": "Hi {first_name}"})
+    assert raised.value.fields == ["body_template"]
+
+
+def test_fill_template():
+    values = {"prospect_name": "Jane {x}", "company_name": "Acme"}
+    assert fill_template("Hi {prospect_name} at {company_name}", values) == "Hi Jane {x} at Acme"
+    with pytest.raises(ValueError, match="first_name"):
+        fill_template("Hi {first_name}", values)
+
+
+@pytest.mark.anyio
+async def test_template_cache_is_bounded(monkeypatch):
+    requests = []
+
+    async def agenerate(params, use_cache=True):
+        requests.append(params["insurance_company_name"])
+        await asyncio.sleep(0)
+        return CampaignEmailTemplate.model_validate(EMAIL_TEMPLATE)
+
+    monkeypatch.setattr(campaign_email_generator, "agenerate", agenerate)
+    generator = CampaignGenerator(max_templates=2)
+    for company in ["A", "B", "A", "C", "A", "B"]:
+        await generator._template("email", {"insurance_company_name": company}, use_cache=True)
+    # B was the least recently used when C came in, so it is generated again
+    assert requests == ["A", "B", "C", "B"]
+    assert len(generator._templates) == 2
+
+
+@pytest.mark.anyio
+async def test_concurrent_rows_share_one_template(monkeypatch):
+    requests = []
+
+    async def agenerate(params, use_cache=True):
+        requests.append(params["insurance_company_name"])
+        await asyncio.sleep(0.01)
+        return CampaignEmailTemplate.model_validate(EMAIL_TEMPLATE)
+
+    monkeypatch.setattr(campaign_email_generator, "agenerate", agenerate)
+    generator = CampaignGenerator()
+    templates = await asyncio.gather(*(generator._template("email", {"insurance_company_name": "A"}, True) for _ in range(5)))
+    assert requests == ["A"]
+    assert all(template is templates[0] for template in templates)
+
+
+def test_stale_cached_template_is_ignored():
+    stale = {**EMAIL_TEMPLATE, "body_template": "Hi {prospect_name}"}
+    assert campaign_email_generator.from_cache("key", stale) is None
+    assert campaign_email_generator.from_cache("key", EMAIL_TEMPLATE).pitch_summary == "Cold chain coverage."
+    assert campaign_email_generator.from_cache("key", None) is None
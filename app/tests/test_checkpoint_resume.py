@@ -0,0 +1,83 @@
+import uuid
+
+import pandas as pd
+import pytest
+
+from app.schemas.email import EmailResponse
+from app.services import process_files
+from app.services.checkpoint import checkpoints
+from app.services.process_files import process_outreach
+
+
+def prospect(email):
+    return {
+        "outreach_type": "email",
+        "prospect_email": email,
+        "prospect_name": "Jane Doe",
+        "company_name": "Acme",
+        "prospect_title": "CFO",
+        "industry": "tech",
+        "engagement_level": 2,
+        "objections": "",
+        "outreach_description": "Cold chain coverage",
+        "insurance_company_name": "Gamma Insurance",
+        "sender_name": "Sam Seller",
+        "sender_title": "Account Executive",
+    }
+
+
+@pytest.fixture
+def outreach(monkeypatch):
+    """
+    Stubs generation and sending; `state` lists the prospects generated and sent, and the
+    addresses whose generation or send should fail.
+    """
+    state = {"generated": [], "sent": [], "fail_generation": set(), "fail_send": set()}
+
+    async def generate(row, use_cache=True):
+        state["generated"].append(row["prospect_email"])
+        if row["prospect_email"] in state["fail_generation"]:
+            return None
+        return EmailResponse(prospect_email=row["prospect_email"], subject="Hi", email="Body", engagement_advice="Follow up")
+
+    async def send(response):
+        if response.prospect_email in state["fail_send"]:
+            return False
+        state["sent"].append(response.prospect_email)
+        return True
+
+    monkeypatch.setattr(process_files, "generate_email_content", generate)
+    monkeypatch.setattr(process_files, "send_email", send)
+    return state
+
+
+@pytest.mark.anyio
+async def test_failed_rows_are_retried_on_resume(tmp_path, outreach):
+    # Fresh addresses, so the contact index has no cooldown for them from other tests
+    a, b, c = (f"{name}-{uuid.uuid4().hex[:8]}@x.com" for name in "abc")
+    path = str(tmp_path / "prospects.csv")
+    pd.DataFrame([prospect(a), prospect(b), prospect(c)]).to_csv(path, index=False)
+    output = str(tmp_path / "processed.csv")
+    progress = []
+
+    async def on_progress(processed, failed):
+        progress.append((processed, failed))
+
+    outreach["fail_generation"].add(b)
+    outreach["fail_send"].add(c)
+    await process_outreach(path, output, on_progress=on_progress)
+    assert outreach["sent"] == [a]
+    assert progress[-1] == (3, 2)
+    assert pd.read_csv(output)["prospect_email"].tolist() == [a, b, c]  # Failed rows are still reported
+    assert await checkpoints.count(output) == 1  # Kept for the retry, with only the delivered row
+
+    outreach["fail_generation"].clear()
+    outreach["fail_send"].clear()
+    outreach["generated"].clear()
+    progress.clear()
+    await process_outreach(path, output, on_progress=on_progress)
+    assert sorted(outreach["generated"]) == sorted([b, c])  # `a` is replayed, not generated again
+    assert outreach["sent"][0] == a and sorted(outreach["sent"][1:]) == sorted([b, c])
+    assert progress[-1] == (3, 0)
+    assert pd.read_csv(output)["send_status"].tolist() == ["sent"] * 3
+    assert await checkpoints.count(output) == 0  # Cleared once every row went through
@@ -0,0 +1,108 @@
+from typing import Any, List
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.prompts import PromptTemplate
+
+from app.core.settings import settings
+from app.schemas.email import EmailResponse
+from app.services.email import email_generator
+from app.services.generation import IncompleteResponse, ResponseParseError, StructuredGenerator, loads_json
+
+
+def test_loads_json_variants():
+    assert loads_json('{"a": 1}') == {"a": 1}
+    assert loads_json('<think>hmm</think>\n```json\n{"a": 1}\n```') == {"a": 1}
+    assert loads_json('Sure! Here it is: {"a": [1, 2]} Hope that helps.') == {"a": [1, 2]}
+    with pytest.raises(ResponseParseError):
+        loads_json("no json here")
+
+
+def test_truncated_reply_drops_the_cut_off_field():
+    payload = loads_json('{"prospect_email": "bob@acme.com", "subject": "Hi", "email": "Dear Bob, we offer cold chain insur')
+    assert payload == {"prospect_email": "bob@acme.com", "subject": "Hi"}
+
+    with pytest.raises(IncompleteResponse) as raised:
+        email_generator.validate(payload)
+    assert "email" in raised.value.fields
+
+
+def test_truncated_packed_reply_drops_only_the_last_entry_field():
+    payload = loads_json('{"results": [{"prospect_email": "a@x.com", "subject": "A"}, {"prospect_email": "b@x.com", "subject": "B')
+    assert payload == {"results": [{"prospect_email": "a@x.com", "subject": "A"}, {"prospect_email": "b@x.com"}]}
+
+
+def test_complete_reply_validates():
+    response = email_generator.validate({"prospect_email": "bob@acme.com", "subject": "Hi", "email": "Dear Bob", "engagement_advice": "Call"})
+    assert isinstance(response, EmailResponse)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Streams each scripted reply as its chunks; an exception in a script is raised at that point.
+    Non-streamed requests (field repairs) get the next reply whole.
+    """
+
+    model_name: str = "scripted"
+    replies: List[List[Any]]
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(self.replies.pop(0))))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        for piece in self.replies.pop(0):
+            if isinstance(piece, Exception):
+                raise piece
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+
+
+def streaming_generator(replies):
+    return StructuredGenerator(
+        PromptTemplate(template="Write an email to {name}", input_variables=["name"]),
+        EmailResponse,
+        ScriptedChatModel(replies=replies),
+        JsonOutputParser(pydantic_object=EmailResponse),
+        name="stream_test",
+        router_models=[],
+    )
+
+
+@pytest.fixture
+def quick_retries(monkeypatch):
+    monkeypatch.setattr(settings, "groq_rate_limit_backoff_seconds", 0.01)
+    monkeypatch.setattr(settings, "llm_structured_output", "prompt")
+
+
+@pytest.mark.anyio
+async def test_stream_retry_does_not_resend_partials(quick_retries):
+    reply = ['{"prospect_email": "bob@acme.com", ', '"subject": "Hi", ', '"email": "Dear Bob", ', '"engagement_advice": "Call"}']
+    generator = streaming_generator([reply[:2] + [RateLimited()], reply])
+    events = [event async for event in generator.astream({"name": "Bob"}, use_cache=False)]
+    partials = [payload for kind, payload in events if kind == "partial"]
+    # Each partial has more fields than the one before, so nothing is sent twice after the retry
+    assert [len(partial) for partial in partials] == sorted(set(len(partial) for partial in partials))
+    assert events[-1] == ("result", EmailResponse(prospect_email="bob@acme.com", subject="Hi", email="Dear Bob", engagement_advice="Call"))
+
+
+@pytest.mark.anyio
+async def test_streamed_reply_missing_a_field_is_repaired(quick_retries):
+    generator = streaming_generator([
+        ['{"prospect_email": "bob@acme.com", "subject": "Hi", ', '"email": "Dear Bob"}'],
+        ['{"engagement_advice": "Call next week"}'],
+    ])
+    events = [event async for event in generator.astream({"name": "Bob"}, use_cache=False)]
+    kind, response = events[-1]
+    assert kind == "result"
+    assert response.engagement_advice == "Call next week"
+    assert response.email == "Dear Bob"
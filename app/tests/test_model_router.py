@@ -0,0 +1,82 @@
+import asyncio
+import random
+
+import pytest
+
+from app.core.rate_limiter import ModelRateLimiter
+from app.core.settings import settings
+from app.services.model_router import ModelRouter
+
+CANDIDATES = [("primary", "primary-llm"), ("backup", "backup-llm")]
+
+
+@pytest.fixture
+def fast_hedging(monkeypatch):
+    monkeypatch.setattr(settings, "llm_router_hedge_ratio", 1.0)
+    monkeypatch.setattr(settings, "llm_router_min_hedge_seconds", 0.005)
+    monkeypatch.setattr(settings, "llm_router_default_latency", 0.005)
+    monkeypatch.setattr(settings, "llm_router_min_samples", 1000)  # Keep using the default latency
+
+
+@pytest.mark.anyio
+async def test_hedged_requests_leave_no_slot_behind(fast_hedging):
+    router = ModelRouter()
+    limiters = {model: ModelRateLimiter(model, rpm=100_000, tpm=10_000_000, max_concurrency=4) for model, _ in CANDIDATES}
+    rng = random.Random(0)
+
+    def call(llm):
+        model = llm.split("-")[0]
+
+        async def request():
+            await asyncio.sleep(rng.choice([0.001, 0.02]))  # Slow often enough to hedge
+            return model
+
+        return limiters[model].run(request, estimated_tokens=10)
+
+    for _ in range(10):
+        results = await asyncio.wait_for(asyncio.gather(*(router.invoke(CANDIDATES, call) for _ in range(8))), timeout=5)
+        assert set(results) <= {"primary", "backup"}
+        assert all(limiter.in_flight == 0 for limiter in limiters.values())
+    assert router.hedged > 0
+
+
+@pytest.mark.anyio
+async def test_fast_failure_falls_back_to_backup(fast_hedging):
+    router = ModelRouter()
+
+    async def call(llm):
+        if llm == "primary-llm":
+            raise ValueError("bad reply")
+        return llm
+
+    assert await router.invoke(CANDIDATES, call) == "backup-llm"
+    assert router.stats["primary"].error_rate == 1.0
+
+
+@pytest.mark.anyio
+async def test_hedge_wins_when_primary_hangs(fast_hedging):
+    router = ModelRouter()
+    cancelled = asyncio.Event()
+
+    async def call(llm):
+        if llm == "primary-llm":
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return llm
+
+    assert await asyncio.wait_for(router.invoke(CANDIDATES, call), timeout=1) == "backup-llm"
+    assert cancelled.is_set()
+    assert router.stats["backup"].hedges_won == 1
+
+
+def test_rank_prefers_faster_models(monkeypatch):
+    monkeypatch.setattr(settings, "llm_router_min_samples", 2)
+    router = ModelRouter()
+    for latency in (2.0, 2.0, 2.0):
+        router._stats("primary").record(latency, ok=True)
+    for latency in (0.5, 0.5, 0.5):
+        router._stats("backup").record(latency, ok=True)
+    assert [model for model, _ in router.rank(CANDIDATES)] == ["backup", "primary"]
@@ -0,0 +1,39 @@
+import pytest
+
+from app.services.result_writer import negotiate_result_format
+from app.utils.negotiation import parse_accept, quality
+
+
+def test_parse_accept():
+    assert parse_accept("text/csv;q=0.9, application/vnd.apache.parquet, */*;q=bad") == [
+        ("text/csv", 0.9),
+        ("application/vnd.apache.parquet", 1.0),
+        ("*/*", 0.0),
+    ]
+    assert parse_accept(None) == []
+
+
+def test_quality_prefers_the_most_specific_match():
+    accepted = parse_accept("text/*;q=0.5, text/csv;q=0.8, */*;q=0.1")
+    assert quality(accepted, "text/csv") == 0.8
+    assert quality(accepted, "text/plain") == 0.5
+    assert quality(accepted, "application/json") == 0.1
+    assert quality(parse_accept("text/csv"), "application/json") == 0.0
+
+
+@pytest.mark.parametrize(
+    "stored, accept, accept_encoding, expected",
+    [
+        ("csv", None, None, ("csv", False)),
+        ("parquet", "*/*", None, ("parquet", False)),  # Ties keep the stored format
+        ("csv", "application/vnd.apache.parquet", None, ("parquet", False)),
+        ("parquet", "text/csv", None, ("csv", False)),
+        ("csv", "text/csv", "gzip", ("csv.gz", True)),
+        ("csv", "text/csv", "gzip;q=0.5, zstd", ("csv.zst", True)),
+        ("csv.gz", "text/csv", "gzip, zstd", ("csv.gz", True)),  # Already compressed, no re-encoding
+        ("csv", "application/gzip", None, ("csv.gz", False)),
+        ("csv", "application/json", None, None),
+    ],
+)
+def test_negotiate_result_format(stored, accept, accept_encoding, expected):
+    assert negotiate_result_format(stored, accept, accept_encoding) == expected
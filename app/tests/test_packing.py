@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from langchain_core.prompts import PromptTemplate
+
+from app.schemas.email import EmailResponse
+from app.services.packing import PackedGenerator, extract_items
+
+PACKED_TEMPLATE = PromptTemplate(template="Write {count} emails:\n{prospects}", input_variables=["prospects", "count"])
+
+
+class StubGenerator:
+    """
+    Stands in for a StructuredGenerator: packed requests are answered by `answer(prompt text)`,
+    single requests by a fixed email.
+    """
+
+    name = "email"
+    schema = EmailResponse
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.packed_prompts = []
+        self.singles = []
+        self.remembered = []
+
+    async def cached(self, params):
+        return None
+
+    async def remember(self, params, response):
+        self.remembered.append(params["prospect_email"])
+
+    async def agenerate(self, params, use_cache=True):
+        self.singles.append(params["prospect_email"])
+        return email_for(params["prospect_email"], "single")
+
+    async def complete(self, prompt_value, prompt_text, parse, name=None, expected_completion_tokens=None):
+        self.packed_prompts.append(prompt_text)
+        await asyncio.sleep(0)
+        return parse(self.answer(prompt_text))
+
+
+def email_for(address, subject):
+    return EmailResponse(prospect_email=address, subject=subject, email=f"Dear {address}", engagement_advice="Call")
+
+
+def entry(address, subject="packed"):
+    return email_for(address, subject).model_dump()
+
+
+def packer(generator, pack_size=3):
+    return PackedGenerator(generator, PACKED_TEMPLATE, "prospect_email", ["prospect_email"], pack_size=pack_size, max_wait=0.01)
+
+
+async def generate(packed, addresses):
+    return await asyncio.gather(*(packed.agenerate({"prospect_email": address}) for address in addresses))
+
+
+def test_extract_items():
+    assert extract_items([1, 2]) == [1, 2]
+    assert extract_items({"results": [1], "note": "x"}) == [1]
+    assert extract_items("nope") == []
+
+
+@pytest.mark.anyio
+async def test_entries_are_matched_by_key_not_position():
+    # The model answers out of order and changes the case of the addresses
+    generator = StubGenerator(lambda prompt: {"results": [entry("C@x.com"), entry("a@x.com"), entry("B@X.COM")]})
+    responses = await generate(packer(generator), ["a@x.com", "b@x.com", "c@x.com"])
+    assert len(generator.packed_prompts) == 1
+    assert [response.prospect_email for response in responses] == ["a@x.com", "b@x.com", "c@x.com"]
+    assert all(response.subject == "packed" for response in responses)
+    assert sorted(generator.remembered) == ["a@x.com", "b@x.com", "c@x.com"]
+
+
+@pytest.mark.anyio
+async def test_missing_and_malformed_entries_fall_back_to_single_requests():
+    generator = StubGenerator(lambda prompt: [entry("a@x.com"), {"prospect_email": "b@x.com", "subject": "no body"}])
+    responses = await generate(packer(generator), ["a@x.com", "b@x.com", "c@x.com"])
+    assert [response.subject for response in responses] == ["packed", "single", "single"]
+    assert sorted(generator.singles) == ["b@x.com", "c@x.com"]
+
+
+@pytest.mark.anyio
+async def test_failed_pack_retries_every_prospect():
+    def fail(prompt):
+        raise ValueError("no JSON")
+
+    generator = StubGenerator(fail)
+    responses = await generate(packer(generator), ["a@x.com", "b@x.com"])
+    assert [response.subject for response in responses] == ["single", "single"]
+
+
+@pytest.mark.anyio
+async def test_duplicate_key_starts_a_new_pack():
+    generator = StubGenerator(lambda prompt: [entry(line[len("- prospect_email: "):]) for line in prompt.splitlines() if line.startswith("- ")])
+    responses = await generate(packer(generator, pack_size=4), ["a@x.com", "b@x.com", "A@x.com", "c@x.com"])
+    assert all(response.subject == "packed" for response in responses)
+    assert len(generator.packed_prompts) == 2  # a, b | A, c
+
+
+@pytest.mark.anyio
+async def test_packs_fill_up_to_pack_size():
+    generator = StubGenerator(lambda prompt: [entry(line[len("- prospect_email: "):]) for line in prompt.splitlines() if line.startswith("- ")])
+    await generate(packer(generator, pack_size=2), [f"p{i}@x.com" for i in range(5)])
+    # Two full packs; the fifth prospect is alone when the wait runs out, so it goes out unpacked
+    assert len(generator.packed_prompts) == 2
+    assert generator.singles == ["p4@x.com"]
@@ -0,0 +1,31 @@
+import pytest
+
+from app.utils.process_files import count_rows, stream_file
+
+
+def write_csv(path, rows, corrupt_at=None):
+    with open(path, "w") as f:
+        f.write("prospect_email,company_name\n")
+        for i in range(rows):
+            f.write(f"p{i}@acme.com,Acme {i}\n" if i != corrupt_at else f"p{i}@acme.com,Acme,extra,fields\n")
+
+
+@pytest.mark.anyio
+async def test_stream_file_in_batches(tmp_path):
+    path = str(tmp_path / "prospects.csv")
+    write_csv(path, 12)
+    batches = [batch async for batch in stream_file(path, batch_size=5)]
+    assert [len(batch) for batch in batches] == [5, 5, 2]
+    assert batches[-1].index.tolist() == [10, 11]
+    assert count_rows(path) == 12
+
+
+@pytest.mark.anyio
+async def test_stream_file_raises_on_corruption_partway(tmp_path):
+    path = str(tmp_path / "prospects.csv")
+    write_csv(path, 12, corrupt_at=8)
+    seen = []
+    with pytest.raises(Exception):
+        async for batch in stream_file(path, batch_size=5):
+            seen.append(len(batch))
+    assert seen == [5]  # The first batch was read before the corrupt line
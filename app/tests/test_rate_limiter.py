@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from app.core.rate_limiter import ModelRateLimiter, TokenBucket, parse_reset_duration
+from app.core.settings import settings
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration("2m59.56s") == pytest.approx(179.56)
+    assert parse_reset_duration("120ms") == pytest.approx(0.12)
+    assert parse_reset_duration("7") == 7.0
+    assert parse_reset_duration("soon") is None
+
+
+@pytest.mark.anyio
+async def test_bucket_waits_for_refill():
+    bucket = TokenBucket(capacity=2, refill_per_second=100)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for _ in range(4):
+        await bucket.acquire(1)
+    assert loop.time() - started >= 0.015
+
+
+@pytest.mark.anyio
+async def test_concurrency_is_capped():
+    limiter = ModelRateLimiter("test", rpm=10_000, tpm=1_000_000, max_concurrency=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    results = await asyncio.gather(*(limiter.run(call, estimated_tokens=10) for _ in range(6)))
+    assert results == ["ok"] * 6
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_cancelled_calls_release_their_slot():
+    limiter = ModelRateLimiter("test", rpm=10_000, tpm=1_000_000, max_concurrency=2)
+    started = asyncio.Event()
+
+    async def hang():
+        started.set()
+        await asyncio.sleep(3600)
+
+    # Cancelled inside `call`
+    tasks = [asyncio.ensure_future(limiter.run(hang, estimated_tokens=10)) for _ in range(2)]
+    await started.wait()
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 2
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert limiter.in_flight == 0
+
+    # Cancelled while waiting for token budget
+    limiter.tokens.adjust(-1_000_000)
+    waiting = asyncio.ensure_future(limiter.run(hang, estimated_tokens=10))
+    await asyncio.sleep(0.01)
+    assert limiter.in_flight == 1
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert limiter.in_flight == 0
+
+    # The limiter still serves requests afterwards
+    limiter.tokens.adjust(1_000_000)
+
+    async def call():
+        return "ok"
+
+    assert await asyncio.wait_for(limiter.run(call, estimated_tokens=10), timeout=1) == "ok"
+
+
+@pytest.mark.anyio
+async def test_rate_limited_calls_are_retried(monkeypatch):
+    monkeypatch.setattr(settings, "groq_rate_limit_backoff_seconds", 0.01)
+    monkeypatch.setattr(settings, "groq_max_rate_limit_retries", 3)
+    limiter = ModelRateLimiter("test", rpm=10_000, tpm=1_000_000, max_concurrency=4)
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise RateLimited()
+        return "ok"
+
+    assert await limiter.run(call, estimated_tokens=10) == "ok"
+    assert attempts == 3
+    assert limiter.throttled == 2
+    assert limiter.in_flight == 0
+    assert limiter.concurrency_limit < 4
+
+
+@pytest.mark.anyio
+async def test_other_errors_are_raised():
+    limiter = ModelRateLimiter("test", rpm=10_000, tpm=1_000_000, max_concurrency=1)
+
+    async def call():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await limiter.run(call, estimated_tokens=10)
+    assert limiter.in_flight == 0
@@ -0,0 +1,91 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.services.result_writer import (
+    RESULT_FORMATS,
+    RejectWriter,
+    convert_results,
+    iter_result_batches,
+    open_result_writer,
+    read_result_columns,
+    reject_path,
+    result_format_of,
+    result_variant,
+    with_format,
+)
+
+ROWS = [
+    {"prospect_email": "a@x.com", "subject": "Hi A", "send_status": "sent"},
+    {"prospect_email": "b@x.com", "subject": None, "send_status": "failed"},
+]
+COLUMNS = ["prospect_email", "subject", "send_status"]
+
+
+def write_results(path, rows=ROWS):
+    writer = open_result_writer(path, COLUMNS)
+    for row in rows:
+        writer.write(row)
+    writer.close()
+
+
+def read_rows(path):
+    return [row for batch in iter_result_batches(path, 100) for row in batch.to_dict(orient="records")]
+
+
+def test_format_from_extension():
+    assert result_format_of("out.csv.zst") == "csv.zst"
+    assert result_format_of("out.parquet") == "parquet"
+    assert result_format_of("out.txt") == "csv"
+    assert with_format("/tmp/out.csv.gz", "arrow") == "/tmp/out.arrow"
+    assert reject_path("/tmp/out.parquet") == "/tmp/out.rejected.csv"
+
+
+@pytest.mark.parametrize("result_format", list(RESULT_FORMATS))
+def test_round_trip(tmp_path, result_format):
+    path = str(tmp_path / f"results{RESULT_FORMATS[result_format][0]}")
+    write_results(path)
+    rows = read_rows(path)
+    assert [row["prospect_email"] for row in rows] == ["a@x.com", "b@x.com"]
+    assert rows[0]["subject"] == "Hi A"
+    assert rows[1]["subject"] == "" or pd.isna(rows[1]["subject"])
+
+
+@pytest.mark.parametrize("source_format", list(RESULT_FORMATS))
+def test_convert_between_formats(tmp_path, source_format):
+    source = str(tmp_path / f"results{RESULT_FORMATS[source_format][0]}")
+    write_results(source)
+    for target_format in RESULT_FORMATS:
+        if target_format == source_format:
+            continue
+        target = result_variant(source, target_format)
+        assert result_format_of(target) == target_format
+        assert [row["prospect_email"] for row in read_rows(target)] == ["a@x.com", "b@x.com"]
+
+
+@pytest.mark.parametrize("source_format", list(RESULT_FORMATS))
+def test_convert_results_without_rows_keeps_the_header(tmp_path, source_format):
+    # e.g. every row of the job was rejected
+    source = str(tmp_path / f"empty{RESULT_FORMATS[source_format][0]}")
+    write_results(source, rows=[])
+    target = result_variant(source, "csv" if source_format != "csv" else "parquet")
+    assert os.path.exists(target)
+    assert read_result_columns(target) == COLUMNS
+    assert read_rows(target) == []
+
+
+def test_convert_merges_sources_in_order(tmp_path):
+    first, second = str(tmp_path / "1.csv"), str(tmp_path / "2.parquet")
+    write_results(first, ROWS[:1])
+    write_results(second, ROWS[1:])
+    target = str(tmp_path / "merged.csv.gz")
+    assert convert_results([first, second], target) == 2
+    assert [row["prospect_email"] for row in read_rows(target)] == ["a@x.com", "b@x.com"]
+
+
+def test_reject_writer_numbers_rows_from_offset(tmp_path):
+    writer = RejectWriter(str(tmp_path / "out.rejected.csv"), row_offset=100)
+    writer.write(pd.DataFrame({"prospect_email": ["bad"], "reject_reason": ["invalid prospect_email"]}, index=[3]))
+    rows = pd.read_csv(writer.path).to_dict(orient="records")
+    assert rows == [{"row_number": 103, "prospect_email": "bad", "reject_reason": "invalid prospect_email"}]
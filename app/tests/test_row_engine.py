@@ -0,0 +1,75 @@
+import asyncio
+import random
+
+import pytest
+
+from app.services.row_engine import RowEngine
+
+
+async def collect(engine, rows):
+    return [outcome async for outcome in engine.run(rows)]
+
+
+@pytest.mark.anyio
+async def test_outcomes_keep_input_order():
+    async def handler(row):
+        await asyncio.sleep(random.random() * 0.01)
+        return {**row, "done": True}
+
+    engine = RowEngine(handler, limits={"email": 8}, channel_of=lambda row: "email")
+    outcomes = await collect(engine, [{"n": i} for i in range(50)])
+    assert [outcome.index for outcome in outcomes] == list(range(50))
+    assert [outcome.result["n"] for outcome in outcomes] == list(range(50))
+
+
+@pytest.mark.anyio
+async def test_failures_do_not_stop_other_rows():
+    async def handler(row):
+        if row["n"] == 2:
+            raise ValueError("boom")
+        return row
+
+    engine = RowEngine(handler, limits={"email": 2}, channel_of=lambda row: "email")
+    outcomes = await collect(engine, [{"n": i} for i in range(5)])
+    assert [outcome.ok for outcome in outcomes] == [True, True, False, True, True]
+    assert isinstance(outcomes[2].error, ValueError)
+
+
+@pytest.mark.anyio
+async def test_per_channel_limits():
+    in_flight = {"email": 0, "call": 0}
+    peak = {"email": 0, "call": 0}
+
+    async def handler(row):
+        channel = row["channel"]
+        in_flight[channel] += 1
+        peak[channel] = max(peak[channel], in_flight[channel])
+        await asyncio.sleep(0.01 if channel == "email" else 0.03)
+        in_flight[channel] -= 1
+        return row
+
+    engine = RowEngine(handler, limits={"email": 4, "call": 1}, channel_of=lambda row: row["channel"])
+    rows = [{"channel": "call" if i % 4 == 0 else "email"} for i in range(40)]
+    outcomes = await collect(engine, rows)
+    assert all(outcome.ok for outcome in outcomes)
+    assert peak == {"email": 4, "call": 1}
+
+
+@pytest.mark.anyio
+async def test_window_bounds_rows_read_ahead():
+    read = 0
+
+    async def rows():
+        nonlocal read
+        for i in range(100):
+            read += 1
+            yield {"n": i}
+
+    async def handler(row):
+        await asyncio.sleep(0)
+        return row
+
+    engine = RowEngine(handler, limits={"email": 2}, channel_of=lambda row: "email", window=5)
+    async for outcome in engine.run(rows()):
+        assert read - outcome.index <= 5
+        await asyncio.sleep(0.001)  # Slow consumer
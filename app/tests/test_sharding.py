@@ -0,0 +1,78 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.core.settings import settings
+from app.services.process_files import process_outreach
+from app.services.result_writer import reject_path
+from app.services.sharding import ShardContacts, shard_settings, split_into_shards
+
+
+def prospect(email, outreach_type="email", phone="+1 555 123 4567"):
+    return {
+        "outreach_type": outreach_type,
+        "prospect_email": email,
+        "prospect_phone": phone,
+        "prospect_name": "Jane Doe",
+        "company_name": "Acme",
+        "prospect_title": "CFO",
+        "industry": "tech",
+        "engagement_level": 2,
+        "objections": "",
+        "outreach_description": "Cold chain coverage",
+        "insurance_company_name": "Gamma Insurance",
+        "sender_name": "Sam Seller",
+        "sender_title": "Account Executive",
+    }
+
+
+def write_prospects(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_split_into_contiguous_shards(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ingest_batch_size", 3)
+    path = write_prospects(tmp_path / "in.csv", [prospect(f"p{i}@x.com") for i in range(10)])
+    shards = split_into_shards(path, str(tmp_path / "shards"), 3, 10)
+    assert [offset for _, offset in shards] == [0, 4, 8]
+    assert [len(pd.read_csv(shard)) for shard, _ in shards] == [4, 4, 2]
+    assert pd.read_csv(shards[1][0])["prospect_email"].tolist() == ["p4@x.com", "p5@x.com", "p6@x.com", "p7@x.com"]
+
+
+def test_contacts_repeated_across_shards(tmp_path):
+    rows = [
+        prospect("a@x.com"),
+        prospect("b@x.com"),
+        prospect(" A@X.com"),  # Same contact as row 0 once normalized
+        prospect("c@x.com", outreach_type="call", phone="+1 555 000 0001"),
+        prospect("b@x.com"),
+        prospect("a@x.com", outreach_type="call", phone="+1 555 000 0001"),  # Same phone as row 3, other shard
+    ]
+    path = write_prospects(tmp_path / "in.csv", rows)
+    contacts = ShardContacts()
+    split_into_shards(path, str(tmp_path / "shards"), 3, len(rows), on_rows=contacts)
+    assert contacts.repeated == {1: {("email", "a@x.com")}, 2: {("email", "b@x.com"), ("call", "+15550000001")}}
+
+
+def test_shard_settings_split_the_rate_ceilings(monkeypatch):
+    monkeypatch.setattr(settings, "max_concurrent_jobs", 2)
+    monkeypatch.setattr(settings, "groq_rate_limit_share", 1.0)
+    monkeypatch.setattr(settings, "twilio_calls_per_second", 4.0)
+    monkeypatch.setattr(settings, "smtp_domain_rate_per_minute", 60)
+    assert shard_settings(4) == {"groq_rate_limit_share": 0.125, "twilio_calls_per_second": 0.5, "smtp_domain_rate_per_minute": 7.5}
+    monkeypatch.setattr(settings, "smtp_domain_rate_per_minute", 0)
+    assert "smtp_domain_rate_per_minute" not in shard_settings(4)
+
+
+@pytest.mark.anyio
+async def test_shard_rejects_contacts_seen_by_earlier_shards(tmp_path):
+    path = write_prospects(tmp_path / "shard.csv", [prospect("A@x.com"), prospect("b@x.com", outreach_type="call")])
+    output = str(tmp_path / "processed.csv")
+    seen = {("email", "a@x.com"), ("call", "+15551234567")}
+    assert await process_outreach(path, output, row_offset=10, seen_contacts=seen) is None
+    rejects = pd.read_csv(reject_path(output))
+    assert rejects["row_number"].tolist() == [10, 11]
+    assert rejects["reject_reason"].tolist() == ["duplicate contact in file"] * 2
+    assert not os.path.exists(output)
@@ -0,0 +1,87 @@
+from email.message import EmailMessage
+
+import pytest
+
+from app.services.smtp_pool import SMTPPool
+from benchmarks.fakes import SmtpSink
+
+
+def make_pool(port, **overrides):
+    options = dict(
+        hostname="127.0.0.1",
+        port=port,
+        username=None,
+        password=None,
+        use_tls=False,
+        start_tls=False,
+        validate_certs=False,
+        size=2,
+        max_messages_per_connection=100,
+        domain_rate_per_minute=0,
+    )
+    options.update(overrides)
+    return SMTPPool(**options)
+
+
+def message(to="bob@acme.com"):
+    msg = EmailMessage()
+    msg["From"] = "sender@example.com"
+    msg["To"] = to
+    msg["Subject"] = "Hello"
+    msg.set_content("Hi Bob")
+    return msg
+
+
+@pytest.fixture
+async def sink():
+    stand_in = SmtpSink(latency=0)
+    server = await stand_in.start()
+    yield stand_in
+    server.close()
+
+
+@pytest.mark.anyio
+async def test_sessions_are_reused(sink):
+    pool = make_pool(sink.port, size=1)
+    try:
+        assert await pool.send_batch([message(f"p{i}@acme.com") for i in range(5)]) == [True] * 5
+    finally:
+        await pool.close()
+    assert sink.messages == 5
+    assert sink.sessions == 1
+
+
+@pytest.mark.anyio
+async def test_sessions_rotate_after_max_messages(sink):
+    pool = make_pool(sink.port, size=1, max_messages_per_connection=2)
+    try:
+        for _ in range(5):
+            assert await pool.send(message())
+    finally:
+        await pool.close()
+    assert sink.sessions == 3
+
+
+@pytest.mark.anyio
+async def test_dropped_idle_session_reconnects(sink):
+    pool = make_pool(sink.port, size=1)
+    try:
+        assert await pool.send(message())
+        pool._slots._queue[0].client.close()  # Server or network dropped the idle session
+        assert await pool.send(message())
+    finally:
+        await pool.close()
+    assert sink.messages == 2
+    assert sink.sessions == 2
+
+
+@pytest.mark.anyio
+async def test_drop_after_data_is_not_retried(sink):
+    sink.disconnect_after_data = True
+    pool = make_pool(sink.port, size=1)
+    try:
+        assert await pool.send(message()) is False
+    finally:
+        await pool.close()
+    # A retry could deliver the message twice
+    assert sink.messages == 1
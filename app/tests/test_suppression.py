@@ -0,0 +1,77 @@
+import pytest
+
+from app.core.database import Database
+from app.core.settings import settings
+from app.services import process_files
+from app.services.process_files import suppression_reasons
+from app.services.suppression import DO_NOT_CALL, UNSUBSCRIBED, ContactIndex, contact_of
+from app.utils.bloom import BloomFilter
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = Database(str(tmp_path / "contacts.db"))
+    yield database
+    database.close()
+
+
+@pytest.fixture(params=[False, True], ids=["sqlite", "bloom"])
+def index(request, database, monkeypatch):
+    monkeypatch.setattr(settings, "suppression_bloom", request.param)
+    monkeypatch.setattr(settings, "suppression_bloom_capacity", 1000)
+    return ContactIndex(database)
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"email:p{i}@x.com")
+    assert all(f"email:p{i}@x.com" in bloom for i in range(1000))
+    assert sum(f"email:q{i}@x.com" in bloom for i in range(1000)) < 50
+
+
+@pytest.mark.anyio
+async def test_suppressed_contacts_are_blocked(index, monkeypatch):
+    monkeypatch.setattr(settings, "default_phone_country_code", "1")
+    assert await index.suppress("email", [" Jane@Acme.com", "bob@acme.com"], UNSUBSCRIBED) == 2
+    assert await index.suppress("call", ["(555) 123-4567"], DO_NOT_CALL) == 1
+    assert await index.check("email", ["jane@acme.com", "new@acme.com"]) == {"jane@acme.com": UNSUBSCRIBED}
+    assert await index.check("call", ["+15551234567"]) == {"+15551234567": DO_NOT_CALL}
+    assert (await index.status("email", "JANE@acme.com"))["suppressed"] == UNSUBSCRIBED
+
+    assert await index.release("email", ["jane@acme.com"]) == 1
+    assert await index.check("email", ["jane@acme.com", "bob@acme.com"]) == {"bob@acme.com": UNSUBSCRIBED}
+
+
+@pytest.mark.anyio
+async def test_contacted_prospects_wait_out_the_cooldown(index, monkeypatch):
+    monkeypatch.setattr(settings, "suppression_cooldown_days", {"email": 30.0, "call": 0.0})
+    await index.mark_contacted("email", "jane@acme.com")
+    await index.mark_contacted("call", "+15551234567")
+    assert await index.check("email", ["jane@acme.com"]) == {"jane@acme.com": "contacted within cooldown"}
+    assert await index.check("call", ["+15551234567"]) == {}  # No cooldown for calls
+
+
+@pytest.mark.anyio
+async def test_contacts_recorded_by_another_process_are_seen(index, database):
+    await index.check("email", ["jane@acme.com"])  # Loads the Bloom filter, if enabled
+    other = ContactIndex(database)
+    await other.suppress("email", ["jane@acme.com"], UNSUBSCRIBED)
+    assert await index.check("email", ["jane@acme.com"]) == {"jane@acme.com": UNSUBSCRIBED}
+
+
+@pytest.mark.anyio
+async def test_suppression_reasons_skip_duplicates_and_blocked_contacts(index, monkeypatch):
+    monkeypatch.setattr(process_files, "contact_index", index)
+    await index.suppress("email", ["blocked@x.com"], UNSUBSCRIBED)
+    rows = [
+        {"outreach_type": "email", "prospect_email": "a@x.com"},
+        {"outreach_type": "email", "prospect_email": "blocked@x.com"},
+        {"outreach_type": "call", "prospect_phone": "+15551234567"},
+        {"outreach_type": "email", "prospect_email": "a@x.com"},
+    ]
+    seen = set()
+    assert await suppression_reasons(rows, seen) == [None, UNSUBSCRIBED, None, "duplicate contact in file"]
+    assert seen == {contact_of(row) for row in rows}
+    # Later batches of the same file keep deduplicating against earlier ones
+    assert await suppression_reasons([{"outreach_type": "call", "prospect_phone": "+15551234567"}], seen) == ["duplicate contact in file"]
@@ -0,0 +1,78 @@
+import io
+
+import pandas as pd
+import pytest
+
+from app.core.settings import settings
+from app.services.email import get_industry_focus
+from app.services.tiering import FULL_MODEL, SMALL_MODEL, TEMPLATE, choose_tier, render_call, render_email
+from app.services.validation import validate_batch
+
+
+def prospect(**overrides):
+    row = {
+        "prospect_email": "jane@acme.com",
+        "prospect_phone": "+15551234567",
+        "prospect_name": "Jane Doe",
+        "company_name": "Acme",
+        "prospect_title": "CFO",
+        "industry": "tech",
+        "engagement_level": 0,
+        "objections": "",
+        "outreach_type": "email",
+        "sender_name": "Sam Seller",
+        "sender_title": "Account Executive",
+        "insurance_company_name": "Gamma Insurance",
+        "outreach_description": "Cold chain coverage",
+    }
+    row.update(overrides)
+    return row
+
+
+def test_choose_tier_by_engagement():
+    assert choose_tier(prospect(engagement_level=0), "email") == TEMPLATE
+    assert choose_tier(prospect(engagement_level=2), "email") == SMALL_MODEL
+    assert choose_tier(prospect(engagement_level=4), "email") == FULL_MODEL
+    # Calls start one level higher, and unknown industries skip templates
+    assert choose_tier(prospect(engagement_level=1), "call") == SMALL_MODEL
+    assert choose_tier(prospect(engagement_level=0, industry="aerospace"), "email") == SMALL_MODEL
+
+
+def test_blank_fields_from_pandas_do_not_render_as_nan():
+    # Blank cells come back from read_csv as NaN
+    csv = pd.DataFrame([prospect(prospect_title="", sender_title="", objections="")]).to_csv(index=False)
+    valid, rejected = validate_batch(pd.read_csv(io.StringIO(csv)))
+    assert rejected.empty
+    row = valid.to_dict(orient="records")[0]
+
+    email = render_email(row)
+    assert "nan" not in email.email.lower().split()
+    assert "Teams like Acme" in email.email
+    assert email.email.endswith("Best regards,\nSam Seller\nGamma Insurance")
+
+    script = render_call(row).call_script
+    assert "nan" not in script.lower().split()
+    assert "this is Sam Seller at Gamma Insurance." in script
+
+
+def test_rendered_email_answers_objections():
+    email = render_email(prospect(objections=["Budget concerns"]))
+    assert "budgets are tight" in email.email
+    assert "  " not in email.email
+
+
+def test_industry_focus_unchanged_without_tiering(monkeypatch):
+    monkeypatch.setattr(settings, "tiered_generation", False)
+    assert get_industry_focus("Tech") == "emphasize innovation and cutting-edge technology solutions."
+    assert get_industry_focus("Technology") == "highlight tailored benefits."
+    assert get_industry_focus("Retail") == "highlight tailored benefits."
+
+    monkeypatch.setattr(settings, "tiered_generation", True)
+    assert get_industry_focus("Technology") == "emphasize innovation and cutting-edge technology solutions."
+    assert get_industry_focus("Retail") != "highlight tailored benefits."
+
+
+@pytest.mark.parametrize("level", [0, 1])
+def test_templates_fill_every_placeholder(level):
+    email = render_email(prospect(engagement_level=level))
+    assert "{" not in email.subject + email.email + email.engagement_advice
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.services.twilio_dispatcher import TwilioCallError, TwilioDispatcher
+from benchmarks.fakes import TwilioStub
+
+
+@pytest.fixture
+async def stub():
+    stand_in = TwilioStub(latency=0.05)
+    server = await stand_in.start()
+    yield stand_in
+    server.close()
+
+
+def make_dispatcher(port, calls_per_second=1000.0, max_concurrency=4):
+    return TwilioDispatcher(
+        account_sid="ACtest",
+        auth_token="secret",
+        from_number="+15550000000",
+        base_url=f"http://127.0.0.1:{port}",
+        calls_per_second=calls_per_second,
+        max_concurrency=max_concurrency,
+    )
+
+
+@pytest.mark.anyio
+async def test_place_call(stub):
+    dispatcher = make_dispatcher(stub.port)
+    try:
+        result = await dispatcher.place_call("+15551234567", "<Response><Say>Hi</Say></Response>")
+    finally:
+        await dispatcher.close()
+    assert result.prospect_phone == "+15551234567"
+    assert result.call_sid.startswith("CA")
+    assert result.call_status == "queued"
+    assert stub.requests == [{"To": "+15551234567", "From": "+15550000000", "Twiml": "<Response><Say>Hi</Say></Response>"}]
+
+
+@pytest.mark.anyio
+async def test_calls_run_concurrently(stub):
+    dispatcher = make_dispatcher(stub.port, max_concurrency=8)
+    loop = asyncio.get_running_loop()
+    try:
+        started = loop.time()
+        results = await asyncio.gather(*(dispatcher.place_call(f"+1555000{i:04d}", "<Response/>") for i in range(8)))
+        elapsed = loop.time() - started
+    finally:
+        await dispatcher.close()
+    assert len({result.call_sid for result in results}) == 8
+    # Eight 50 ms calls in parallel, not one after another
+    assert elapsed < 0.3
+
+
+@pytest.mark.anyio
+async def test_json_error(stub):
+    stub.error = (400, "application/json", '{"code": 21211, "message": "Invalid To number"}')
+    dispatcher = make_dispatcher(stub.port)
+    try:
+        with pytest.raises(TwilioCallError) as raised:
+            await dispatcher.place_call("+1", "<Response/>")
+    finally:
+        await dispatcher.close()
+    assert raised.value.status_code == 400
+    assert "Invalid To number" in str(raised.value)
+
+
+@pytest.mark.anyio
+async def test_non_json_error_body(stub):
+    stub.error = (502, "text/html", "<html><body>Bad Gateway</body></html>")
+    dispatcher = make_dispatcher(stub.port)
+    try:
+        with pytest.raises(TwilioCallError) as raised:
+            await dispatcher.place_call("+15551234567", "<Response/>")
+    finally:
+        await dispatcher.close()
+    assert raised.value.status_code == 502
+    assert "Bad Gateway" in str(raised.value)
+
+
+@pytest.mark.anyio
+async def test_non_json_success_body(stub):
+    stub.error = (200, "text/html", "<html>ok</html>")
+    dispatcher = make_dispatcher(stub.port)
+    try:
+        with pytest.raises(TwilioCallError):
+            await dispatcher.place_call("+15551234567", "<Response/>")
+    finally:
+        await dispatcher.close()
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+from app.core.settings import settings
+from app.services.validation import REJECT_REASON, normalize_engagement, normalize_phones, split_objections, validate_batch
+
+
+def prospects(*rows):
+    base = {
+        "outreach_type": "email",
+        "prospect_email": "Jane@Acme.com ",
+        "prospect_phone": "+1 (555) 123-4567",
+        "prospect_name": "Jane Doe",
+        "company_name": "Acme",
+        "prospect_title": "CFO",
+        "industry": "tech",
+        "engagement_level": 2,
+        "objections": "Budget, timing",
+        "outreach_description": "Cold chain coverage",
+        "insurance_company_name": "Gamma Insurance",
+        "sender_name": "Sam Seller",
+        "sender_title": "Account Executive",
+    }
+    return pd.DataFrame([{**base, **row} for row in rows])
+
+
+def test_valid_rows_are_normalized():
+    valid, rejected = validate_batch(prospects({}, {"outreach_type": " Call ", "engagement_level": "High"}))
+    assert rejected.empty
+    assert valid["prospect_email"].tolist() == ["jane@acme.com", "jane@acme.com"]
+    assert valid["outreach_type"].tolist() == ["email", "call"]
+    assert valid.loc[1, "prospect_phone"] == "+15551234567"
+    assert valid["engagement_level"].tolist() == [2, 3]
+    assert valid.loc[0, "objections"] == ["Budget", "timing"]
+
+
+@pytest.mark.parametrize(
+    "row, reason",
+    [
+        ({"outreach_type": "fax"}, "invalid outreach_type"),
+        ({"prospect_email": "not-an-email"}, "invalid prospect_email"),
+        ({"company_name": " "}, "missing company_name"),
+        ({"engagement_level": 7}, "invalid engagement_level"),
+        ({"engagement_level": "lukewarm"}, "invalid engagement_level"),
+        ({"outreach_type": "call", "prospect_phone": "12"}, "invalid prospect_phone"),
+        ({"outreach_type": "call", "sender_title": None}, "missing sender_title"),
+    ],
+)
+def test_rejections(row, reason):
+    valid, rejected = validate_batch(prospects({}, row))
+    assert len(valid) == 1
+    assert rejected[REJECT_REASON].tolist() == [reason]
+    # Rejected rows keep their original index and values
+    assert rejected.index.tolist() == [1]
+
+
+def test_call_rows_only_need_call_fields():
+    valid, rejected = validate_batch(prospects({"outreach_type": "call", "prospect_email": None}))
+    assert rejected.empty and len(valid) == 1
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("15551234567", "+15551234567"),
+        ("(555) 123-4567", "+15551234567"),
+        ("0015551234567", "+15551234567"),
+        ("+44 20 7946 0958", "+442079460958"),
+        ("555123", "555123"),  # Too short to be a national number: left for validation to reject
+    ],
+)
+def test_normalize_phones_with_default_country(monkeypatch, raw, expected):
+    monkeypatch.setattr(settings, "default_phone_country_code", "1")
+    monkeypatch.setattr(settings, "default_phone_national_length", 10)
+    assert normalize_phones(pd.Series([raw])).tolist() == [expected]
+
+
+def test_normalize_phones_without_default_country(monkeypatch):
+    monkeypatch.setattr(settings, "default_phone_country_code", "")
+    assert normalize_phones(pd.Series(["5551234567", None])).tolist() == ["5551234567", ""]
+
+
+def test_normalize_engagement_and_objections():
+    assert normalize_engagement(pd.Series(["hot", "1", 2.5, None])).tolist() == [4, 1, pd.NA, pd.NA]
+    assert split_objections(pd.Series(["a, b", "", None])).tolist() == [["a", "b"], [], []]
+
+
+def test_non_integer_numeric_phones_are_rejected_not_fatal(monkeypatch):
+    monkeypatch.setattr(settings, "default_phone_country_code", "1")
+    rows = prospects(*({"outreach_type": "call", "prospect_phone": phone} for phone in (15551234567.0, 1.5, float("nan"))))
+    assert rows["prospect_phone"].dtype == "float64"
+    valid, rejected = validate_batch(rows)
+    assert valid["prospect_phone"].tolist() == ["+15551234567"]
+    assert rejected[REJECT_REASON].tolist() == ["invalid prospect_phone", "missing prospect_phone"]
@@ -0,0 +1,49 @@
+from typing import List, Optional, Tuple
+
+
+def parse_accept(header: Optional[str]) -> List[Tuple[str, float]]:
+    """
+    Parses an Accept or Accept-Encoding header into (value, quality) pairs.
+
+    Parameters:
+        header (str): e.g. "text/csv;q=0.9, application/vnd.apache.parquet".
+
+    Returns:
+        list: Lower-cased values with their q-value (1.0 when not given).
+    """
+    accepted = []
+    for part in (header or "").split(","):
+        value, *params = [piece.strip() for piece in part.split(";")]
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        accepted.append((value.lower(), quality))
+    return accepted
+
+
+def quality(accepted: List[Tuple[str, float]], value: str) -> float:
+    """
+    Returns the q-value the client gives `value`, using the most specific matching entry
+    (exact, then "type/*", then "*/*" or "*"). Unmatched values get 0.
+    """
+    value = value.lower()
+    best_specificity, best_quality = -1, 0.0
+    for candidate, candidate_quality in accepted:
+        if candidate == value:
+            specificity = 2
+        elif candidate.endswith("/*") and value.startswith(candidate[:-1]):
+            specificity = 1
+        elif candidate in ("*/*", "*"):
+            specificity = 0
+        else:
+            continue
+        if specificity > best_specificity:
+            best_specificity, best_quality = specificity, candidate_quality
+    return best_quality
@@ -1,9 +1,19 @@
+import asyncio
+from typing import AsyncIterator, Iterator, Optional
+
 import pandas as pd
 from loguru import logger
 
+from app.core.metrics import timed, track
+
+# File types accepted by read_file / iter_file_batches
+SUPPORTED_EXTENSIONS = (".csv", ".tsv", ".json", ".jsonl", ".ndjson", ".xlsx", ".xls", ".parquet", ".feather", ".arrow")
+
+
+@timed("read_file")
 def read_file(file_path):
     """
-    Reads a JSON, Excel, CSV, Parquet, Feather, or TSV file into a Pandas DataFrame.
+    Reads a JSON, JSON Lines, Excel, CSV, Parquet, Feather, or TSV file into a Pandas DataFrame.
 
     Parameters:
         file_path (str): Path to the file.
@@ -14,18 +24,161 @@ def read_file(file_path):
     try:
         if file_path.endswith(".csv"):
             return pd.read_csv(file_path)
+        elif file_path.endswith(".jsonl") or file_path.endswith(".ndjson"):
+            return pd.read_json(file_path, lines=True)
         elif file_path.endswith(".json"):
             return pd.read_json(file_path)
         elif file_path.endswith(".xlsx") or file_path.endswith(".xls"):
             return pd.read_excel(file_path)
         elif file_path.endswith(".parquet"):
             return pd.read_parquet(file_path)
-        elif file_path.endswith(".feather"):
+        elif file_path.endswith(".feather") or file_path.endswith(".arrow"):
             return pd.read_feather(file_path)
         elif file_path.endswith(".tsv"):
             return pd.read_csv(file_path, sep="\t")
         else:
-            raise ValueError("Unsupported file format. Please use JSON, Excel, CSV, Parquet, Feather, or TSV.")
+            raise ValueError("Unsupported file format. Please use JSON, JSON Lines, Excel, CSV, Parquet, Feather, or TSV.")
     except Exception as e:
         logger.error(f"Error reading file: {e}")
         return None
+
+
+def _iter_arrow_batches(file_path: str, batch_size: int) -> Iterator[pd.DataFrame]:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    def record_batches(source):
+        try:
+            reader = ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+        except pa.ArrowInvalid:
+            # Not a random-access IPC file; fall back to the streaming format.
+            source.seek(0)
+            yield from ipc.open_stream(source)
+
+    # Writers often emit many small record batches; coalesce them up to batch_size rows.
+    source = pa.memory_map(file_path, "r")
+    try:
+        pending, pending_rows = [], 0
+        for batch in record_batches(source):
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= batch_size:
+                yield pa.Table.from_batches(pending).to_pandas()
+                pending, pending_rows = [], 0
+        if pending:
+            yield pa.Table.from_batches(pending).to_pandas()
+    finally:
+        source.close()
+
+
+def iter_file_batches(file_path: str, batch_size: int = 5000) -> Iterator[pd.DataFrame]:
+    """
+    Reads a file as a sequence of DataFrame batches without loading it whole.
+
+    CSV/TSV are read in chunks, Parquet by row group, Feather/Arrow by record batch and
+    JSON Lines by line. Excel and plain JSON cannot be streamed; they are read whole and
+    then sliced into batches.
+
+    Parameters:
+        file_path (str): Path to the file.
+        batch_size (int): Target number of rows per batch.
+
+    Yields:
+        pd.DataFrame: Consecutive batches of rows, with a continuous index.
+    """
+    if file_path.endswith(".csv") or file_path.endswith(".tsv"):
+        sep = "\t" if file_path.endswith(".tsv") else ","
+        with pd.read_csv(file_path, sep=sep, chunksize=batch_size) as reader:
+            yield from reader
+    elif file_path.endswith(".jsonl") or file_path.endswith(".ndjson"):
+        with pd.read_json(file_path, lines=True, chunksize=batch_size) as reader:
+            yield from reader
+    elif file_path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(file_path)
+        start = 0
+        for i in range(parquet_file.num_row_groups):
+            for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=[i]):
+                df = batch.to_pandas()
+                df.index = pd.RangeIndex(start, start + len(df))
+                start += len(df)
+                yield df
+    elif file_path.endswith(".feather") or file_path.endswith(".arrow"):
+        start = 0
+        for df in _iter_arrow_batches(file_path, batch_size):
+            df.index = pd.RangeIndex(start, start + len(df))
+            start += len(df)
+            yield df
+    else:
+        df = read_file(file_path)
+        if df is None:
+            return
+        logger.warning(f"{file_path} cannot be streamed; loaded whole file of {len(df)} rows.")
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size]
+
+
+async def stream_file(file_path: str, batch_size: int = 5000) -> AsyncIterator[pd.DataFrame]:
+    """
+    Async wrapper around `iter_file_batches`. Each batch is parsed in a worker thread,
+    so the event loop stays free while large files are read.
+
+    Raises:
+        Exception: Whatever the reader raised, e.g. for a file that is corrupt partway
+            through, so the caller fails instead of finishing with partial results.
+    """
+    batches = iter_file_batches(file_path, batch_size)
+    sentinel = object()
+    try:
+        while True:
+            with track("read_batch"):
+                batch = await asyncio.to_thread(next, batches, sentinel)
+            if batch is sentinel:
+                break
+            yield batch
+    except Exception as e:
+        logger.error(f"Error streaming file {file_path}: {e}")
+        raise
+    finally:
+        batches.close()
+
+
+def count_rows(file_path: str) -> Optional[int]:
+    """
+    Cheaply estimates the number of data rows in a file without parsing it.
+
+    Parquet and Feather/Arrow use file metadata; CSV/TSV and JSON Lines count newlines,
+    which may over-count rows containing quoted line breaks.
+
+    Returns:
+        int: Row count, or None if it cannot be determined cheaply.
+    """
+    try:
+        if file_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            return pq.ParquetFile(file_path).metadata.num_rows
+        if file_path.endswith(".feather") or file_path.endswith(".arrow"):
+            import pyarrow as pa
+            import pyarrow.ipc as ipc
+
+            with pa.memory_map(file_path, "r") as source:
+                reader = ipc.open_file(source)
+                return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        if file_path.endswith((".csv", ".tsv", ".jsonl", ".ndjson")):
+            lines = 0
+            last = b"\n"
+            with open(file_path, "rb") as f:
+                while chunk := f.read(1 << 20):
+                    lines += chunk.count(b"\n")
+                    last = chunk[-1:]
+            if last != b"\n":
+                lines += 1
+            header = 1 if file_path.endswith((".csv", ".tsv")) else 0
+            return max(0, lines - header)
+    except Exception as e:
+        logger.warning(f"Could not count rows in {file_path}: {e}")
+    return None
@@ -0,0 +1,30 @@
+import json
+from typing import Any, Dict, Iterator, Tuple
+
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Formats one Server-Sent Event with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def field_deltas(previous: Dict[str, Any], current: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yields ("delta", {"field", "text"}) for text appended to string fields since `previous`,
+    or ("field", {"field", "value"}) when a field changed in any other way.
+
+    Parameters:
+        previous (dict): The last partial object sent.
+        current (dict): The new partial object.
+    """
+    for field, value in current.items():
+        old = previous.get(field)
+        if value == old:
+            continue
+        if isinstance(value, str) and isinstance(old, str) and value.startswith(old):
+            yield "delta", {"field": field, "text": value[len(old):]}
+        elif isinstance(value, str) and old is None:
+            yield "delta", {"field": field, "text": value}
+        else:
+            yield "field", {"field": field, "value": value}
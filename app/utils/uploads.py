@@ -0,0 +1,53 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Tuple
+
+from fastapi import UploadFile
+from loguru import logger
+
+
+async def save_upload(file: UploadFile, directory: str, chunk_size: int = 1 << 20) -> Tuple[str, str]:
+    """
+    Streams an upload to disk in chunks while hashing it, then stores it under its content hash.
+
+    The file is written to a unique temporary name first, so concurrent uploads never clobber
+    each other, and renamed to `<sha256><ext>` once complete. Identical uploads resolve to the
+    same path.
+
+    Parameters:
+        file (UploadFile): The uploaded file.
+        directory (str): Directory to store the file in.
+        chunk_size (int): Bytes read and written per chunk.
+
+    Returns:
+        tuple: (stored file path, sha256 hex digest of the content)
+    """
+    os.makedirs(directory, exist_ok=True)
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    temp_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+
+    try:
+        with open(temp_path, "wb") as f:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+
+        content_hash = digest.hexdigest()
+        file_path = os.path.join(directory, f"{content_hash}{extension}")
+        if os.path.exists(file_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, file_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    logger.info(f"Stored upload {file.filename} as {file_path}")
+    return file_path, content_hash
@@ -0,0 +1,57 @@
+"""
+Standalone outreach worker.
+
+Runs queued outreach jobs from the shared job database without serving HTTP, so bulk
+processing does not compete with the API process for CPU. Start one or more with:
+
+    python -m app.worker [--jobs N] [--processes N] [--recover]
+
+and set JOB_RUNNER=external for the API so it only queues jobs.
+"""
+import argparse
+import asyncio
+import signal
+
+from loguru import logger
+
+from app.core.database import db
+from app.core.settings import settings
+from app.services.jobs import job_manager
+from app.services.smtp_pool import smtp_pool
+from app.services.twilio_dispatcher import twilio_dispatcher
+
+
+async def run(recover: bool) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info(f"👷 Starting outreach worker ({job_manager.concurrency} jobs, {settings.worker_processes or 1} processes per job)...")
+    await smtp_pool.start(prewarm=settings.smtp_prewarm_connections)
+    await twilio_dispatcher.start()
+    await job_manager.start(recover=recover)
+
+    await stop.wait()
+
+    logger.info("🛑 Stopping outreach worker...")
+    await job_manager.stop()
+    await smtp_pool.close()
+    await twilio_dispatcher.close()
+    db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run queued outreach jobs.")
+    parser.add_argument("--jobs", type=int, default=settings.max_concurrent_jobs, help="Jobs to run at once.")
+    parser.add_argument("--processes", type=int, default=settings.worker_processes, help="Worker processes per large job.")
+    parser.add_argument("--recover", action="store_true", help="Re-queue jobs left running by a crashed worker.")
+    args = parser.parse_args()
+
+    settings.worker_processes = args.processes
+    settings.max_concurrent_jobs = job_manager.concurrency = max(1, args.jobs)
+    asyncio.run(run(args.recover))
+
+
+if __name__ == "__main__":
+    main()
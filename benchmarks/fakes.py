@@ -0,0 +1,280 @@
+"""
+Local stand-ins for Groq, the SMTP server and the Twilio Calls API, for offline benchmarks.
+
+- `FakeChatModel` answers with schema-valid JSON after a latency drawn from a recorded
+  sample or a log-normal distribution, and reports token usage like Groq does.
+- `SmtpSink` is a minimal SMTP server (EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT)
+  that accepts and discards messages.
+- `TwilioStub` is a keep-alive HTTP server that answers POSTs to the Calls endpoint
+  with a queued call.
+
+The servers run on their own event loop in a background thread (`serve_in_thread`), so
+they don't compete with the pipeline's loop.
+"""
+import asyncio
+import base64
+import json
+import math
+import random
+import re
+import threading
+import time
+import urllib.parse
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import BaseModel, PrivateAttr
+
+KEY_PATTERNS = {
+    "prospect_email": re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+"),
+    "prospect_phone": re.compile(r"\+[1-9]\d{7,14}"),
+}
+
+
+class LatencyModel:
+    """
+    Samples LLM response latencies (seconds).
+
+    With `recorded` latencies, samples are drawn from them; otherwise from a log-normal
+    distribution fitted to the given p50 and p95.
+    """
+
+    def __init__(self, p50: float = 0.02, p95: float = 0.06, recorded: Optional[List[float]] = None, seed: int = 0):
+        self.recorded = recorded
+        self.mu = math.log(max(p50, 1e-6))
+        self.sigma = max(0.0, (math.log(max(p95, p50, 1e-6)) - self.mu) / 1.645)
+        self.random = random.Random(seed)
+
+    @classmethod
+    def from_file(cls, path: str, seed: int = 0) -> "LatencyModel":
+        """
+        Loads recorded latencies from a JSONL file with a "latency" (seconds) or
+        "latency_ms" field per line.
+        """
+        recorded = []
+        with open(path) as file:
+            for line in file:
+                if line.strip():
+                    entry = json.loads(line)
+                    recorded.append(entry["latency"] if "latency" in entry else entry["latency_ms"] / 1000)
+        return cls(recorded=recorded, seed=seed)
+
+    def sample(self) -> float:
+        if self.recorded:
+            return self.random.choice(self.recorded)
+        return self.random.lognormvariate(self.mu, self.sigma)
+
+
+def fill_schema(schema: Type[BaseModel], key_field: Optional[str] = None, key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Returns a valid instance of `schema` as a dict, with `key_field` set to `key`.
+    """
+    values: Dict[str, Any] = {}
+    for name, field in schema.model_fields.items():
+        if name == key_field:
+            values[name] = key
+        elif not field.is_required():
+            continue
+        elif field.annotation is int:
+            values[name] = 0
+        elif field.annotation is str:
+            values[name] = f"Benchmark {name.replace('_', ' ')} for {{prospect_name}} at {{company_name}}. " * 4
+            if name.endswith("_template") and name != "subject_template":
+                values[name] += "{personal_opening}"  # Campaign templates must carry the per-prospect opening
+        else:
+            values[name] = []
+    return values
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers any prompt for `response_schema` with valid JSON after a sampled delay.
+
+    Single-prospect prompts get one object whose `key_field` is the first key found in the
+    prompt; packed prompts (asking for "results") get one entry per distinct key.
+    """
+
+    model_name: str = "bench-llm"
+    response_schema: Type[BaseModel]
+    key_field: Optional[str] = None
+    completion_tokens: int = 400
+    _latency: LatencyModel = PrivateAttr(default_factory=LatencyModel)
+
+    def with_latency(self, latency: LatencyModel) -> "FakeChatModel":
+        self._latency = latency
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-groq"
+
+    def _respond(self, prompt: str) -> str:
+        keys = []
+        if self.key_field in KEY_PATTERNS:
+            keys = list(dict.fromkeys(KEY_PATTERNS[self.key_field].findall(prompt)))
+        if '"results"' in prompt:
+            return json.dumps({"results": [fill_schema(self.response_schema, self.key_field, key) for key in keys]})
+        return json.dumps(fill_schema(self.response_schema, self.key_field, keys[0] if keys else None))
+
+    def _result(self, messages) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        prompt_tokens = len(prompt) // 4
+        message = AIMessage(
+            content=self._respond(prompt),
+            response_metadata={"model_name": self.model_name, "token_usage": {"total_tokens": prompt_tokens + self.completion_tokens}},
+            usage_metadata={"input_tokens": prompt_tokens, "output_tokens": self.completion_tokens, "total_tokens": prompt_tokens + self.completion_tokens},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self._latency.sample())
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self._latency.sample())
+        return self._result(messages)
+
+
+class SmtpSink:
+    """
+    SMTP server that accepts every message after `latency` seconds and counts them.
+
+    With `disconnect_after_data`, the session is dropped right after a message is received,
+    before the 250 reply, like a server or network failing at the worst moment.
+    """
+
+    def __init__(self, latency: float = 0.005, disconnect_after_data: bool = False):
+        self.latency = latency
+        self.disconnect_after_data = disconnect_after_data
+        self.messages = 0
+        self.sessions = 0
+        self.port: Optional[int] = None
+
+    async def _reply(self, writer: asyncio.StreamWriter, line: str) -> None:
+        writer.write(line.encode() + b"\r\n")
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.sessions += 1
+        try:
+            await self._reply(writer, "220 localhost benchmark sink")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb in ("EHLO", "HELO"):
+                    writer.write(b"250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n250 SMTPUTF8\r\n")
+                    await writer.drain()
+                elif verb == "AUTH":
+                    if command.upper().startswith("AUTH LOGIN"):
+                        await self._reply(writer, "334 " + base64.b64encode(b"Username:").decode())
+                        await reader.readline()
+                        await self._reply(writer, "334 " + base64.b64encode(b"Password:").decode())
+                        await reader.readline()
+                    await self._reply(writer, "235 Authentication successful")
+                elif verb == "DATA":
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    self.messages += 1
+                    if self.disconnect_after_data:
+                        break
+                    await self._reply(writer, "250 OK queued")
+                elif verb == "QUIT":
+                    await self._reply(writer, "221 Bye")
+                    break
+                else:  # MAIL, RCPT, RSET, NOOP
+                    await self._reply(writer, "250 OK")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+
+class TwilioStub:
+    """
+    HTTP/1.1 server that answers every request like the Twilio Calls endpoint, after
+    `latency` seconds, and counts calls.
+
+    Set `error` to (status, content type, body) to answer with that instead, e.g. a proxy's
+    HTML 502 page. Each request's form fields are kept in `requests`.
+    """
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = 0
+        self.error: Optional[Tuple[int, str, str]] = None
+        self.requests: List[Dict[str, str]] = []
+        self.port: Optional[int] = None
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode().partition(":")
+                    if name.strip().lower() == "content-length":
+                        length = int(value.strip())
+                form = await reader.readexactly(length) if length else b""
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.error is not None:
+                    status, content_type, text = self.error
+                    body = text.encode()
+                    status_line = f"HTTP/1.1 {status} Error\r\nContent-Type: {content_type}\r\n"
+                else:
+                    self.calls += 1
+                    self.requests.append(dict(urllib.parse.parse_qsl(form.decode())))
+                    body = json.dumps({"sid": "CA" + uuid.uuid4().hex, "status": "queued"}).encode()
+                    status_line = "HTTP/1.1 201 Created\r\nContent-Type: application/json\r\n"
+                writer.write(
+                    status_line.encode()
+                    + f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        return server
+
+
+def serve_in_thread(*stand_ins) -> None:
+    """
+    Starts the given servers on an event loop in a daemon thread and returns once they listen.
+    """
+    ready = threading.Event()
+
+    def run() -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        for stand_in in stand_ins:
+            loop.run_until_complete(stand_in.start())
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="benchmark-stand-ins", daemon=True).start()
+    ready.wait()
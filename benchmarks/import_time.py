@@ -0,0 +1,72 @@
+"""
+Import-time / startup benchmark.
+
+Imports the app in fresh interpreters (the same work uvicorn does before serving) and
+reports the median wall time and the slowest modules from `python -X importtime`.
+Exits non-zero when the median exceeds --budget, so it can run in CI to catch regressions.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--budget 1.5] [--module app.main] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True)
+    return time.perf_counter() - started
+
+
+def slowest_modules(module: str, top: int):
+    """
+    Returns [(cumulative seconds, module)] for the `top` slowest top-level imports.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, check=True, capture_output=True, text=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            timings[name.strip()] = int(cumulative) / 1e6
+    return sorted(((seconds, name) for name, seconds in timings.items()), reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=None, help="Fail when the median import time (s) exceeds this")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    time_import(args.module)  # Warm the bytecode and filesystem caches
+    runs = [time_import(args.module) for _ in range(args.runs)]
+    median = statistics.median(runs)
+
+    print(f"import {args.module}: median {median:.3f}s, min {min(runs):.3f}s, max {max(runs):.3f}s over {args.runs} runs")
+    print("\nSlowest imports (cumulative):")
+    for seconds, name in slowest_modules(args.module, args.top):
+        print(f"  {seconds:7.3f}s  {name}")
+
+    if args.budget is not None and median > args.budget:
+        print(f"\nFAIL: median import time {median:.3f}s exceeds the {args.budget:.3f}s budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
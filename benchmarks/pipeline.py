@@ -0,0 +1,358 @@
+"""
+Offline end-to-end benchmark of the outreach pipeline.
+
+Runs each scenario against local stand-ins for Groq, SMTP and Twilio (see
+benchmarks/fakes.py), on generated prospect files of each size, and reports rows/sec,
+p50/p95/p99 latency per stage and peak RSS. Every (scenario, size) pair runs in a fresh
+process so peak RSS and warm caches don't leak between runs.
+
+Scenarios:
+    process_outreach   app.services.process_files.process_outreach on a mixed email/call file
+    email_bulk         POST /email/bulk through the ASGI app
+    outreach_process   POST /outreach/process, then poll the job until it finishes
+
+Stages:
+    validate   validating and normalizing one ingest batch
+    llm        one LLM request, including rate-limiter waits and packed requests
+    smtp       sending one email through the SMTP pool
+    twilio     placing one call through the Twilio dispatcher
+    row        processing one row end to end, once it has an in-flight slot
+
+The LLM stand-in waits a log-normal latency (--llm-p50/--llm-p95) or one sampled from
+recorded latencies (--llm-latencies, JSONL with "latency" or "latency_ms" per line). Groq,
+Twilio and per-domain SMTP quotas are lifted so the pipeline, not the quota, is measured.
+Other settings keep their defaults; override them with --set, e.g. --set EMAIL_CONCURRENCY=64
+--set PACK_SIZE=4. Save results with --output and compare commits with --compare.
+
+Usage:
+    python -m benchmarks.pipeline [--sizes 1000 10000 100000] [--scenarios ...] [--output results.json]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("process_outreach", "email_bulk", "outreach_process")
+STAGES = ("validate", "llm", "smtp", "twilio", "row")
+
+INDUSTRIES = ("Tech", "Finance", "Healthcare", "Retail", "Logistics")
+OBJECTIONS = ("Pricing", "Competitor", "Timing", "Budget concerns", "")
+
+
+def write_prospects(path: str, rows: int, call_ratio: float, seed: int = 0) -> None:
+    """
+    Writes a prospect CSV with unique contacts, `call_ratio` of them call rows.
+    """
+    import pandas as pd
+
+    rng = random.Random(seed)
+    records = []
+    for i in range(rows):
+        records.append({
+            "prospect_email": f"prospect{i}@example{i % 50}.com",
+            "prospect_name": f"Prospect {i}",
+            "prospect_phone": f"+1 555-{i // 10000:03d}-{i % 10000:04d}",
+            "company_name": f"Company {i % 997}",
+            "prospect_title": rng.choice(("CTO", "CFO", "Head of Operations", "")),
+            "industry": rng.choice(INDUSTRIES),
+            "engagement_level": rng.randint(0, 4),
+            "objections": ", ".join(objection for objection in rng.sample(OBJECTIONS, 2) if objection),
+            "outreach_description": "Introducing AI-driven cold chain insurance",
+            "insurance_company_name": "SecureIns",
+            "sender_name": "Jane Smith",
+            "sender_title": "Sales Manager",
+            "outreach_type": "call" if rng.random() < call_ratio else "email",
+        })
+    pd.DataFrame(records).to_csv(path, index=False)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    from app.services.model_router import percentile
+
+    return {
+        "count": len(samples),
+        "p50": percentile(samples, 0.50),
+        "p95": percentile(samples, 0.95),
+        "p99": percentile(samples, 0.99),
+    }
+
+
+# Child process: one scenario on one file
+
+
+def configure(args: argparse.Namespace, workdir: str, smtp_port: int, twilio_port: int) -> None:
+    """
+    Points the app's settings at the stand-ins. Must run before `app` is imported.
+    """
+    defaults = {
+        "mail_username": "bench@example.com",
+        "mail_password": "bench",
+        "mail_from": "bench@example.com",
+        "mail_from_name": "Benchmark",
+        "GROQ_API_KEY": "gsk_bench",
+        "twilio_account_sid": "ACbench",
+        "twilio_auth_token": "bench",
+        "twilio_phone_number": "+15550000000",
+        "twilio_verified_phone_number": "+15550000000",
+    }
+    for name, value in defaults.items():
+        os.environ.setdefault(name, value)
+    os.environ.update({
+        "MAIL_SERVER": "127.0.0.1",
+        "MAIL_PORT": str(smtp_port),
+        "MAIL_STARTTLS": "false",
+        "MAIL_SSL_TLS": "false",
+        "VALIDATE_CERTS": "false",
+        "SMTP_DOMAIN_RATE_PER_MINUTE": "0",
+        "SMTP_PREWARM_CONNECTIONS": "0",
+        "TWILIO_API_BASE_URL": f"http://127.0.0.1:{twilio_port}",
+        "TWILIO_CALLS_PER_SECOND": "100000",
+        "GROQ_RATE_LIMITS": json.dumps({model: [100_000_000, 100_000_000_000] for model in ("bench-llm", "bench-llm-small")}),
+        "LLM_ROUTER_MODELS": "[]",
+        "LLM_CACHE_ENABLED": "false",
+        "PREWARM_CLIENTS": "false",
+        "WORKER_PROCESSES": "0",
+        "JOB_RUNNER": "inline",
+        "DATABASE_PATH": os.path.join(workdir, "bench.db"),
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+    })
+    for assignment in args.set:
+        name, _, value = assignment.partition("=")
+        os.environ[name] = value
+
+
+def instrument(stages: Dict[str, List[float]], latency) -> None:
+    """
+    Swaps the generators' models for fakes and times each stage.
+    """
+    from app.services import call, campaign, email, process_files
+    from app.services.generation import StructuredGenerator
+    from app.services.row_engine import RowEngine
+    from app.services.smtp_pool import smtp_pool
+    from app.services.twilio_dispatcher import twilio_dispatcher
+    from benchmarks.fakes import FakeChatModel
+
+    for generator, key_field in (
+        (email.email_generator, "prospect_email"),
+        (call.call_generator, "prospect_phone"),
+        (campaign.campaign_email_generator, None),
+        (campaign.campaign_call_generator, None),
+        (campaign.personalization_generator, None),
+    ):
+        generator.llm = FakeChatModel(response_schema=generator.schema, key_field=key_field).with_latency(latency)
+    # Tiered generation's small model (TIERED_GENERATION=true) answers like the full one, under its own name
+    for generator, key_field in ((email.email_small_generator, "prospect_email"), (call.call_small_generator, "prospect_phone")):
+        generator.llm = FakeChatModel(model_name="bench-llm-small", response_schema=generator.schema, key_field=key_field).with_latency(latency)
+
+    def timed(stage, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                stages[stage].append(time.perf_counter() - started)
+        return wrapper
+
+    def timed_sync(stage, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stages[stage].append(time.perf_counter() - started)
+        return wrapper
+
+    class TimedRowEngine(RowEngine):
+        def __init__(self, handler, *args, **kwargs):
+            super().__init__(timed("row", handler), *args, **kwargs)
+
+    StructuredGenerator.complete = timed("llm", StructuredGenerator.complete)
+    smtp_pool.send = timed("smtp", smtp_pool.send)
+    twilio_dispatcher.place_call = timed("twilio", twilio_dispatcher.place_call)
+    process_files.validate_prospects = timed_sync("validate", process_files.validate_prospects)
+    process_files.RowEngine = TimedRowEngine  # Also times /email/bulk rows (stream_email_outreach)
+
+
+async def run_scenario(scenario: str, input_path: str, workdir: str) -> None:
+    import httpx
+
+    from app.main import app
+
+    if scenario == "process_outreach":
+        from app.core.database import db
+        from app.services.process_files import process_outreach
+        from app.services.smtp_pool import smtp_pool
+        from app.services.twilio_dispatcher import twilio_dispatcher
+
+        await smtp_pool.start(prewarm=0)
+        await twilio_dispatcher.start()
+        try:
+            await process_outreach(input_path, os.path.join(workdir, "processed.csv"), use_cache=False)
+        finally:
+            await smtp_pool.close()
+            await twilio_dispatcher.close()
+            db.close()
+        return
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            with open(input_path, "rb") as file:
+                files = {"file": (os.path.basename(input_path), file, "text/csv")}
+                endpoint = "/email/bulk" if scenario == "email_bulk" else "/outreach/process"
+                response = await client.post(endpoint, files=files, params={"use_cache": "false"})
+            response.raise_for_status()
+            if scenario == "outreach_process":
+                status_url = response.json()["status_url"]
+                while True:
+                    status = (await client.get(status_url)).json()
+                    if status["status"] in ("done", "failed", "cancelled"):
+                        if status["status"] != "done":
+                            raise RuntimeError(f"Job ended {status['status']}: {status.get('error')}")
+                        break
+                    await asyncio.sleep(0.2)
+
+
+def run_child(args: argparse.Namespace) -> Dict[str, Any]:
+    from benchmarks.fakes import LatencyModel, SmtpSink, TwilioStub, serve_in_thread
+
+    workdir = os.getcwd()
+    smtp, twilio = SmtpSink(args.smtp_latency_ms / 1000), TwilioStub(args.twilio_latency_ms / 1000)
+    serve_in_thread(smtp, twilio)
+    configure(args, workdir, smtp.port, twilio.port)
+
+    from loguru import logger
+
+    logger.remove()
+    logger.add(sys.stderr, level=args.log_level)
+
+    input_path = os.path.join(workdir, "prospects.csv")
+    write_prospects(input_path, args.size, 0.0 if args.scenario == "email_bulk" else args.call_ratio, seed=args.seed)
+
+    latency = LatencyModel.from_file(args.llm_latencies, seed=args.seed) if args.llm_latencies else LatencyModel(args.llm_p50 / 1000, args.llm_p95 / 1000, seed=args.seed)
+    stages: Dict[str, List[float]] = defaultdict(list)
+    instrument(stages, latency)
+
+    started = time.perf_counter()
+    asyncio.run(run_scenario(args.scenario, input_path, workdir))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": args.scenario,
+        "rows": args.size,
+        "seconds": elapsed,
+        "rows_per_second": args.size / elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "emails_sent": smtp.messages,
+        "calls_placed": twilio.calls,
+        "stages": {stage: summarize(stages[stage]) for stage in STAGES if stages[stage]},
+    }
+
+
+# Parent process: runs every (scenario, size) pair in a child and reports
+
+
+def commit_id() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def child_command(args: argparse.Namespace, scenario: str, size: int) -> List[str]:
+    command = [
+        sys.executable, "-m", "benchmarks.pipeline", "--child",
+        "--scenario", scenario, "--size", str(size),
+        "--call-ratio", str(args.call_ratio), "--seed", str(args.seed),
+        "--llm-p50", str(args.llm_p50), "--llm-p95", str(args.llm_p95),
+        "--smtp-latency-ms", str(args.smtp_latency_ms), "--twilio-latency-ms", str(args.twilio_latency_ms),
+        "--log-level", args.log_level,
+    ]
+    if args.llm_latencies:
+        command += ["--llm-latencies", os.path.abspath(args.llm_latencies)]
+    for assignment in args.set:
+        command += ["--set", assignment]
+    return command
+
+
+def print_result(result: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    change = ""
+    if baseline:
+        change = f" ({(result['rows_per_second'] / baseline['rows_per_second'] - 1) * 100:+.1f}% vs baseline)"
+    print(
+        f"\n{result['scenario']} x {result['rows']} rows: {result['rows_per_second']:.1f} rows/s{change}, "
+        f"{result['seconds']:.1f}s, peak RSS {result['peak_rss_mb']:.0f} MB, "
+        f"{result['emails_sent']} emails, {result['calls_placed']} calls"
+    )
+    print(f"  {'stage':<10}{'count':>9}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}")
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:<10}{stats['count']:>9}{stats['p50'] * 1000:>11.2f}{stats['p95'] * 1000:>11.2f}{stats['p99'] * 1000:>11.2f}")
+
+
+def run_parent(args: argparse.Namespace) -> int:
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = {(result["scenario"], result["rows"]): result for result in json.load(file)["results"]}
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    results = []
+    for size in args.sizes:
+        for scenario in args.scenarios:
+            # Children run in a scratch directory: the endpoints write their outputs to the working directory.
+            with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+                completed = subprocess.run(child_command(args, scenario, size), cwd=workdir, env=env, stdout=subprocess.PIPE, text=True)
+            if completed.returncode != 0:
+                print(f"\n{scenario} x {size} rows: FAILED (exit code {completed.returncode})")
+                continue
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print_result(result, baseline.get((scenario, size)))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"commit": commit_id(), "created_at": time.time(), "args": vars(args), "results": results}, file, indent=2)
+        print(f"\nSaved results to {args.output}")
+    return 0 if len(results) == len(args.sizes) * len(args.scenarios) else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--call-ratio", type=float, default=0.2, help="Share of call rows in mixed files")
+    parser.add_argument("--llm-p50", type=float, default=20.0, help="Median LLM latency (ms)")
+    parser.add_argument("--llm-p95", type=float, default=60.0, help="95th percentile LLM latency (ms)")
+    parser.add_argument("--llm-latencies", help="JSONL of recorded LLM latencies to replay instead")
+    parser.add_argument("--smtp-latency-ms", type=float, default=5.0)
+    parser.add_argument("--twilio-latency-ms", type=float, default=50.0)
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE", help="Override an app setting")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args)))
+        return 0
+    return run_parent(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())